@@ -1,29 +1,202 @@
-from PIL import Image
-import os
+"""
+Losslessly optimize every PNG under assets/ (or the paths given).
+
+For each image, in a process pool:
+  - files that claim to be .png but hold another format are reported, and
+    converted to real PNGs with --convert-mismatched (what this script
+    originally did for three hard-coded files)
+  - ancillary metadata (text chunks, EXIF, timestamps) is dropped; the ICC
+    profile is kept so colours don't shift
+  - images with at most 256 distinct RGBA colours are re-encoded as an exact
+    palette PNG (with per-entry alpha), everything else at zlib level 9
+  - the re-encoded pixels are compared against the original and the smaller
+    of the two files wins, so nothing is ever made bigger or lossy
+
+Results are recorded in scripts/.cache/images.json by content hash, so files
+that were already optimized are skipped without being decoded.
+"""
+
+import argparse
 import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import build_trace  # noqa: E402
+from content_manifest import Manifest, hash_bytes, hash_file  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = [os.path.join(ROOT, 'assets')]
+EXTENSIONS = ('.png',)
+
+
+def find_images(paths):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            found.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(EXTENSIONS))
+    return sorted(found)
+
+
+def _pixels(img):
+    mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'P', 'PA') or 'transparency' in img.info else 'RGB'
+    return img.convert(mode).tobytes(), mode
+
+
+def _palette_png(img, icc):
+    """Palette encoding for images with at most 256 colours, else None.
+
+    The quantizer isn't guaranteed to hit every colour exactly; the caller
+    compares pixels and drops the candidate if anything changed.
+    """
+    if img.mode not in ('RGB', 'RGBA', 'P', 'PA', 'L', 'LA'):
+        # 16-bit and float images would lose precision in an 8-bit palette.
+        return None
+    rgba = img.convert('RGBA')
+    colors = rgba.getcolors(256)
+    if colors is None:
+        return None
+    paletted = rgba.quantize(colors=len(colors), method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    options = {'optimize': True}
+    if icc:
+        options['icc_profile'] = icc
+    out = io.BytesIO()
+    paletted.save(out, 'PNG', **options)
+    return out.getvalue()
+
+
+def smallest_png(img):
+    """Smallest lossless PNG encoding of img: (action, bytes), or (None, None).
+
+    Candidates are a zlib level 9 re-encode and, for images with at most 256
+    colours, an exact palette PNG; each is decoded again and dropped if its
+    pixels differ from img's.
+    """
+    icc = img.info.get('icc_profile')
+    reference, mode = _pixels(img)
+
+    candidates = []
+    out = io.BytesIO()
+    options = {'optimize': True, 'compress_level': 9}
+    if icc:
+        options['icc_profile'] = icc
+    if 'transparency' in img.info and img.mode in ('P', 'L', 'RGB'):
+        options['transparency'] = img.info['transparency']
+    img.save(out, 'PNG', **options)
+    candidates.append(('recompressed', out.getvalue()))
+    palette = _palette_png(img, icc)
+    if palette is not None:
+        candidates.append(('palette', palette))
+
+    best_action, best = None, None
+    for action, data in candidates:
+        decoded = Image.open(io.BytesIO(data))
+        if decoded.convert(mode).tobytes() != reference:
+            continue
+        if best is None or len(data) < len(best):
+            best_action, best = action, data
+    return best_action, best
+
+
+def optimize(path, convert_mismatched=False):
+    """Return (path, before, after, action, output bytes or None). Runs in a worker."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    try:
+        return _optimize(path, original, convert_mismatched)
+    except Exception as e:
+        return path, len(original), len(original), f'error: {e}', None
+
+
+def _optimize(path, original, convert_mismatched):
+    img = Image.open(io.BytesIO(original))
+    source_format = img.format
+    if source_format != 'PNG' and not convert_mismatched:
+        # Converting a JPEG payload to PNG is lossless but usually much bigger.
+        return path, len(original), len(original), f'skipped: {source_format} content', None
+    img.load()
+    best_action, best = smallest_png(img)
+
+    if source_format != 'PNG' and best is not None:
+        return path, len(original), len(best), f'converted from {source_format}', best
+    if best is None or len(best) >= len(original):
+        return path, len(original), len(original), 'already optimal', None
+    return path, len(original), len(best), best_action, best
+
+
+def _replace(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Losslessly optimize PNG assets.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    parser.add_argument('--dry-run', action='store_true', help='report savings without writing')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument(
+        '--convert-mismatched', action='store_true', help='re-encode non-PNG content in .png files as PNG'
+    )
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('convert_images', args):
+        manifest = Manifest('images')
+        pending, skipped = [], 0
+        with build_trace.span('scan') as span:
+            for path in find_images(args.paths):
+                rel = os.path.relpath(path, ROOT)
+                entry = manifest.get(rel)
+                if entry and entry.get('sha256') == hash_file(path):
+                    skipped += 1
+                else:
+                    pending.append(path)
+            span.skipped(skipped)
+
+        total_before = total_after = 0
+        with build_trace.span('optimize') as span, ProcessPoolExecutor(max_workers=args.workers) as pool:
+            jobs = pool.map(optimize, pending, [args.convert_mismatched] * len(pending), chunksize=4)
+            for path, before, after, action, data in jobs:
+                rel = os.path.relpath(path, ROOT)
+                total_before += before
+                total_after += after
+                span.read(path, before)
+                span.count(action.split(':')[0])
+                saved = (before - after) / before * 100 if before else 0
+                print(f"{before / 1024:9.1f}KB -> {after / 1024:9.1f}KB  {saved:6.1f}%  {action:<24} {rel}")
+                if args.dry_run:
+                    continue
+                if action.startswith(('error', 'skipped')):
+                    continue
+                if data is not None:
+                    _replace(path, data)
+                    span.wrote(path, len(data))
+                    manifest.set(rel, {'sha256': hash_bytes(data)})
+                else:
+                    manifest.set(rel, {'sha256': hash_file(path)})
+
+        if not args.dry_run:
+            manifest.save()
+    saved = total_before - total_after
+    print(
+        f"{'Would optimize' if args.dry_run else 'Optimized'} {len(pending)} images ({skipped} unchanged since last run): "
+        f"{total_before / 1024:.0f}KB -> {total_after / 1024:.0f}KB, {'would save' if args.dry_run else 'saved'} {saved / 1024:.0f}KB "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
 
-files_to_check = [
-    'assets/images/splash-icon.png',
-    'assets/images/icon.png',
-    'assets/images/android-icon-192x192.png'
-]
-
-for file_path in files_to_check:
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                
-            img = Image.open(io.BytesIO(content))
-            print(f"File {file_path} is format: {img.format}")
-            
-            if img.format != 'PNG':
-                print(f"Converting {file_path} to PNG...")
-                img.save(file_path, 'PNG')
-                print(f"Success: {file_path} is now proper PNG.")
-            else:
-                print(f"Skipping: {file_path} is already PNG.")
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-    else:
-        print(f"File not found: {file_path}")
+if __name__ == '__main__':
+    main()
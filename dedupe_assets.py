@@ -0,0 +1,232 @@
+"""
+Find byte-identical files under assets/ and point every reference at one copy.
+
+Every file is hashed in a thread pool with a streaming sha256, so large
+videos are read in 1MB chunks and never held whole; hashes are cached in
+scripts/.cache/asset_hashes.json by (size, mtime) so a re-run only reads
+files that changed. The result is a content-addressed index,
+data/asset-index.json (generated, not committed):
+
+    {"blobs": {sha256: {"size": bytes, "paths": [...]}}, "files": {path: sha256}}
+
+Files sharing a hash form a duplicate group. Each group gets a canonical
+copy: the most referenced one, then the shortest path, then alphabetical.
+References are require('...') calls in the app sources (the alias '@/' and
+relative specifiers) and "./..." paths in app.json.
+
+With --rewrite, references to the other copies are rewritten to the
+canonical one, keeping each specifier's style. Metro bundles assets by
+path, so once nothing requires a duplicate it drops out of the bundle and
+the OTA update. The files themselves are left alone (web icons such as
+manifest.json entries are served by URL, not bundled).
+
+    python dedupe_assets.py
+    python dedupe_assets.py --rewrite
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import build_trace  # noqa: E402
+from content_manifest import Manifest, hash_file, write_if_changed  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = [os.path.join(ROOT, 'assets')]
+INDEX_PATH = os.path.join(ROOT, 'data', 'asset-index.json')
+APP_CONFIG = os.path.join(ROOT, 'app.json')
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+SKIP_DIRS = {'node_modules', '.git', '.expo', 'android', 'ios', 'dist', 'web-build', 'assets', 'data'}
+
+_REQUIRE_RE = re.compile(r"""require\(\s*(['"])(?P<spec>[^'"]+)\1\s*\)""")
+_CONFIG_PATH_RE = re.compile(r'"(?P<spec>\./[^"]+)"')
+
+
+def find_files(paths):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            found.extend(os.path.abspath(os.path.join(dirpath, f)) for f in filenames)
+    return sorted(found)
+
+
+def _under(rel, roots):
+    return any(root == os.curdir or rel == root or rel.startswith(root + os.sep) for root in roots)
+
+
+def hash_tree(files, cache, paths, workers=None):
+    """path -> sha256, hashing only files whose size or mtime changed. Returns (hashes, hashed).
+
+    Cache entries under `paths` (the scanned roots) that weren't found are dropped;
+    the rest of the cache is left alone.
+    """
+    hashes, stale = {}, []
+    for path in files:
+        rel = os.path.relpath(path, ROOT)
+        st = os.stat(path)
+        entry = cache.get(rel)
+        if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+            hashes[rel] = entry['sha256']
+        else:
+            stale.append((path, rel, st))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (path, rel, st), sha in zip(stale, pool.map(hash_file, [p for p, _, _ in stale])):
+            hashes[rel] = sha
+            cache.set(rel, {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha})
+    roots = [os.path.relpath(os.path.abspath(p), ROOT) for p in paths]
+    for rel in [r for r in cache.entries if r not in hashes and _under(r, roots)]:
+        cache.remove(rel)
+    return hashes, len(stale)
+
+
+def build_index(hashes):
+    blobs = defaultdict(lambda: {'size': 0, 'paths': []})
+    for rel, sha in sorted(hashes.items()):
+        blobs[sha]['paths'].append(rel)
+        blobs[sha]['size'] = os.path.getsize(os.path.join(ROOT, rel))
+    return {'blobs': dict(sorted(blobs.items())), 'files': dict(sorted(hashes.items()))}
+
+
+def source_files(root=ROOT):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+        for f in filenames:
+            if f.endswith(SOURCE_EXTENSIONS):
+                yield os.path.join(dirpath, f)
+
+
+def resolve(spec, source):
+    """The repo-relative path a specifier points at, or None for packages."""
+    if spec.startswith('@/'):
+        path = os.path.join(ROOT, spec[2:])
+    elif spec.startswith('.'):
+        path = os.path.join(os.path.dirname(source), spec)
+    else:
+        return None
+    return os.path.relpath(os.path.normpath(path), ROOT)
+
+
+def respell(spec, target, source):
+    """A specifier for target in the same style as spec."""
+    if spec.startswith('@/'):
+        return '@/' + target.replace(os.sep, '/')
+    rel = os.path.relpath(os.path.join(ROOT, target), os.path.dirname(source)).replace(os.sep, '/')
+    return rel if rel.startswith('.') else './' + rel
+
+
+def find_references(files):
+    """rel path -> list of (source file, specifier), over app sources and app.json."""
+    refs = defaultdict(list)
+    targets = set(files)
+    for source in list(source_files()) + [APP_CONFIG]:
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        pattern = _CONFIG_PATH_RE if source == APP_CONFIG else _REQUIRE_RE
+        for m in pattern.finditer(text):
+            # app.json paths are relative to the project root.
+            target = resolve(m.group('spec'), APP_CONFIG if source == APP_CONFIG else source)
+            if target in targets:
+                refs[target].append((source, m.group('spec')))
+    return refs
+
+
+def duplicate_groups(index, refs):
+    """[(canonical, [other paths], size)], biggest waste first."""
+    groups = []
+    for blob in index['blobs'].values():
+        if len(blob['paths']) < 2:
+            continue
+        paths = sorted(blob['paths'], key=lambda p: (-len(refs.get(p, [])), len(p), p))
+        groups.append((paths[0], paths[1:], blob['size']))
+    return sorted(groups, key=lambda g: (-g[2] * len(g[1]), g[0]))
+
+
+def rewrite(groups, refs):
+    """Point references at each group's canonical copy. Returns {source: count}."""
+    by_source = defaultdict(dict)
+    for canonical, others, _ in groups:
+        for path in others:
+            for source, spec in refs.get(path, []):
+                by_source[source][spec] = respell(spec, canonical, APP_CONFIG if source == APP_CONFIG else source)
+    changed = {}
+    for source, replacements in by_source.items():
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        pattern = _CONFIG_PATH_RE if source == APP_CONFIG else _REQUIRE_RE
+        count = 0
+
+        def swap(m):
+            nonlocal count
+            spec = m.group('spec')
+            if spec not in replacements:
+                return m.group(0)
+            count += 1
+            return m.group(0).replace(spec, replacements[spec])
+
+        new_text = pattern.sub(swap, text)
+        if count:
+            with open(source, 'w', encoding='utf-8', newline='') as f:
+                f.write(new_text)
+            changed[source] = count
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report and consolidate duplicate assets.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    parser.add_argument('--index', default=INDEX_PATH, help='where to write the content-addressed index')
+    parser.add_argument('--rewrite', action='store_true', help='point references at the canonical copy')
+    parser.add_argument('--workers', type=int, default=None)
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('dedupe_assets', args):
+        with build_trace.span('hash') as span:
+            cache = Manifest('asset_hashes')
+            files = find_files(args.paths)
+            hashes, hashed = hash_tree(files, cache, args.paths, args.workers)
+            span.skipped(len(hashes) - hashed)
+            cache.save()
+        with build_trace.span('index'):
+            index = build_index(hashes)
+            write_if_changed(args.index, (json.dumps(index, indent=2) + '\n').encode('utf-8'))
+
+        with build_trace.span('references') as span:
+            refs = find_references(set(hashes))
+            span.count('references', sum(len(r) for r in refs.values()))
+        groups = duplicate_groups(index, refs)
+        wasted = bundled = 0
+        for canonical, others, size in groups:
+            wasted += size * len(others)
+            print(f"{size * len(others) / 1024:9.1f}KB  {canonical} ({len(refs.get(canonical, []))} refs)")
+            for path in others:
+                n = len(refs.get(path, []))
+                bundled += size if n else 0
+                print(f"{'':13}= {path}{f' ({n} refs)' if n else ''}")
+
+        if args.rewrite and groups:
+            with build_trace.span('rewrite'):
+                changed = rewrite(groups, refs)
+            for source, count in sorted(changed.items()):
+                print(f"rewrote {count} reference{'s' if count != 1 else ''} in {os.path.relpath(source, ROOT)}")
+
+    print(
+        f"Indexed {len(hashes)} files ({hashed} hashed, {len(hashes) - hashed} cached) into {len(index['blobs'])} blobs: "
+        f"{len(groups)} duplicate groups wasting {wasted / 1024:.0f}KB, {bundled / 1024:.0f}KB of it referenced by the app"
+        f"{' (references rewritten)' if args.rewrite and groups else ''} in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Render the web/PWA icon set in assets/images from one master image.
+
+The sizes live in ICONS below; the master is decoded once, and every size
+comes out of the same resampling pipeline:
+
+  - the master is halved with box filtering (Image.reduce) into a small mip
+    chain, and each icon is resized with Lanczos from the smallest level at
+    least 3x its size, so a 16px favicon doesn't filter 1024px of input
+  - resizing happens on premultiplied alpha (Pillow does this for RGBA), so
+    transparent edges don't pick up dark fringes
+  - icons render in a thread pool (Pillow releases the GIL while resizing and
+    encoding) and are saved with convert_images.smallest_png, so they come
+    out as small as convert_images.py would make them
+
+Outputs are recorded in scripts/.cache/icons.json with the master's hash and
+their size-table entry; when neither changed and the file on disk is the one
+written, nothing is decoded at all. The icons in the tree are committed and
+weren't rendered by this pipeline, so an output with no cache entry yet (a
+fresh checkout) is kept as it is, provided its dimensions are in the table,
+and recorded against the current master: icons are only re-rendered once the
+master or their entry changes, or with --force. With --out elsewhere the
+cache is neither read nor written and every icon is rendered. manifest.json
+(icons with a density) and browserconfig.xml (icons with a tile) are
+regenerated from the table.
+
+    python generate_icons.py
+    python generate_icons.py --master assets/images/ico.png --out /tmp/icons --force
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import build_trace  # noqa: E402
+from content_manifest import Manifest, hash_bytes, hash_file, hash_json, write_if_changed  # noqa: E402
+from convert_images import smallest_png  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ICON_DIR = os.path.join(ROOT, 'assets', 'images')
+MASTER_PATH = os.path.join(ICON_DIR, 'ico.png')
+REDUCING_GAP = 3
+
+# One entry per output file. 'density' lists it in manifest.json, 'tile' in
+# browserconfig.xml; .ico entries take every size in 'sizes'.
+ICONS = [
+    {'name': 'apple-icon-57x57.png', 'size': 57},
+    {'name': 'apple-icon-60x60.png', 'size': 60},
+    {'name': 'apple-icon-72x72.png', 'size': 72},
+    {'name': 'apple-icon-76x76.png', 'size': 76},
+    {'name': 'apple-icon-114x114.png', 'size': 114},
+    {'name': 'apple-icon-120x120.png', 'size': 120},
+    {'name': 'apple-icon-144x144.png', 'size': 144},
+    {'name': 'apple-icon-152x152.png', 'size': 152},
+    {'name': 'apple-icon-180x180.png', 'size': 180},
+    {'name': 'apple-icon-precomposed.png', 'size': 192},
+    {'name': 'android-icon-36x36.png', 'size': 36, 'density': '0.75'},
+    {'name': 'android-icon-48x48.png', 'size': 48, 'density': '1.0'},
+    {'name': 'android-icon-72x72.png', 'size': 72, 'density': '1.5'},
+    {'name': 'android-icon-96x96.png', 'size': 96, 'density': '2.0'},
+    {'name': 'android-icon-144x144.png', 'size': 144, 'density': '3.0'},
+    {'name': 'android-icon-192x192.png', 'size': 192, 'density': '4.0'},
+    {'name': 'ms-icon-70x70.png', 'size': 70, 'tile': 'square70x70logo'},
+    {'name': 'ms-icon-144x144.png', 'size': 144},
+    {'name': 'ms-icon-150x150.png', 'size': 150, 'tile': 'square150x150logo'},
+    {'name': 'ms-icon-310x310.png', 'size': 310, 'tile': 'square310x310logo'},
+    {'name': 'favicon-16x16.png', 'size': 16},
+    {'name': 'favicon-32x32.png', 'size': 32},
+    {'name': 'favicon-96x96.png', 'size': 96},
+    {'name': 'favicon.ico', 'sizes': [16, 32]},
+]
+
+BROWSERCONFIG = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<browserconfig><msapplication><tile>{logos}<TileColor>{color}</TileColor></tile></msapplication></browserconfig>'
+)
+_TILE_COLOR_RE = re.compile(r'<TileColor>([^<]*)</TileColor>')
+
+
+class Resampler:
+    """A decoded master plus its box-filtered mip chain, shared by all sizes."""
+
+    def __init__(self, master):
+        if master.width != master.height:
+            raise ValueError(f'master icon must be square, got {master.width}x{master.height}')
+        self.levels = [master.convert('RGBA')]
+        while self.levels[-1].width >= 2 * REDUCING_GAP * 16:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    def render(self, size):
+        source = self.levels[0]
+        for level in self.levels:
+            if level.width >= size * REDUCING_GAP:
+                source = level
+        if source.width == size:
+            return source.copy()
+        return source.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def render(icon, resampler):
+    """Return (icon, output bytes, action). Runs in a worker thread."""
+    if icon['name'].endswith('.ico'):
+        images = [resampler.render(s) for s in sorted(icon['sizes'], reverse=True)]
+        out = io.BytesIO()
+        images[0].save(out, 'ICO', sizes=[im.size for im in images], append_images=images[1:])
+        return icon, out.getvalue(), 'ico'
+    action, data = smallest_png(resampler.render(icon['size']))
+    return icon, data, action
+
+
+def _matches_spec(path, icon):
+    """Whether an existing output has the table's dimensions."""
+    try:
+        with Image.open(path) as im:
+            if icon['name'].endswith('.ico'):
+                # The committed favicon.ico only carries 16x16; that's fine to keep.
+                sizes = set(im.info.get('sizes', ()))
+                return bool(sizes) and sizes <= {(s, s) for s in icon['sizes']}
+            return im.size == (icon['size'], icon['size'])
+    except (OSError, ValueError):
+        return False
+
+
+def render_manifest(path, icons):
+    """manifest.json with its icons list rebuilt, in the file's existing style."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except FileNotFoundError:
+        doc = {'name': 'App'}
+    doc['icons'] = [
+        {'src': f"/{i['name']}", 'sizes': f"{i['size']}x{i['size']}", 'type': 'image/png', 'density': i['density']}
+        for i in icons if 'density' in i
+    ]
+    return json.dumps(doc, indent=1, ensure_ascii=False).replace('/', '\\/').encode('utf-8')
+
+
+def render_browserconfig(path, icons):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            m = _TILE_COLOR_RE.search(f.read())
+    except FileNotFoundError:
+        m = None
+    logos = ''.join(f"<{i['tile']} src=\"/{i['name']}\"/>" for i in icons if 'tile' in i)
+    return BROWSERCONFIG.format(logos=logos, color=m.group(1) if m else '#ffffff').encode('utf-8')
+
+
+def generate(master_path=MASTER_PATH, out=ICON_DIR, force=False, workers=None):
+    """Render every icon whose master, spec or output changed and refresh the configs.
+
+    Returns ([(rel path, old bytes, new bytes, action, written)], up-to-date count, updated configs).
+    """
+    # The cache describes assets/images only; other output directories are
+    # rendered in full and leave it alone.
+    cached = os.path.abspath(out) == ICON_DIR
+    cache = Manifest('icons')
+    with build_trace.span('scan') as span:
+        master_sha = hash_file(master_path)
+        pending, fresh, adopted = [], 0, 0
+        for icon in ICONS:
+            path = os.path.join(out, icon['name'])
+            rel = os.path.relpath(path, ROOT)
+            entry = cache.get(rel)
+            if force or not cached or not os.path.exists(path):
+                pending.append(icon)
+            elif entry is None and _matches_spec(path, icon):
+                cache.set(rel, {'master': master_sha, 'spec': hash_json(icon), 'sha256': hash_file(path)})
+                adopted += 1
+            elif (
+                entry is not None and entry.get('master') == master_sha
+                and entry.get('spec') == hash_json(icon) and hash_file(path) == entry.get('sha256')
+            ):
+                fresh += 1
+            else:
+                pending.append(icon)
+        span.skipped(fresh + adopted)
+        span.count('adopted', adopted)
+        fresh += adopted
+
+    rows = []
+    if adopted and not pending:
+        cache.save()
+    if pending:
+        with build_trace.span('decode'):
+            with Image.open(master_path) as master:
+                resampler = Resampler(master)
+        with build_trace.span('render'), ThreadPoolExecutor(max_workers=workers) as pool:
+            for icon, data, action in pool.map(lambda i: render(i, resampler), pending):
+                path = os.path.join(out, icon['name'])
+                rel = os.path.relpath(path, ROOT)
+                old = os.path.getsize(path) if os.path.exists(path) else 0
+                written = write_if_changed(path, data)
+                if cached:
+                    cache.set(rel, {'master': master_sha, 'spec': hash_json(icon), 'sha256': hash_bytes(data)})
+                rows.append((rel, old, len(data), action, written))
+        if cached:
+            cache.save()
+
+    with build_trace.span('configs'):
+        configs = {
+            'manifest.json': render_manifest(os.path.join(out, 'manifest.json'), ICONS),
+            'browserconfig.xml': render_browserconfig(os.path.join(out, 'browserconfig.xml'), ICONS),
+        }
+        updated = [name for name, data in configs.items() if write_if_changed(os.path.join(out, name), data)]
+    return rows, fresh, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the icon set from one master image.')
+    parser.add_argument('--master', default=MASTER_PATH)
+    parser.add_argument('--out', default=ICON_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='re-render even if nothing changed')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('generate_icons', args):
+        rows, fresh, updated = generate(args.master, args.out, args.force, args.workers)
+    for rel, old, new, action, written in rows:
+        print(f"{old / 1024:8.1f}KB -> {new / 1024:8.1f}KB  {action:<13} {'written' if written else 'same':<8} {rel}")
+
+    before, after = sum(r[1] for r in rows), sum(r[2] for r in rows)
+    print(
+        f"Rendered {len(rows)} of {len(ICONS)} icons from {os.path.relpath(args.master, ROOT)} "
+        f"({fresh} up to date): {before / 1024:.0f}KB -> {after / 1024:.0f}KB"
+        f"{', updated ' + ' and '.join(updated) if updated else ''} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
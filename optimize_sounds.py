@@ -0,0 +1,291 @@
+"""
+Shrink the WAV UI sounds under assets/sounds (or the paths given).
+
+Each file is decoded into a float array (stdlib wave; WAVE_FORMAT_EXTENSIBLE
+PCM, which wave on Python < 3.12 rejects, is read straight from the RIFF
+chunks) and run through the same vectorized steps, in a process pool:
+
+  - downmix to --channels (mono by default) by averaging channels
+  - trim leading/trailing silence below --silence dBFS, keeping a few
+    milliseconds of padding so attacks aren't clipped
+  - resample to --rate with an FFT (band-limited, so downsampling doesn't
+    alias), padding the clip so the circular transform doesn't wrap
+  - peak-normalize to --peak dBFS (after resampling, which moves the peak)
+  - requantize to --bits (16 or 8) with TPDF dither
+
+Files whose header says MP3/MP4 despite the .wav extension are reported and
+left alone: they need re-exporting as real WAVs (or renaming) before this
+stage can touch them. A clip with nothing above --silence is left alone
+too, rather than trimmed to an empty file. Output is only written when it
+is smaller than the input. Results are recorded in scripts/.cache/sounds.json
+by content hash and settings, so processed files are skipped on the next run.
+
+    python optimize_sounds.py --dry-run
+    python optimize_sounds.py --rate 22050 --bits 16 --out /tmp/sounds
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import build_trace  # noqa: E402
+from content_manifest import Manifest, hash_bytes, hash_json  # noqa: E402
+from verify_images import sniff  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = [os.path.join(ROOT, 'assets', 'sounds')]
+EXTENSIONS = ('.wav',)
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+PAD_SECONDS = 0.005
+
+
+def find_sounds(paths):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            found.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(EXTENSIONS))
+    return sorted(found)
+
+
+def _to_float(frames, width, channels):
+    """Interleaved little-endian PCM bytes -> (frames, channels) float32 in [-1, 1)."""
+    if width == 1:
+        samples = np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)).astype(np.int32)
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples).astype(np.float32)
+    else:
+        samples = np.frombuffer(frames, dtype={2: '<i2', 4: '<i4'}[width]).astype(np.float32)
+    return (samples / float(1 << (8 * width - 1))).reshape(-1, channels)
+
+
+def _read_extensible(data):
+    """RIFF chunks of a WAVE_FORMAT_EXTENSIBLE file with PCM samples."""
+    pos, fmt, frames = 12, None, None
+    while pos + 8 <= len(data):
+        chunk, size = data[pos:pos + 4], struct.unpack('<I', data[pos + 4:pos + 8])[0]
+        body = data[pos + 8:pos + 8 + size]
+        if chunk == b'fmt ':
+            fmt = body
+        elif chunk == b'data':
+            frames = body
+        pos += 8 + size + (size & 1)
+    if fmt is None or frames is None or len(fmt) < 26:
+        raise ValueError('no fmt/data chunk')
+    _, channels, rate, _, align, bits = struct.unpack('<HHIIHH', fmt[:16])
+    subformat = struct.unpack('<H', fmt[24:26])[0]
+    if subformat != WAVE_FORMAT_PCM:
+        raise ValueError(f'unsupported extensible subformat {subformat}')
+    width = align // channels
+    frames = frames[:len(frames) - len(frames) % align]
+    return _to_float(frames, width, channels), rate, channels, bits
+
+
+def read_wav(data):
+    """Return (samples (frames, channels) float32, rate, channels, bits)."""
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+            return _to_float(w.readframes(w.getnframes()), width, channels), rate, channels, 8 * width
+    except wave.Error as e:
+        if f'unknown format: {WAVE_FORMAT_EXTENSIBLE}' not in str(e):
+            raise
+        return _read_extensible(data)
+
+
+def downmix(samples, channels):
+    if samples.shape[1] == channels:
+        return samples
+    if channels == 1:
+        return samples.mean(axis=1, keepdims=True)
+    return np.repeat(samples.mean(axis=1, keepdims=True), channels, axis=1)
+
+
+def trim_silence(samples, rate, threshold_db):
+    threshold = 10 ** (threshold_db / 20)
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > threshold)
+    if len(loud) == 0:
+        return samples[:0]
+    pad = int(rate * PAD_SECONDS)
+    return samples[max(0, loud[0] - pad):loud[-1] + pad + 1]
+
+
+def normalize(samples, peak_db):
+    peak = np.abs(samples).max() if samples.size else 0
+    return samples * (10 ** (peak_db / 20) / peak) if peak > 0 else samples
+
+
+def resample(samples, rate, target):
+    """Band-limited FFT resample; zero padding keeps the circular transform from wrapping."""
+    if rate == target or len(samples) == 0:
+        return samples
+    pad = int(0.05 * rate)
+    padded = np.pad(samples, ((pad, pad), (0, 0)))
+    n = len(padded)
+    m = int(round(n * target / rate))
+    spectrum = np.fft.rfft(padded, axis=0)
+    keep = min(spectrum.shape[0], m // 2 + 1)
+    out = np.fft.irfft(spectrum[:keep], n=m, axis=0) * (m / n)
+    cut = int(round(pad * target / rate))
+    return out[cut:m - cut].astype(np.float32)
+
+
+def quantize(samples, bits, seed):
+    """float [-1, 1) -> interleaved PCM bytes, TPDF-dithered."""
+    scale = float(1 << (bits - 1))
+    rng = np.random.default_rng(seed)
+    dither = rng.random(samples.shape) - rng.random(samples.shape)
+    ints = np.clip(np.round(samples * scale + dither), -scale, scale - 1)
+    if bits == 8:
+        return (ints + 128).astype(np.uint8).tobytes()
+    return ints.astype('<i2').tobytes()
+
+
+def encode(samples, rate, bits):
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(bits // 8)
+        w.setframerate(rate)
+        w.writeframes(quantize(samples, bits, seed=len(samples)))
+    return out.getvalue()
+
+
+def optimize(path, settings):
+    """Return (path, before, after, duration before, duration after, action, output bytes or None)."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    fmt = sniff(original[:64])
+    if fmt != 'wav':
+        return path, len(original), len(original), None, None, f'skipped: {fmt or "unknown"} content', None
+    try:
+        samples, rate, channels, bits = read_wav(original)
+    except (wave.Error, ValueError, EOFError) as e:
+        return path, len(original), len(original), None, None, f'error: {e}', None
+    before_duration = len(samples) / rate
+
+    samples = downmix(samples, settings['channels'])
+    samples = trim_silence(samples, rate, settings['silence'])
+    if len(samples) == 0:
+        # Nothing above the threshold: trimming would leave an empty WAV.
+        return path, len(original), len(original), before_duration, before_duration, 'skipped: all below threshold', None
+    samples = resample(samples, rate, settings['rate'])
+    samples = normalize(samples, settings['peak'])
+    data = encode(samples, settings['rate'], settings['bits'])
+    after_duration = len(samples) / settings['rate']
+
+    described = f"{channels}ch {rate // 1000}k/{bits} -> {settings['channels']}ch {settings['rate'] // 1000}k/{settings['bits']}"
+    if len(data) >= len(original):
+        return path, len(original), len(original), before_duration, before_duration, 'already optimal', None
+    return path, len(original), len(data), before_duration, after_duration, described, data
+
+
+def _replace(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trim, normalize, downmix and resample WAV sounds.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    parser.add_argument('--rate', type=int, default=22050)
+    parser.add_argument('--bits', type=int, choices=(8, 16), default=16)
+    parser.add_argument('--channels', type=int, choices=(1, 2), default=1)
+    parser.add_argument('--silence', type=float, default=-50.0, help='trim threshold, dBFS')
+    parser.add_argument('--peak', type=float, default=-1.0, help='normalization target, dBFS')
+    parser.add_argument('--out', help='write results here instead of replacing the files')
+    parser.add_argument('--dry-run', action='store_true', help='report without writing')
+    parser.add_argument('--workers', type=int, default=None)
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    settings = {k: getattr(args, k) for k in ('rate', 'bits', 'channels', 'silence', 'peak')}
+    settings_hash = hash_json(settings)
+    with build_trace.run('optimize_sounds', args):
+        manifest = Manifest('sounds')
+        pending, skipped = [], 0
+        with build_trace.span('scan') as span:
+            for path in find_sounds(args.paths):
+                rel = os.path.relpath(path, ROOT)
+                entry = manifest.get(rel)
+                with open(path, 'rb') as f:
+                    sha = hash_bytes(f.read())
+                if not args.out and entry and entry.get('sha256') == sha and entry.get('settings') == settings_hash:
+                    skipped += 1
+                else:
+                    pending.append(path)
+            span.skipped(skipped)
+
+        total_before = total_after = 0
+        seconds_before = seconds_after = 0.0
+        foreign, silent = [], []
+        with build_trace.span('optimize') as span, ProcessPoolExecutor(max_workers=args.workers) as pool:
+            jobs = pool.map(optimize, pending, [settings] * len(pending), chunksize=2)
+            for path, before, after, duration, new_duration, action, data in jobs:
+                rel = os.path.relpath(path, ROOT)
+                total_before += before
+                total_after += after
+                span.read(path, before)
+                timing = f"{duration:5.2f}s -> {new_duration:5.2f}s" if duration is not None else f"{'':16}"
+                saved = (before - after) / before * 100 if before else 0
+                print(f"{before / 1024:8.1f}KB -> {after / 1024:8.1f}KB {saved:6.1f}%  {timing}  {action:<30} {rel}")
+                if action == 'skipped: all below threshold':
+                    silent.append(rel)
+                    span.count('silent')
+                    continue
+                if action.startswith('skipped'):
+                    foreign.append(rel)
+                    span.count('not_wav')
+                    continue
+                if duration is not None:
+                    seconds_before += duration
+                    seconds_after += new_duration
+                if args.dry_run or action.startswith('error'):
+                    continue
+                if args.out:
+                    if data is not None:
+                        os.makedirs(args.out, exist_ok=True)
+                        target = os.path.join(args.out, os.path.basename(path))
+                        _replace(target, data)
+                        span.wrote(target, len(data))
+                    continue
+                if data is not None:
+                    _replace(path, data)
+                    span.wrote(path, len(data))
+                    manifest.set(rel, {'sha256': hash_bytes(data), 'settings': settings_hash})
+                else:
+                    with open(path, 'rb') as f:
+                        manifest.set(rel, {'sha256': hash_bytes(f.read()), 'settings': settings_hash})
+
+        if not args.dry_run and not args.out:
+            manifest.save()
+    if foreign:
+        print(f"{len(foreign)} .wav files hold another format and were left alone; re-export them as WAV or rename them.")
+    if silent:
+        print(f"{len(silent)} sounds are entirely below {args.silence:g} dBFS and were left alone; lower --silence to process them.")
+    print(
+        f"Processed {len(pending) - len(foreign) - len(silent)} sounds ({skipped} unchanged since last run, {len(foreign)} not WAV, {len(silent)} silent): "
+        f"{total_before / 1024:.0f}KB -> {total_after / 1024:.0f}KB, "
+        f"{seconds_before:.1f}s -> {seconds_after:.1f}s of audio, in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+"""
+Benchmarks for the Python tooling on synthetic data at several scales.
+
+Each case generates (once, cached under scripts/.cache/bench/) a workload
+shaped like the real inputs, then runs the tools' own entry points phase by
+phase:
+
+  translations  17/50/100 locales x 1k/10k keys in the constants/translations
+                format, ~2% keys missing and ~1% placeholder drift per locale:
+                parse, check_translations, build_translations, and a
+                locale_batch dry run setting 1% of the keys in every locale
+  recipes       2k/20k/200k records in the {"Area": [recipe, ...]} shape of
+                app/recipe/recipies.json, ~10% re-pasted duplicates:
+                recipe_stream, merge_recipes, build_recipe_shards,
+                recipe_measures and build_ingredient_index
+  images        100/300 PNGs (flat, gradient and noise content, 16-1024px,
+                a few JPEGs named .png): verify_images, convert_images
+                (no writes) and generate_icons from a synthetic master
+
+Every case runs in a fresh interpreter, so peak RSS (including pool
+workers) belongs to that case alone. Each phase is a build_trace span, so
+its wall and CPU time, bytes read and written and counters are recorded
+the same way the scripts report them with --trace. Results go to
+data/benchmarks/<time>-<commit>.json (generated, not committed);
+--compare reads an earlier file and flags phases that got slower by more
+than --threshold.
+
+    python scripts/benchmark.py --quick
+    python scripts/benchmark.py --suite recipes
+    python scripts/benchmark.py --compare data/benchmarks/20250101-120000-abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+
+import build_trace  # noqa: E402
+from content_manifest import CACHE_DIR  # noqa: E402
+
+DATA_DIR = os.path.join(CACHE_DIR, 'bench')
+RESULTS_DIR = os.path.join(ROOT, 'data', 'benchmarks')
+GENERATOR_VERSION = 1
+
+SUITES = {
+    'translations': [
+        {'locales': locales, 'keys': keys} for locales in (17, 50, 100) for keys in (1000, 10000)
+    ],
+    'recipes': [{'records': records} for records in (2000, 20000, 200000)],
+    'images': [{'files': files} for files in (100, 300)],
+}
+
+_WORDS = (
+    'salt pepper garlic onion lime rice beans chicken beef lamb tomato chili cumin basil mint yogurt '
+    'butter flour sugar honey lemon ginger coconut milk cream cheese potato carrot pea corn fish '
+    'travel passport recipe country flavour spice market street kitchen journey map badge streak'
+).split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _case_dir(suite: str, params: dict) -> str:
+    name = '-'.join(f'{k}{v}' for k, v in sorted(params.items()))
+    return os.path.join(DATA_DIR, f'{suite}-{name}-v{GENERATOR_VERSION}')
+
+
+def _generated(directory: str, make) -> str:
+    """Run make(tmp_dir) once per dataset; the finished directory is reused."""
+    if os.path.isdir(directory):
+        return directory
+    tmp = directory + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    make(tmp)
+    os.replace(tmp, directory)
+    return directory
+
+
+# -- synthetic workloads -----------------------------------------------------
+
+def _locale_code(i: int) -> str:
+    return 'x' + chr(ord('a') + i // 26 % 26) + chr(ord('a') + i % 26)
+
+
+def make_catalogs(directory: str, locales: int, keys: int):
+    rng = random.Random(keys * 1000 + locales)
+    names = [f'k{i:05d}_{rng.choice(_WORDS)}' for i in range(keys)]
+    slots = {name: '{{name}}' if rng.random() < 0.1 else '' for name in names}
+    base = {name: f"{_words(rng, rng.randint(2, 8)).capitalize()} {slots[name]}".strip() for name in names}
+
+    def write(locale: str, values: Dict[str, str]):
+        lines = [f'export const {locale} = {{']
+        for i, name in enumerate(names):
+            if i % 50 == 0:
+                lines.append('')
+                lines.append(f'  // Group {i // 50}')
+            if name in values:
+                lines.append(f"  {name}: {json.dumps(values[name], ensure_ascii=False)},")
+        lines.append('};')
+        with open(os.path.join(directory, f'{locale}.ts'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    write('en', base)
+    for n in range(locales - 1):
+        values = {}
+        for name in names:
+            roll = rng.random()
+            if roll < 0.02:
+                continue
+            value = base[name][::-1] if roll > 0.5 else base[name].upper()
+            if slots[name]:
+                value = value.replace(slots[name][::-1], '{{nom}}' if roll < 0.03 else slots[name])
+                value = value.replace(slots[name].upper(), slots[name])
+            values[name] = value
+        write(_locale_code(n), values)
+
+
+_MEASURES = ('1 cup', '2 tbsp', '1/2 tsp', '200 g', '1 kg', '3', '2-3 cloves', '1 can (400 g)', 'to taste', '500 ml', 'pinch')
+
+
+def make_recipes(directory: str, records: int):
+    rng = random.Random(records)
+    areas = [f'Area {i:02d}' for i in range(60)]
+    ingredients = [f'{rng.choice(_WORDS)} {rng.choice(_WORDS)}' for _ in range(800)]
+    path = os.path.join(directory, 'recipes.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        written = []
+        for batch_start in range(0, records, 500):
+            area = rng.choice(areas)
+            f.write('{\n' if batch_start == 0 else ',\n')
+            f.write(f'  {json.dumps(area)}: [\n')
+            batch = []
+            for i in range(batch_start, min(records, batch_start + 500)):
+                if written and rng.random() < 0.1:
+                    recipe = dict(rng.choice(written))
+                else:
+                    recipe = {
+                        'idMeal': str(52000 + i) if i % 2 else f'{area[:2].lower()}_{i}',
+                        'strMeal': f'{_words(rng, 3).title()} {i}',
+                        'strCategory': rng.choice(('Beef', 'Chicken', 'Dessert', 'Vegetarian', 'Seafood')),
+                        'strArea': area,
+                        'strInstructions': _words(rng, 60),
+                        'strMealThumb': f'https://example.com/{i}.jpg',
+                        'ingredients': [
+                            {'name': rng.choice(ingredients), 'measure': rng.choice(_MEASURES)}
+                            for _ in range(rng.randint(5, 12))
+                        ],
+                    }
+                    if len(written) < 2000:
+                        written.append(recipe)
+                batch.append('    ' + json.dumps(recipe, ensure_ascii=False))
+            f.write(',\n'.join(batch) + '\n  ]')
+        f.write('\n}\n')
+
+
+def make_images(directory: str, files: int):
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(files)
+    for i in range(files):
+        size = int(rng.choice([16, 32, 64, 128, 256, 512, 1024]))
+        kind = i % 4
+        if kind == 0:
+            pixels = np.zeros((size, size, 4), dtype=np.uint8) + rng.integers(0, 256, 4, dtype=np.uint8)
+        elif kind == 1:
+            ramp = np.linspace(0, 255, size, dtype=np.uint8)
+            pixels = np.dstack([np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size)),
+                                np.full((size, size), 128, np.uint8), np.full((size, size), 255, np.uint8)])
+        else:
+            pixels = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+        image = Image.fromarray(pixels, 'RGBA')
+        path = os.path.join(directory, f'image-{i:04d}.png')
+        if i % 50 == 49:
+            image.convert('RGB').save(path, 'JPEG', quality=85)
+        else:
+            image.save(path, 'PNG')
+    master = np.dstack([rng.integers(0, 256, (1024, 1024, 3), dtype=np.uint8), np.full((1024, 1024), 255, np.uint8)])
+    Image.fromarray(master, 'RGBA').save(os.path.join(directory, 'master.png'))
+
+
+# -- cases -------------------------------------------------------------------
+
+def bench_translations(data: str, scratch: str, params: dict):
+    from build_translations import build
+    from check_translations import check_all
+    from locale_batch import LocalePatch, run_batch
+    from translation_catalog import load_catalog, locale_files
+
+    with build_trace.span('parse'):
+        catalogs = {locale: load_catalog(path) for locale, path in locale_files(data, include_base=True)}
+    with build_trace.span('check'):
+        check_all(data)
+    with build_trace.span('build'):
+        build(data, os.path.join(scratch, 'compiled'))
+    keys = catalogs['en'].keys()[::100]
+    patches = [
+        LocalePatch(locale, path, set={k: f'{locale} {k}' for k in keys}, group='Group 0')
+        for locale, path in locale_files(data)
+    ]
+    with build_trace.span('patch'):
+        run_batch(patches, dry_run=True)
+
+
+def bench_recipes(data: str, scratch: str, params: dict):
+    from build_ingredient_index import build_index
+    from build_recipe_shards import build, collect
+    from merge_recipes import plan_merge, write_corpus
+    from recipe_measures import attach_measures
+    from recipe_stream import read_corpus
+
+    source = os.path.join(data, 'recipes.json')
+    with build_trace.span('stream'):
+        records, _ = read_corpus(source)
+        sum(1 for _ in records)
+    with build_trace.span('merge'):
+        write_corpus(plan_merge([source]), os.path.join(scratch, 'recipes.jsonl'))
+    with build_trace.span('shards'):
+        build([source], os.path.join(scratch, 'shards'))
+    by_area, _ = collect([source])
+    recipes = [r for rs in by_area.values() for r in rs]
+    with build_trace.span('measures'):
+        attach_measures(recipes)
+    with build_trace.span('ingredient_index'):
+        build_index(recipes, {})
+
+
+def bench_images(data: str, scratch: str, params: dict):
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    from PIL import Image
+
+    from convert_images import find_images, optimize
+    from generate_icons import ICONS, Resampler, render
+    from verify_images import DEFAULT_BUDGETS, verify
+
+    paths = find_images([data])
+    with build_trace.span('verify'):
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(lambda p: verify(p, DEFAULT_BUDGETS), paths))
+    with build_trace.span('optimize'):
+        with ProcessPoolExecutor() as pool:
+            list(pool.map(optimize, paths, chunksize=4))
+    with build_trace.span('icons'):
+        with Image.open(os.path.join(data, 'master.png')) as master:
+            resampler = Resampler(master)
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(lambda i: render(i, resampler), ICONS))
+
+
+CASES = {
+    'translations': (make_catalogs, bench_translations),
+    'recipes': (make_recipes, bench_recipes),
+    'images': (make_images, bench_images),
+}
+
+
+def run_case(suite: str, params: dict) -> dict:
+    """Runs inside the child interpreter; returns the case's result."""
+    make, bench = CASES[suite]
+    data = _generated(_case_dir(suite, params), lambda d: make(d, **params))
+    scratch = tempfile.mkdtemp(prefix='bench-')
+    try:
+        with build_trace.run(suite) as root:
+            bench(data, scratch, params)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        'suite': suite,
+        'params': params,
+        'wall': round(root.wall, 4),
+        'peak_rss_mb': build_trace.peak_rss_mb(),
+        'phases': {
+            child.name: {k: v for k, v in child.record().items() if k not in ('type', 'span', 'depth')}
+            for child in root.children
+        },
+    }
+
+
+# -- driver ------------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _case_key(case: dict) -> str:
+    return case['suite'] + ' ' + ' '.join(f'{k}={v}' for k, v in sorted(case['params'].items()))
+
+
+def compare(results: List[dict], baseline_path: str, threshold: float) -> int:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {_case_key(c): c for c in json.load(f)['cases']}
+    regressions = 0
+    for case in results:
+        old = baseline.get(_case_key(case))
+        if old is None:
+            continue
+        for name, phase in case['phases'].items():
+            before = old['phases'].get(name, {}).get('wall')
+            if not before:
+                continue
+            ratio = phase['wall'] / before
+            slower = ratio > 1 + threshold
+            regressions += slower
+            print(f"{'SLOWER' if slower else '':6} {_case_key(case):<36} {name:<17} "
+                  f"{before:8.3f}s -> {phase['wall']:8.3f}s ({ratio:5.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Python tooling on synthetic data.')
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help='run only these suites')
+    parser.add_argument('--quick', action='store_true', help='smallest scale of each suite only')
+    parser.add_argument('--out', default=None, help='results file (default data/benchmarks/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='slowdown ratio flagged by --compare')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        case = json.loads(args.run_case)
+        print(json.dumps(run_case(case['suite'], case['params'])))
+        return
+
+    started = time.perf_counter()
+    cases = [
+        (suite, params)
+        for suite in (args.suite or sorted(SUITES))
+        for params in (SUITES[suite][:1] if args.quick else SUITES[suite])
+    ]
+    results = []
+    for suite, params in cases:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-case', json.dumps({'suite': suite, 'params': params})],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{suite} {params}: failed\n{proc.stderr.strip()}")
+            continue
+        case = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(case)
+        phases = '  '.join(f"{name} {p['wall']:.2f}s" for name, p in case['phases'].items())
+        print(f"{_case_key(case):<36} {case['wall']:8.2f}s {case['peak_rss_mb']:8.0f}MB  {phases}")
+
+    commit = _git_commit()
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'cases': results,
+        }, f, indent=2)
+        f.write('\n')
+
+    regressions = compare(results, args.compare, args.threshold) if args.compare else 0
+    print(
+        f"Ran {len(results)} of {len(cases)} cases in {time.perf_counter() - started:.1f}s, "
+        f"results in {os.path.relpath(out, ROOT)}"
+        f"{f', {regressions} phases slower than {1 + args.threshold:.2f}x' if args.compare else ''}"
+    )
+    sys.exit(1 if regressions or len(results) < len(cases) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,515 @@
+"""
+Build the country lookup index for the map: a per-country table (bbox,
+centroid, area) and a uniform grid over the simplified borders.
+
+Borders come from build_geo's shared-arc simplification (default 0.02
+degrees), so hit-testing sees the same shapes the map draws. Output
+(data/country-index/, generated, not committed):
+
+    index.json   transform   scale/translate of the quantized ring coordinates
+                 countries   per country, in assets/countries.json order:
+                             a3 (ADM0_A3), iso2, name, bbox [w, s, e, n],
+                             centroid [lon, lat] of its largest polygon (a
+                             label point that stays on land for France or
+                             the US), area in km^2 (spherical, full-detail
+                             borders, holes subtracted)
+                 rings       per country, its rings as delta-encoded
+                             [x, y, dx, dy, ...] integers
+                 grid        --cell-degree cells from (-180, -90), run-length
+                             encoded as [value, run, ...]: -1 is no country,
+                             k >= 0 is a cell wholly inside country k, and
+                             -2 - j points at candidates[j], the countries
+                             whose borders touch that cell plus the one
+                             around its centre
+    index.ts     loader with countryAt(lon, lat), nearestCountries(lon, lat)
+                 and getCountryInfo(a3)
+
+countryAt() is one grid lookup, plus a point-in-polygon test against the
+one or two candidates only when the tap lands on a border cell.
+nearestCountries() walks outward ring by ring of cells and measures exact
+distances only for the countries it meets.
+
+    python scripts/build_country_index.py
+    python scripts/build_country_index.py --query 2.35 48.86 --query -74 40.7
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import build_trace
+from build_geo import ROOT, SOURCE_PATH, Simplifier, _polygons
+from content_manifest import Manifest, hash_file, write_if_changed
+
+INDEX_DIR = os.path.join(ROOT, 'data', 'country-index')
+BUILD_VERSION = 1
+DEFAULT_TOLERANCE = 0.02
+DEFAULT_CELL = 2.0
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+WEST, SOUTH = -180.0, -90.0
+
+
+def ring_area(ring: np.ndarray) -> float:
+    """Signed spherical area of a closed [lon, lat] ring, km^2."""
+    lon, lat = np.radians(ring[:-1, 0]), np.radians(ring[:-1, 1])
+    return float(np.sum((np.roll(lon, -1) - np.roll(lon, 1)) * np.sin(lat)) * EARTH_RADIUS_KM ** 2 / 2)
+
+
+def ring_centroid(ring: np.ndarray) -> Tuple[float, float]:
+    x, y = ring[:, 0], ring[:, 1]
+    cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+    a = cross.sum() / 2
+    if a == 0:
+        return float(x.mean()), float(y.mean())
+    return float(((x[:-1] + x[1:]) * cross).sum() / (6 * a)), float(((y[:-1] + y[1:]) * cross).sum() / (6 * a))
+
+
+def country_row(feature: dict) -> dict:
+    props = feature.get('properties') or {}
+    polygons = [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon] for polygon in _polygons(feature['geometry'])]
+    areas = [abs(ring_area(p[0])) - sum(abs(ring_area(h)) for h in p[1:]) for p in polygons]
+    points = np.concatenate([ring for polygon in polygons for ring in polygon])
+    lon, lat = ring_centroid(polygons[int(np.argmax(areas))][0])
+    return {
+        'a3': props.get('ADM0_A3'),
+        'iso2': props.get('ISO_A2'),
+        'name': props.get('NAME'),
+        'bbox': [round(float(v), 4) for v in (*points.min(axis=0), *points.max(axis=0))],
+        'centroid': [round(lon, 4), round(lat, 4)],
+        'area': round(sum(areas)),
+    }
+
+
+def _edges(rings: List[np.ndarray]) -> np.ndarray:
+    """(n, 4) array of x1, y1, x2, y2 over all rings."""
+    return np.concatenate([np.hstack([r[:-1], r[1:]]) for r in rings])
+
+
+def contains(edges: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Even-odd point-in-polygon for many points against one country's edges."""
+    x1, y1, x2, y2 = (edges[:, i][None, :] for i in range(4))
+    px, py = points[:, 0:1], points[:, 1:2]
+    straddles = (y1 > py) != (y2 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cross_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(straddles & (px < cross_x), axis=1) % 2 == 1
+
+
+def segment_distance_km(edges: np.ndarray, lon: float, lat: float) -> float:
+    """Distance from a point to the nearest edge, equirectangular around the point."""
+    scale = math.cos(math.radians(lat))
+    dx1 = ((edges[:, 0] - lon + 180) % 360 - 180) * scale
+    dx2 = ((edges[:, 2] - lon + 180) % 360 - 180) * scale
+    dy1, dy2 = edges[:, 1] - lat, edges[:, 3] - lat
+    ex, ey = dx2 - dx1, dy2 - dy1
+    length = ex * ex + ey * ey
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip(np.where(length > 0, -(dx1 * ex + dy1 * ey) / length, 0), 0, 1)
+    return float(np.hypot(dx1 + t * ex, dy1 + t * ey).min()) * KM_PER_DEGREE
+
+
+def build_grid(country_edges: List[np.ndarray], cell: float) -> Tuple[np.ndarray, List[List[int]]]:
+    cols, rows = int(math.ceil(360 / cell)), int(math.ceil(180 / cell))
+    grid = np.full(rows * cols, -1, dtype=np.int64)
+
+    # Border cells: every cell an edge's bounding box touches (a superset of
+    # the cells the edge crosses, which only costs an extra candidate).
+    pairs = []
+    for c, edges in enumerate(country_edges):
+        fx = (edges[:, [0, 2]] - WEST) / cell
+        fy = (edges[:, [1, 3]] - SOUTH) / cell
+        x0 = np.clip(np.floor(fx.min(axis=1)), 0, cols - 1).astype(np.int64)
+        x1 = np.clip(np.floor(fx.max(axis=1)), 0, cols - 1).astype(np.int64)
+        y0 = np.clip(np.floor(fy.min(axis=1)), 0, rows - 1).astype(np.int64)
+        y1 = np.clip(np.floor(fy.max(axis=1)), 0, rows - 1).astype(np.int64)
+        w, n = x1 - x0 + 1, (x1 - x0 + 1) * (y1 - y0 + 1)
+        offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        ww = np.repeat(w, n)
+        cells = (np.repeat(y0, n) + offset // ww) * cols + np.repeat(x0, n) + offset % ww
+        pairs.append(np.unique(cells) * len(country_edges) + c)
+    is_border = np.zeros(rows * cols, dtype=bool)
+    is_border[np.concatenate(pairs) // len(country_edges)] = True
+
+    # Every cell is tested at its centre. A cell no border crosses is wholly
+    # inside that country (or none); a border cell that only the bounding box
+    # superset marked can still be wholly inside it, so it joins the candidates.
+    centres = np.column_stack([
+        WEST + (np.arange(rows * cols) % cols + 0.5) * cell,
+        SOUTH + (np.arange(rows * cols) // cols + 0.5) * cell,
+    ])
+    for c, edges in enumerate(country_edges):
+        lo, hi = edges[:, [0, 1]].min(axis=0), edges[:, [0, 1]].max(axis=0)
+        near = np.flatnonzero(np.all((centres >= lo) & (centres <= hi), axis=1))
+        if len(near):
+            grid[near[contains(edges, centres[near])]] = c
+    inside = np.flatnonzero((grid >= 0) & is_border)
+    pairs.append(inside * len(country_edges) + grid[inside])
+    pairs = np.unique(np.concatenate(pairs))
+    border_cell, border_country = pairs // len(country_edges), pairs % len(country_edges)
+
+    candidates: List[List[int]] = []
+    lists: Dict[Tuple[int, ...], int] = {}
+    starts = np.flatnonzero(np.r_[True, border_cell[1:] != border_cell[:-1]])
+    for cell_id, group in zip(border_cell[starts].tolist(), np.split(border_country, starts[1:])):
+        key = tuple(group.tolist())
+        if key not in lists:
+            lists[key] = len(candidates)
+            candidates.append(list(key))
+        grid[cell_id] = -2 - lists[key]
+    return grid, candidates
+
+
+def run_length(values: np.ndarray) -> List[int]:
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    runs = np.diff(np.r_[starts, len(values)])
+    return np.column_stack([values[starts], runs]).ravel().tolist()
+
+
+def build_index(features: List[dict], tolerance: float, cell: float) -> dict:
+    with build_trace.span('simplify'):
+        simplifier = Simplifier(features)
+        arcs = simplifier.arcs(tolerance)
+        quantizer = simplifier.quantizer
+        quantized = [[ring for polygon in simplifier.polygons(f, arcs) for ring in polygon] for f in range(len(features))]
+    with build_trace.span('grid') as span:
+        grid, candidates = build_grid([_edges([quantizer.dequantize(r) for r in rings]) for rings in quantized], cell)
+        span.count('candidate_lists', len(candidates))
+
+    encoded = []
+    for rings in quantized:
+        country = []
+        for ring in rings:
+            delta = ring.copy()
+            delta[1:] -= ring[:-1]
+            country.append(delta.ravel().tolist())
+        encoded.append(country)
+    return {
+        'version': BUILD_VERSION,
+        'transform': {'scale': quantizer.scale.tolist(), 'translate': quantizer.lo.tolist()},
+        'countries': [country_row(f) for f in features],
+        'rings': encoded,
+        'grid': {
+            'cell': cell,
+            'cols': int(math.ceil(360 / cell)),
+            'rows': int(math.ceil(180 / cell)),
+            'cells': run_length(grid),
+            'candidates': candidates,
+        },
+    }
+
+
+class CountryIndex:
+    """Python twin of index.ts, used for --query and to check the build."""
+
+    def __init__(self, index: dict):
+        self.countries = index['countries']
+        scale, translate = np.array(index['transform']['scale']), np.array(index['transform']['translate'])
+        self.edges = []
+        for rings in index['rings']:
+            decoded = [np.cumsum(np.array(r, dtype=np.int64).reshape(-1, 2), axis=0) * scale + translate for r in rings]
+            self.edges.append(_edges(decoded))
+        grid = index['grid']
+        self.cell, self.cols, self.rows = grid['cell'], grid['cols'], grid['rows']
+        values, runs = np.array(grid['cells'][0::2]), np.array(grid['cells'][1::2])
+        self.grid = np.repeat(values, runs)
+        self.candidates = grid['candidates']
+
+    def _cell_countries(self, cx: int, cy: int) -> List[int]:
+        value = int(self.grid[cy * self.cols + cx])
+        if value >= 0:
+            return [value]
+        return self.candidates[-2 - value] if value <= -2 else []
+
+    def _cell_of(self, lon: float, lat: float) -> Tuple[int, int]:
+        cx = min(int((lon - WEST) // self.cell), self.cols - 1)
+        cy = min(max(int((lat - SOUTH) // self.cell), 0), self.rows - 1)
+        return cx % self.cols, cy
+
+    def locate(self, lon: float, lat: float) -> Optional[int]:
+        cx, cy = self._cell_of(lon, lat)
+        value = int(self.grid[cy * self.cols + cx])
+        if value > -2:
+            return value if value >= 0 else None
+        point = np.array([[lon, lat]])
+        for c in self.candidates[-2 - value]:
+            if contains(self.edges[c], point)[0]:
+                return c
+        return None
+
+    def nearest(self, lon: float, lat: float, k: int = 5) -> List[Tuple[int, float]]:
+        """The k nearest countries by distance to their border (0 if inside), in km."""
+        cx, cy = self._cell_of(lon, lat)
+        found: set = set()
+        radius, extra = 0, None
+        while radius <= max(self.cols // 2, self.rows):
+            for dy in range(-radius, radius + 1):
+                y = cy + dy
+                if not 0 <= y < self.rows:
+                    continue
+                step = 1 if abs(dy) == radius else 2 * radius or 1
+                for dx in range(-radius, radius + 1, step):
+                    found.update(self._cell_countries((cx + dx) % self.cols, y))
+            # Once k are found, one more ring catches countries just across a cell edge.
+            if extra is None and len(found) >= k:
+                extra = radius + 1
+            if extra is not None and radius >= extra:
+                break
+            radius += 1
+        inside = self.locate(lon, lat)
+        ranked = sorted((0.0 if c == inside else segment_distance_km(self.edges[c], lon, lat), c) for c in found)
+        return [(c, d) for d, c in ranked[:k]]
+
+
+def render_loader() -> str:
+    return """// Generated by scripts/build_country_index.py. Do not edit.
+
+export type CountryInfo = {
+  a3: string;
+  iso2: string;
+  name: string;
+  bbox: [number, number, number, number]; // west, south, east, north
+  centroid: [number, number]; // lon, lat
+  area: number; // km^2
+};
+
+export type NearbyCountry = { country: CountryInfo; km: number };
+
+type CountryIndexFile = {
+  transform: { scale: [number, number]; translate: [number, number] };
+  countries: CountryInfo[];
+  rings: number[][][];
+  grid: { cell: number; cols: number; rows: number; cells: number[]; candidates: number[][] };
+};
+
+type LoadedIndex = {
+  countries: CountryInfo[];
+  byA3: Map<string, CountryInfo>;
+  edges: Float64Array[]; // per country: x1, y1, x2, y2 per edge
+  cell: number;
+  cols: number;
+  rows: number;
+  grid: Int32Array;
+  candidates: number[][];
+};
+
+const KM_PER_DEGREE = (Math.PI * 6371.0088) / 180;
+let loaded: LoadedIndex | null = null;
+
+function load(): LoadedIndex {
+  if (loaded) return loaded;
+  const file: CountryIndexFile = require('./index.json');
+  const [sx, sy] = file.transform.scale;
+  const [tx, ty] = file.transform.translate;
+  const edges = file.rings.map((rings) => {
+    const count = rings.reduce((n, r) => n + r.length / 2 - 1, 0);
+    const out = new Float64Array(count * 4);
+    let e = 0;
+    for (const ring of rings) {
+      let x = 0;
+      let y = 0;
+      for (let i = 0; i < ring.length; i += 2) {
+        const px = x;
+        const py = y;
+        x += ring[i];
+        y += ring[i + 1];
+        if (i > 0) {
+          out.set([px * sx + tx, py * sy + ty, x * sx + tx, y * sy + ty], e);
+          e += 4;
+        }
+      }
+    }
+    return out;
+  });
+  const { cell, cols, rows, cells, candidates } = file.grid;
+  const grid = new Int32Array(cols * rows);
+  for (let i = 0, at = 0; i < cells.length; i += 2) {
+    grid.fill(cells[i], at, at + cells[i + 1]);
+    at += cells[i + 1];
+  }
+  loaded = {
+    countries: file.countries,
+    byA3: new Map(file.countries.map((c) => [c.a3, c])),
+    edges,
+    cell,
+    cols,
+    rows,
+    grid,
+    candidates,
+  };
+  return loaded;
+}
+
+function contains(edges: Float64Array, lon: number, lat: number): boolean {
+  let inside = false;
+  for (let e = 0; e < edges.length; e += 4) {
+    const x1 = edges[e];
+    const y1 = edges[e + 1];
+    const x2 = edges[e + 2];
+    const y2 = edges[e + 3];
+    if (y1 > lat !== y2 > lat && lon < x1 + ((lat - y1) * (x2 - x1)) / (y2 - y1)) {
+      inside = !inside;
+    }
+  }
+  return inside;
+}
+
+function wrap(dx: number): number {
+  return ((((dx + 180) % 360) + 360) % 360) - 180;
+}
+
+function distanceKm(edges: Float64Array, lon: number, lat: number): number {
+  const scale = Math.cos((lat * Math.PI) / 180);
+  let best = Infinity;
+  for (let e = 0; e < edges.length; e += 4) {
+    const ax = wrap(edges[e] - lon) * scale;
+    const ay = edges[e + 1] - lat;
+    const ex = wrap(edges[e + 2] - lon) * scale - ax;
+    const ey = edges[e + 3] - lat - ay;
+    const length = ex * ex + ey * ey;
+    const t = length > 0 ? Math.min(1, Math.max(0, -(ax * ex + ay * ey) / length)) : 0;
+    best = Math.min(best, Math.hypot(ax + t * ex, ay + t * ey));
+  }
+  return best * KM_PER_DEGREE;
+}
+
+function cellOf(index: LoadedIndex, lon: number, lat: number): [number, number] {
+  const cx = Math.min(Math.floor((lon + 180) / index.cell), index.cols - 1);
+  const cy = Math.min(Math.max(Math.floor((lat + 90) / index.cell), 0), index.rows - 1);
+  return [((cx % index.cols) + index.cols) % index.cols, cy];
+}
+
+function cellCountries(index: LoadedIndex, cx: number, cy: number): number[] {
+  const value = index.grid[cy * index.cols + cx];
+  if (value >= 0) return [value];
+  return value <= -2 ? index.candidates[-2 - value] : [];
+}
+
+function locate(index: LoadedIndex, lon: number, lat: number): number {
+  const [cx, cy] = cellOf(index, lon, lat);
+  const value = index.grid[cy * index.cols + cx];
+  if (value > -2) return value;
+  for (const c of index.candidates[-2 - value]) {
+    if (contains(index.edges[c], lon, lat)) return c;
+  }
+  return -1;
+}
+
+/** The country containing a point, or null over the sea. */
+export function countryAt(lon: number, lat: number): CountryInfo | null {
+  const index = load();
+  const c = locate(index, lon, lat);
+  return c >= 0 ? index.countries[c] : null;
+}
+
+/** The `k` nearest countries by distance to their border (0 when inside), nearest first. */
+export function nearestCountries(lon: number, lat: number, k = 5): NearbyCountry[] {
+  const index = load();
+  const [cx, cy] = cellOf(index, lon, lat);
+  const found = new Set<number>();
+  let extra = -1;
+  for (let radius = 0; radius <= Math.max(index.cols >> 1, index.rows); radius++) {
+    for (let dy = -radius; dy <= radius; dy++) {
+      const y = cy + dy;
+      if (y < 0 || y >= index.rows) continue;
+      const step = Math.abs(dy) === radius ? 1 : 2 * radius || 1;
+      for (let dx = -radius; dx <= radius; dx += step) {
+        const x = (((cx + dx) % index.cols) + index.cols) % index.cols;
+        cellCountries(index, x, y).forEach((c) => found.add(c));
+      }
+    }
+    // Once k are found, one more ring catches countries just across a cell edge.
+    if (extra < 0 && found.size >= k) extra = radius + 1;
+    if (extra >= 0 && radius >= extra) break;
+  }
+  const inside = locate(index, lon, lat);
+  return Array.from(found)
+    .map((c) => ({
+      country: index.countries[c],
+      km: c === inside ? 0 : distanceKm(index.edges[c], lon, lat),
+    }))
+    .sort((a, b) => a.km - b.km)
+    .slice(0, k);
+}
+
+/** bbox, centroid and area for an ADM0_A3 code. */
+export function getCountryInfo(a3: string): CountryInfo | undefined {
+  return load().byA3.get(a3);
+}
+"""
+
+
+def build(source: str, out_dir: str, tolerance: float, cell: float) -> Tuple[dict, Dict[str, bool]]:
+    with build_trace.span('load') as span:
+        with open(source, 'r', encoding='utf-8') as f:
+            span.read(source, os.fstat(f.fileno()).st_size)
+            features = json.load(f)['features']
+    index = build_index(features, tolerance, cell)
+    with build_trace.span('write'):
+        outputs = {
+            'index.json': json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+            'index.ts': render_loader().encode('utf-8'),
+        }
+        written = {name: write_if_changed(os.path.join(out_dir, name), data) for name, data in outputs.items()}
+    return index, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the country bbox/centroid table and grid index.')
+    parser.add_argument('--source', default=SOURCE_PATH)
+    parser.add_argument('--out', default=INDEX_DIR)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='border simplification, degrees')
+    parser.add_argument('--cell-degree', type=float, default=DEFAULT_CELL, help='grid cell size, degrees')
+    parser.add_argument('--force', action='store_true', help='rebuild even if nothing changed')
+    parser.add_argument('--query', action='append', default=[], nargs=2, type=float, metavar=('LON', 'LAT'),
+                        help='a point to look up in the built index (repeatable)')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('build_country_index', args):
+        cache = Manifest('country_index')
+        inputs = {
+            'version': BUILD_VERSION,
+            'source': hash_file(args.source),
+            'tolerance': args.tolerance,
+            'cell': args.cell_degree,
+        }
+        out = os.path.relpath(os.path.abspath(args.out), ROOT)
+        index_path = os.path.join(args.out, 'index.json')
+        if not args.force and cache.get(out) == inputs and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            print(f"Country index in {out} is up to date.")
+        else:
+            index, written = build(args.source, args.out, args.tolerance, args.cell_degree)
+            cache.set(out, inputs)
+            cache.save()
+            grid = index['grid']
+            border = sum(run for value, run in zip(grid['cells'][0::2], grid['cells'][1::2]) if value <= -2)
+            print(
+                f"Indexed {len(index['countries'])} countries on a {grid['cols']}x{grid['rows']} grid "
+                f"({border} border cells, {len(grid['candidates'])} candidate lists, "
+                f"{os.path.getsize(index_path) / 1024:.0f}KB{', written' if written['index.json'] else ', unchanged'}) "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+
+    if args.query:
+        lookup = CountryIndex(index)
+        for lon, lat in args.query:
+            query_started = time.perf_counter()
+            inside = lookup.locate(lon, lat)
+            nearby = lookup.nearest(lon, lat)
+            elapsed = (time.perf_counter() - query_started) * 1000
+            here = lookup.countries[inside]['name'] if inside is not None else '(sea)'
+            near = ', '.join(f"{lookup.countries[c]['name']} {d:.0f}km" for c, d in nearby)
+            print(f"{lon:g},{lat:g}: {here}; nearest {near} ({elapsed:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+Slim down assets/countries.json for the map: property whitelist,
+quantization, topology-preserving simplification, optional TopoJSON.
+
+Pipeline (all coordinate work is NumPy over whole arrays):
+
+  1. properties are cut to --keep (default: what MapScreenImpl.tsx and
+     countriesApi.ts read, plus ADM0_A3)
+  2. coordinates are quantized onto a --quantization grid (TopoJSON style
+     scale/translate); consecutive duplicates are dropped
+  3. rings are cut into shared arcs at junctions (points where rings
+     diverge), and identical arcs are stored once, so a border between two
+     countries is simplified once and neighbours never gap or overlap
+  4. every arc point gets an importance (Douglas-Peucker split distance,
+     or Visvalingam effective area with --method visvalingam), computed
+     once; each tolerance is then a vectorized mask over it. Arcs keep
+     enough points that no ring collapses below a triangle.
+
+Output (data/geo/, generated, not committed):
+
+    countries.geo.json           GeoJSON at the first --tolerance
+    countries.<tol>.topo.json    with --topojson, one TopoJSON topology per
+                                 tolerance (delta-encoded integer arcs)
+
+Tolerances are in degrees for both methods; Visvalingam compares triangle
+areas, so its threshold is the tolerance squared (done internally, pass
+the same values either way). Files are only rewritten when their bytes
+change, and countries.*.json files from tolerances or flags no longer
+asked for are removed.
+
+    python scripts/build_geo.py
+    python scripts/build_geo.py --topojson --tolerance 0.01 0.05 0.2
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+import build_trace
+from content_manifest import remove_stale, write_if_changed
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SOURCE_PATH = os.path.join(ROOT, 'assets', 'countries.json')
+GEO_DIR = os.path.join(ROOT, 'data', 'geo')
+DEFAULT_KEEP = ['NAME', 'FORMAL_EN', 'ISO_A2', 'ADM0_A3', 'CONTINENT', 'REGION_UN', 'SUBREGION', 'POP_EST']
+DEFAULT_TOLERANCES = [0.02]
+DEFAULT_QUANTIZATION = 100000
+
+
+def _polygons(geometry: dict) -> List[List[list]]:
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"unsupported geometry type {geometry['type']}")
+
+
+class Quantizer:
+    def __init__(self, features: List[dict], q: int):
+        points = np.array([pt[:2] for f in features for poly in _polygons(f['geometry']) for ring in poly for pt in ring])
+        self.q = q
+        self.lo = points.min(axis=0)
+        hi = points.max(axis=0)
+        self.scale = np.where(hi > self.lo, (hi - self.lo) / (q - 1), 1.0)
+
+    def quantize(self, ring: list) -> np.ndarray:
+        pts = np.rint((np.asarray(ring, dtype=np.float64)[:, :2] - self.lo) / self.scale).astype(np.int64)
+        keep = np.ones(len(pts), dtype=bool)
+        keep[1:] = np.any(pts[1:] != pts[:-1], axis=1)
+        return pts[keep]
+
+    def dequantize(self, pts: np.ndarray) -> np.ndarray:
+        return pts * self.scale + self.lo
+
+    @property
+    def decimals(self) -> int:
+        return max(0, int(math.ceil(-math.log10(float(self.scale.min())))))
+
+
+class Topology:
+    """Rings cut into deduplicated arcs. Ring = list of arc refs (~i for reversed)."""
+
+    def __init__(self, rings: List[np.ndarray], q: int):
+        self.q = q
+        self.arcs: List[np.ndarray] = []
+        self._index: Dict[bytes, int] = {}
+        junctions = self._junctions(rings)
+        self.rings = [self._cut(ring, junctions) for ring in rings]
+
+    def _key(self, pts: np.ndarray) -> np.ndarray:
+        return pts[:, 0] * (self.q + 1) + pts[:, 1]
+
+    def _junctions(self, rings: List[np.ndarray]) -> set:
+        """Points reached with different neighbours in different places."""
+        keys, lows, highs = [], [], []
+        for ring in rings:
+            k = self._key(ring[:-1])
+            prev, nxt = np.roll(k, 1), np.roll(k, -1)
+            keys.append(k)
+            lows.append(np.minimum(prev, nxt))
+            highs.append(np.maximum(prev, nxt))
+        k, lo, hi = np.concatenate(keys), np.concatenate(lows), np.concatenate(highs)
+        order = np.lexsort((hi, lo, k))
+        k, lo, hi = k[order], lo[order], hi[order]
+        new_point = np.ones(len(k), dtype=bool)
+        new_point[1:] = k[1:] != k[:-1]
+        new_pair = new_point.copy()
+        new_pair[1:] |= (lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])
+        starts = np.flatnonzero(new_point)
+        distinct = np.add.reduceat(new_pair.astype(np.int64), starts)
+        return set(k[starts[distinct > 1]].tolist())
+
+    def _ref(self, arc: np.ndarray, closed: bool) -> int:
+        if closed:
+            # Same closed ring from any start point or direction -> one arc.
+            body = arc[:-1]
+            keys = self._key(body)
+            start = int(np.argmin(keys))
+            forward = np.concatenate([np.roll(body, -start, axis=0), body[start:start + 1]])
+            rev_body = body[::-1]
+            rstart = int(np.argmin(self._key(rev_body)))
+            backward = np.concatenate([np.roll(rev_body, -rstart, axis=0), rev_body[rstart:rstart + 1]])
+        else:
+            forward, backward = arc, arc[::-1]
+        fkey, bkey = forward.tobytes(), backward.tobytes()
+        if fkey in self._index:
+            return self._index[fkey]
+        if bkey in self._index:
+            return ~self._index[bkey]
+        self._index[fkey] = len(self.arcs)
+        self.arcs.append(np.ascontiguousarray(forward))
+        return len(self.arcs) - 1
+
+    def _cut(self, ring: np.ndarray, junctions: set) -> List[int]:
+        body = ring[:-1]
+        keys = self._key(body).tolist()
+        cuts = [i for i, key in enumerate(keys) if key in junctions]
+        if not cuts:
+            return [self._ref(ring, closed=True)]
+        body = np.roll(body, -cuts[0], axis=0)
+        cuts = [c - cuts[0] for c in cuts] + [len(body)]
+        closed_body = np.concatenate([body, body[:1]])
+        return [self._ref(closed_body[a:b + 1], closed=False) for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+def douglas_peucker_importance(pts: np.ndarray) -> np.ndarray:
+    """Each point's DP split distance, capped by its parent's so masks nest."""
+    n = len(pts)
+    importance = np.zeros(n)
+    importance[0] = importance[-1] = np.inf
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        a, b, cap = stack.pop()
+        if b - a < 2:
+            continue
+        seg = pts[a + 1:b]
+        p, d = pts[a], pts[b] - pts[a]
+        length = math.hypot(d[0], d[1])
+        if length == 0:
+            dist = np.hypot(seg[:, 0] - p[0], seg[:, 1] - p[1])
+        else:
+            dist = np.abs(d[0] * (seg[:, 1] - p[1]) - d[1] * (seg[:, 0] - p[0])) / length
+        k = int(np.argmax(dist))
+        value = min(float(dist[k]), cap)
+        importance[a + 1 + k] = value
+        stack.append((a, a + 1 + k, value))
+        stack.append((a + 1 + k, b, value))
+    return importance
+
+
+def visvalingam_importance(pts: np.ndarray) -> np.ndarray:
+    """Effective triangle area at which each point would be removed (monotonic)."""
+    n = len(pts)
+    importance = np.full(n, np.inf)
+    if n < 3:
+        return importance
+    x, y = pts[:, 0], pts[:, 1]
+    area = np.full(n, np.inf)
+    area[1:-1] = np.abs((x[:-2] - x[2:]) * (y[1:-1] - y[:-2]) - (x[:-2] - x[1:-1]) * (y[2:] - y[:-2])) / 2
+    prev, nxt = list(range(-1, n - 1)), list(range(1, n + 1))
+    heap = [(area[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    removed = np.zeros(n, dtype=bool)
+    floor = 0.0
+    while heap:
+        a, i = heapq.heappop(heap)
+        if removed[i] or a != area[i]:
+            continue
+        removed[i] = True
+        floor = max(floor, a)
+        importance[i] = floor
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                pj, qj = prev[j], nxt[j]
+                area[j] = abs((x[pj] - x[qj]) * (y[j] - y[pj]) - (x[pj] - x[j]) * (y[qj] - y[pj])) / 2
+                heapq.heappush(heap, (area[j], j))
+    return importance
+
+
+def arc_importance(topology: Topology, quantizer: Quantizer, method: str) -> List[np.ndarray]:
+    compute = visvalingam_importance if method == 'visvalingam' else douglas_peucker_importance
+    importance = [compute(quantizer.dequantize(arc)) for arc in topology.arcs]
+    # A ring of n arcs has n junction points; make sure it keeps at least 3 distinct points.
+    need = [0] * len(topology.arcs)
+    for ring in topology.rings:
+        per_arc = {1: 2, 2: 1}.get(len(ring), 0)
+        for ref in ring:
+            i = ref if ref >= 0 else ~ref
+            need[i] = max(need[i], per_arc)
+    for i, k in enumerate(need):
+        interior = importance[i][1:-1]
+        if k and len(interior):
+            interior[np.argsort(-interior, kind='stable')[:k]] = np.inf
+    return importance
+
+
+def _ring_points(ring: List[int], arcs: List[np.ndarray]) -> np.ndarray:
+    parts = []
+    for n, ref in enumerate(ring):
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        parts.append(arc if n == 0 else arc[1:])
+    return np.concatenate(parts)
+
+
+class Simplifier:
+    """Quantized, arc-cut geometry for a feature list, simplifiable at any tolerance."""
+
+    def __init__(self, features: List[dict], quantization: int = DEFAULT_QUANTIZATION, method: str = 'douglas-peucker'):
+        self.quantizer = Quantizer(features, quantization)
+        self.method = method
+        rings: List[np.ndarray] = []
+        self.shapes = []  # per feature: list of polygons, each a list of ring numbers
+        for feature in features:
+            polygons = []
+            for polygon in _polygons(feature['geometry']):
+                numbers = []
+                for ring in polygon:
+                    pts = self.quantizer.quantize(ring)
+                    if len(pts) >= 4:
+                        numbers.append(len(rings))
+                        rings.append(pts)
+                if numbers:
+                    polygons.append(numbers)
+            self.shapes.append(polygons)
+        self.ring_count = len(rings)
+        self.topology = Topology(rings, quantization)
+        self.importance = arc_importance(self.topology, self.quantizer, method)
+
+    @property
+    def points(self) -> int:
+        return int(sum(len(a) for a in self.topology.arcs))
+
+    def arcs(self, tolerance: float) -> List[np.ndarray]:
+        """Arcs keeping the points at or above `tolerance` degrees (its square as an area for Visvalingam)."""
+        threshold = tolerance ** 2 if self.method == 'visvalingam' else tolerance
+        return [arc[imp >= threshold] for arc, imp in zip(self.topology.arcs, self.importance)]
+
+    def polygons(self, feature: int, arcs: List[np.ndarray]) -> List[List[np.ndarray]]:
+        """A feature's polygons as lists of closed, quantized rings."""
+        return [[_ring_points(self.topology.rings[r], arcs) for r in polygon] for polygon in self.shapes[feature]]
+
+
+def build(source: str, keep: List[str], quantization: int, tolerances: List[float], method: str, topojson: bool):
+    with build_trace.span('load') as span:
+        with open(source, 'r', encoding='utf-8') as f:
+            span.read(source, os.fstat(f.fileno()).st_size)
+            collection = json.load(f)
+        features = collection['features']
+    with build_trace.span('topology') as span:
+        simplifier = Simplifier(features, quantization, method)
+        span.count('arcs', len(simplifier.topology.arcs))
+    properties = [{k: f['properties'].get(k) for k in keep if k in (f.get('properties') or {})} for f in features]
+
+    outputs: Dict[str, bytes] = {}
+    stats = []
+    with build_trace.span('simplify'):
+        for level, tolerance in enumerate(tolerances):
+            arcs = simplifier.arcs(tolerance)
+            if level == 0:
+                outputs['countries.geo.json'] = _geojson(simplifier, arcs, properties)
+            if topojson:
+                outputs[f'countries.{tolerance:g}.topo.json'] = _topojson(simplifier, arcs, properties)
+            stats.append((tolerance, sum(len(a) for a in arcs)))
+    return outputs, {
+        'features': len(features),
+        'rings': simplifier.ring_count,
+        'arcs': len(simplifier.topology.arcs),
+        'points': simplifier.points,
+        'levels': stats,
+    }
+
+
+def _geojson(simplifier: Simplifier, arcs: List[np.ndarray], properties: List[dict]) -> bytes:
+    quantizer = simplifier.quantizer
+    out = []
+    for feature, props in enumerate(properties):
+        coords = [
+            [np.round(quantizer.dequantize(ring), quantizer.decimals).tolist() for ring in polygon]
+            for polygon in simplifier.polygons(feature, arcs)
+        ]
+        geometry = {'type': 'Polygon', 'coordinates': coords[0]} if len(coords) == 1 else \
+            {'type': 'MultiPolygon', 'coordinates': coords}
+        out.append({'type': 'Feature', 'properties': props, 'geometry': geometry})
+    doc = {'type': 'FeatureCollection', 'features': out}
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _topojson(simplifier: Simplifier, arcs: List[np.ndarray], properties: List[dict]) -> bytes:
+    quantizer = simplifier.quantizer
+    geometries = []
+    for polygons, props in zip(simplifier.shapes, properties):
+        refs = [[simplifier.topology.rings[r] for r in polygon] for polygon in polygons]
+        if len(refs) == 1:
+            geometries.append({'type': 'Polygon', 'arcs': refs[0], 'properties': props})
+        else:
+            geometries.append({'type': 'MultiPolygon', 'arcs': refs, 'properties': props})
+    encoded = []
+    for arc in arcs:
+        delta = arc.copy()
+        delta[1:] -= arc[:-1]
+        encoded.append(delta.tolist())
+    doc = {
+        'type': 'Topology',
+        'transform': {'scale': quantizer.scale.tolist(), 'translate': quantizer.lo.tolist()},
+        'objects': {'countries': {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded,
+    }
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simplify and quantize the countries GeoJSON.')
+    parser.add_argument('--source', default=SOURCE_PATH)
+    parser.add_argument('--out', default=GEO_DIR)
+    parser.add_argument('--keep', default=','.join(DEFAULT_KEEP), help='comma-separated properties to keep')
+    parser.add_argument('--quantization', type=int, default=DEFAULT_QUANTIZATION, help='grid size per axis')
+    parser.add_argument('--tolerance', type=float, nargs='+', default=DEFAULT_TOLERANCES,
+                        help='degrees (squared internally for visvalingam)')
+    parser.add_argument('--method', choices=('douglas-peucker', 'visvalingam'), default='douglas-peucker')
+    parser.add_argument('--topojson', action='store_true', help='also write one TopoJSON file per tolerance')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    keep = [k.strip() for k in args.keep.split(',') if k.strip()]
+    with build_trace.run('build_geo', args):
+        outputs, stats = build(args.source, keep, args.quantization, args.tolerance, args.method, args.topojson)
+        with build_trace.span('write'):
+            written = [name for name, data in outputs.items() if write_if_changed(os.path.join(args.out, name), data)]
+            removed = remove_stale(args.out, outputs, 'countries.*.json')
+
+    source_size = os.path.getsize(args.source)
+    for tolerance, points in stats['levels']:
+        print(f"tolerance {tolerance:<8g} {points:>7} of {stats['points']} points ({points / stats['points']:.0%})")
+    for name, data in sorted(outputs.items()):
+        print(f"{len(data) / 1024:8.1f}KB  {name}{'  (written)' if name in written else ''}")
+    for name in removed:
+        print(f"{'':10}{name}  (removed)")
+    print(
+        f"{stats['features']} features, {stats['rings']} rings, {stats['arcs']} shared arcs: "
+        f"{source_size / 1024:.0f}KB -> {len(outputs['countries.geo.json']) / 1024:.0f}KB GeoJSON "
+        f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+"""
+Build the pantry-matching index: normalized ingredient -> recipes.
+
+Recipes come from the same sources (and the same first-copy-wins dedupe) as
+build_recipe_shards. Output (data/ingredient-index/, generated, not committed):
+
+    index.json   recipes      idMeal table, sorted; a recipe's number is its
+                              position here
+                 ingredients  normalized names, sorted
+                 postings     per ingredient, the sorted recipe numbers that
+                              use it, delta-encoded
+                 recipeIngredients
+                              per recipe, its sorted ingredient numbers,
+                              delta-encoded (the sparse form of its bitmap)
+                 synonyms     synonym -> canonical name, from
+                              canonicalize_ingredients.py if it has been run
+    index.ts     loader that expands recipeIngredients into fixed-width
+                 Uint32Array bitmaps once, and findRecipesForPantry(), which
+                 takes candidate recipes from the postings of the pantry's
+                 ingredients and scores each with an AND + popcount
+
+So "recipes I can make with >= 80% of my pantry" costs one pass over the
+postings of the pantry's ingredients, not a scan of every recipe.
+
+    python scripts/build_ingredient_index.py
+    python scripts/build_ingredient_index.py --query "onion, garlic, rice, salt" --min-coverage 0.8
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+import build_trace
+from build_recipe_shards import ROOT, SOURCES, collect
+from content_manifest import Manifest, hash_file, write_if_changed
+
+INDEX_DIR = os.path.join(ROOT, 'data', 'ingredient-index')
+SYNONYMS_PATH = os.path.join(INDEX_DIR, 'synonyms.json')
+BUILD_VERSION = 2
+
+_PAREN_RE = re.compile(r'\([^)]*\)')
+_SPACE_RE = re.compile(r'\s+')
+_TRAILING = '.,;:'
+
+
+def normalize_ingredient(name: str) -> str:
+    """'Smen (aged butter) ' -> 'smen'. Mirrored by normalizeIngredient() in index.ts."""
+    name = _PAREN_RE.sub(' ', name.lower())
+    return _SPACE_RE.sub(' ', name).strip().strip(_TRAILING).strip()
+
+
+def recipe_ingredients(recipe: dict) -> List[str]:
+    """Ingredient names from either the `ingredients` list or TheMealDB's strIngredientN."""
+    names = [i.get('name') or '' for i in recipe.get('ingredients') or [] if isinstance(i, dict)]
+    if not names:
+        names = [recipe.get(f'strIngredient{n}') or '' for n in range(1, 21)]
+    return [n for n in names if n.strip()]
+
+
+def load_synonyms(path: str = SYNONYMS_PATH) -> Dict[str, str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _deltas(values: Iterable[int]) -> List[int]:
+    out, prev = [], 0
+    for v in values:
+        out.append(v - prev)
+        prev = v
+    return out
+
+
+def build_index(recipes: List[dict], synonyms: Dict[str, str] = None) -> dict:
+    synonyms = synonyms or {}
+    by_id = {}
+    for recipe in recipes:
+        by_id.setdefault(str(recipe.get('idMeal')), recipe)
+    recipe_ids = sorted(by_id)
+    per_recipe = []
+    for r in recipe_ids:
+        names = {normalize_ingredient(n) for n in recipe_ingredients(by_id[r])}
+        per_recipe.append(sorted({synonyms.get(n, n) for n in names} - {''}))
+    ingredients = sorted({name for names in per_recipe for name in names})
+    number = {name: i for i, name in enumerate(ingredients)}
+
+    postings: List[List[int]] = [[] for _ in ingredients]
+    recipe_ingredient_ids = []
+    for r, names in enumerate(per_recipe):
+        ids = sorted(number[n] for n in names)
+        recipe_ingredient_ids.append(ids)
+        for i in ids:
+            # Recipes are visited in order, so every postings list comes out sorted.
+            postings[i].append(r)
+
+    return {
+        'version': BUILD_VERSION,
+        'recipes': recipe_ids,
+        'ingredients': ingredients,
+        'postings': [_deltas(p) for p in postings],
+        'recipeIngredients': [_deltas(ids) for ids in recipe_ingredient_ids],
+        'synonyms': {k: v for k, v in sorted(synonyms.items()) if v in number},
+    }
+
+
+class PantryIndex:
+    """NumPy view of index.json, used for --query and by other build steps."""
+
+    def __init__(self, index: dict):
+        self.recipes: List[str] = index['recipes']
+        self.ingredients: List[str] = index['ingredients']
+        self.number = {name: i for i, name in enumerate(self.ingredients)}
+        self.synonyms: Dict[str, str] = index.get('synonyms', {})
+        self.postings = [np.cumsum(p, dtype=np.int32) for p in index['postings']]
+        words = (len(self.ingredients) + 63) // 64
+        self.bitmaps = np.zeros((len(self.recipes), max(words, 1)), dtype=np.uint64)
+        for r, deltas in enumerate(index['recipeIngredients']):
+            ids = np.cumsum(deltas, dtype=np.int64)
+            np.bitwise_or.at(self.bitmaps[r], ids // 64, np.left_shift(np.uint64(1), (ids % 64).astype(np.uint64)))
+        self.sizes = np.bitwise_count(self.bitmaps).sum(axis=1)
+
+    def match(self, pantry: Iterable[str], min_coverage: float = 0.8) -> List[Tuple[str, float]]:
+        """(idMeal, share of the recipe's ingredients in the pantry), best first."""
+        names = {normalize_ingredient(p) for p in pantry}
+        ids = [self.number[n] for n in {self.synonyms.get(n, n) for n in names} if n in self.number]
+        if not ids:
+            return []
+        candidates = np.unique(np.concatenate([self.postings[i] for i in ids]))
+        mask = np.zeros(self.bitmaps.shape[1], dtype=np.uint64)
+        for i in ids:
+            mask[i // 64] |= np.uint64(1) << np.uint64(i % 64)
+        have = np.bitwise_count(self.bitmaps[candidates] & mask).sum(axis=1)
+        coverage = have / self.sizes[candidates]
+        keep = coverage >= min_coverage
+        order = np.argsort(-coverage[keep], kind='stable')
+        return [(self.recipes[r], float(c)) for r, c in zip(candidates[keep][order], coverage[keep][order])]
+
+
+def render_loader() -> str:
+    return """// Generated by scripts/build_ingredient_index.py. Do not edit.
+
+type IngredientIndexFile = {
+  recipes: string[];
+  ingredients: string[];
+  postings: number[][];
+  recipeIngredients: number[][];
+  synonyms: Record<string, string>;
+};
+
+export type PantryMatch = { idMeal: string; coverage: number; missing: number };
+
+type LoadedIndex = {
+  recipes: string[];
+  ingredientNumber: Map<string, number>;
+  synonyms: Record<string, string>;
+  postings: Int32Array[];
+  bitmaps: Uint32Array;
+  words: number;
+  sizes: Uint16Array;
+};
+
+let loaded: LoadedIndex | null = null;
+
+function undelta(deltas: number[]): Int32Array {
+  const out = new Int32Array(deltas.length);
+  let value = 0;
+  for (let i = 0; i < deltas.length; i++) {
+    value += deltas[i];
+    out[i] = value;
+  }
+  return out;
+}
+
+function popcount(x: number): number {
+  x -= (x >>> 1) & 0x55555555;
+  x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+  return (((x + (x >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+function load(): LoadedIndex {
+  if (loaded) return loaded;
+  const file: IngredientIndexFile = require('./index.json');
+  const words = Math.max(1, Math.ceil(file.ingredients.length / 32));
+  const bitmaps = new Uint32Array(file.recipes.length * words);
+  const sizes = new Uint16Array(file.recipes.length);
+  file.recipeIngredients.forEach((deltas, r) => {
+    const ids = undelta(deltas);
+    for (let k = 0; k < ids.length; k++) {
+      bitmaps[r * words + (ids[k] >>> 5)] |= 1 << (ids[k] & 31);
+    }
+    sizes[r] = ids.length;
+  });
+  loaded = {
+    recipes: file.recipes,
+    ingredientNumber: new Map(file.ingredients.map((name, i) => [name, i])),
+    synonyms: file.synonyms,
+    postings: file.postings.map(undelta),
+    bitmaps,
+    words,
+    sizes,
+  };
+  return loaded;
+}
+
+/** Must stay in sync with normalize_ingredient() in the build script. */
+export function normalizeIngredient(name: string): string {
+  return name
+    .toLowerCase()
+    .replace(/\\([^)]*\\)/g, ' ')
+    .replace(/\\s+/g, ' ')
+    .trim()
+    .replace(/^[.,;:]+|[.,;:]+$/g, '')
+    .trim();
+}
+
+/** Recipes whose ingredients are at least `minCoverage` covered by the pantry, best first. */
+export function findRecipesForPantry(
+  pantry: string[],
+  minCoverage = 0.8
+): PantryMatch[] {
+  const index = load();
+  const mask = new Uint32Array(index.words);
+  const candidates = new Set<number>();
+  for (const item of pantry) {
+    const name = normalizeIngredient(item);
+    const i = index.ingredientNumber.get(index.synonyms[name] ?? name);
+    if (i === undefined) continue;
+    mask[i >>> 5] |= 1 << (i & 31);
+    index.postings[i].forEach((r) => candidates.add(r));
+  }
+
+  const matches: PantryMatch[] = [];
+  candidates.forEach((r) => {
+    let have = 0;
+    const offset = r * index.words;
+    for (let w = 0; w < index.words; w++) {
+      have += popcount(index.bitmaps[offset + w] & mask[w]);
+    }
+    const coverage = have / index.sizes[r];
+    if (coverage >= minCoverage) {
+      matches.push({
+        idMeal: index.recipes[r],
+        coverage,
+        missing: index.sizes[r] - have,
+      });
+    }
+  });
+  return matches.sort((a, b) => b.coverage - a.coverage || a.missing - b.missing);
+}
+"""
+
+
+def build(sources: List[str] = SOURCES, out_dir: str = INDEX_DIR) -> Tuple[dict, Dict[str, bool]]:
+    by_area, _ = collect(sources)
+    return write_index([r for recipes in by_area.values() for r in recipes], out_dir)
+
+
+def write_index(recipes: List[dict], out_dir: str = INDEX_DIR) -> Tuple[dict, Dict[str, bool]]:
+    with build_trace.span('index') as span:
+        index = build_index(recipes, load_synonyms())
+        span.count('ingredients', len(index['ingredients']))
+    with build_trace.span('write'):
+        outputs = {
+            'index.json': json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+            'index.ts': render_loader().encode('utf-8'),
+        }
+        written = {name: write_if_changed(os.path.join(out_dir, name), data) for name, data in outputs.items()}
+    return index, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the inverted ingredient index for pantry matching.')
+    parser.add_argument('sources', nargs='*', default=SOURCES)
+    parser.add_argument('--out', default=INDEX_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild even if no source changed')
+    parser.add_argument('--query', help='comma-separated pantry to match against the built index')
+    parser.add_argument('--min-coverage', type=float, default=0.8)
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('build_ingredient_index', args):
+        cache = Manifest('ingredient_index')
+        inputs = {
+            'version': BUILD_VERSION,
+            'sources': {os.path.relpath(p, ROOT): hash_file(p) for p in args.sources},
+            'synonyms': hash_file(SYNONYMS_PATH) if os.path.exists(SYNONYMS_PATH) else None,
+        }
+        out = os.path.relpath(os.path.abspath(args.out), ROOT)
+        index_path = os.path.join(args.out, 'index.json')
+        if not args.force and cache.get(out) == inputs and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            print(f"Ingredient index in {out} is up to date.")
+        else:
+            index, written = build(args.sources, args.out)
+            cache.set(out, inputs)
+            cache.save()
+            postings = sum(len(p) for p in index['postings'])
+            print(
+                f"Indexed {len(index['ingredients'])} ingredients ({len(index['synonyms'])} synonyms) across {len(index['recipes'])} recipes "
+                f"({postings} postings, {os.path.getsize(index_path) / 1024:.0f}KB"
+                f"{', written' if written['index.json'] else ', unchanged'}) "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+
+    if args.query:
+        pantry = [p for p in args.query.split(',') if p.strip()]
+        query_started = time.perf_counter()
+        matches = PantryIndex(index).match(pantry, args.min_coverage)
+        for recipe_id, coverage in matches[:25]:
+            print(f"{coverage:6.0%}  {recipe_id}")
+        print(
+            f"{len(matches)} recipes at >= {args.min_coverage:.0%} coverage "
+            f"in {(time.perf_counter() - query_started) * 1000:.1f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Split the recipe corpus into one compact JSON shard per country.
+
+Recipes come from merge_recipes (data/recipes-seed.json, then
+app/recipe/recipies.json, deduped by idMeal and by area + meal name with its
+conflict policy). Output (data/recipes/, generated, not committed):
+
+    <slug>.json    compact JSON array of the country's recipes, sorted by idMeal;
+                   every ingredient with an amount carries a parsed "q"
+                   (see recipe_measures)
+    manifest.json  per country: file, bytes, recipe count, sha256
+    index.ts       lazy loaders keyed by strArea, so a country screen only
+                   parses its own shard
+
+Shard files are only rewritten when their bytes change, stale shards are
+removed, and the whole build is skipped when no source changed since the
+last run (scripts/.cache/recipe_shards.json); --force rebuilds anyway.
+
+    python scripts/build_recipe_shards.py
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Callable, Dict, List, Tuple
+
+import build_trace
+from content_manifest import Manifest, hash_bytes, hash_file, write_if_changed
+from merge_recipes import SOURCES, iter_merged, plan_merge
+from recipe_measures import attach_measures
+from recipe_stream import read_corpus
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SHARDS_DIR = os.path.join(ROOT, 'data', 'recipes')
+BUILD_VERSION = 4
+
+
+def slugify(area: str) -> str:
+    """'Côte d'Ivoire' -> 'cote-d-ivoire'; stable file names for Metro's require()."""
+    ascii_name = unicodedata.normalize('NFKD', area).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-') or 'unknown'
+
+
+def _dump(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def collect(sources: List[str], reader: Callable = read_corpus) -> Tuple[Dict[str, List[dict]], Dict[str, int]]:
+    """area -> recipes, plus read/duplicate/dropped counts across all sources."""
+    with build_trace.span('merge') as span:
+        plan = plan_merge(sources, reader)
+        by_area: Dict[str, List[dict]] = {}
+        for recipe in iter_merged(plan):
+            by_area.setdefault(recipe.get('strArea') or 'Unknown', []).append(recipe)
+        span.count('records', plan.read)
+    kept = sum(len(recipes) for recipes in by_area.values())
+    counts = {'read': plan.read, 'duplicate': plan.read - kept, 'dropped': plan.dropped}
+    for recipes in by_area.values():
+        recipes.sort(key=lambda r: str(r.get('idMeal')))
+    return by_area, counts
+
+
+def render_loader(files: Dict[str, str]) -> str:
+    loaders = '\n'.join(
+        f"  {json.dumps(area, ensure_ascii=False)}: () => require('./{name}'),"
+        for area, name in sorted(files.items())
+    )
+    return f"""// Generated by scripts/build_recipe_shards.py. Do not edit.
+
+import type {{ Recipe }} from '@/types';
+
+const loaders: Record<string, () => Recipe[]> = {{
+{loaders}
+}};
+
+export const RECIPE_SHARD_AREAS = Object.keys(loaders);
+
+export function hasRecipeShard(area: string): boolean {{
+  return area in loaders;
+}}
+
+/** The bundled recipes for one strArea, or [] if there is no shard for it. */
+export function loadRecipeShard(area: string): Recipe[] {{
+  const load = loaders[area];
+  return load ? load() : [];
+}}
+"""
+
+
+def build(sources: List[str] = SOURCES, out_dir: str = SHARDS_DIR) -> Tuple[Dict[str, dict], Dict[str, int]]:
+    by_area, counts = collect(sources)
+    return write_shards(by_area, counts, out_dir)
+
+
+def write_shards(by_area: Dict[str, List[dict]], counts: Dict[str, int], out_dir: str = SHARDS_DIR):
+    """Annotate, encode and write the shards of an already collected corpus."""
+    with build_trace.span('measures'):
+        attach_measures([r for recipes in by_area.values() for r in recipes])
+
+    outputs: Dict[str, bytes] = {}
+    files: Dict[str, str] = {}
+    used = set()
+    for area in sorted(by_area):
+        slug = slugify(area)
+        name, n = f'{slug}.json', 2
+        while name in used:
+            name, n = f'{slug}-{n}.json', n + 1
+        used.add(name)
+        files[area] = name
+        outputs[name] = _dump(by_area[area])
+
+    manifest = {'version': BUILD_VERSION, 'recipes': sum(len(r) for r in by_area.values()), 'areas': {}}
+    for area, name in files.items():
+        manifest['areas'][area] = {
+            'file': name,
+            'bytes': len(outputs[name]),
+            'recipes': len(by_area[area]),
+            'sha256': hash_bytes(outputs[name]),
+        }
+    outputs['manifest.json'] = json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8') + b'\n'
+    outputs['index.ts'] = render_loader(files).encode('utf-8')
+
+    with build_trace.span('write'):
+        written = {name for name, data in outputs.items() if write_if_changed(os.path.join(out_dir, name), data)}
+    for name in os.listdir(out_dir):
+        if name.endswith('.json') and name not in outputs:
+            os.remove(os.path.join(out_dir, name))
+            counts['removed'] = counts.get('removed', 0) + 1
+
+    report = {area: dict(manifest['areas'][area], written=files[area] in written) for area in files}
+    return report, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build per-country recipe shards.')
+    parser.add_argument('sources', nargs='*', default=SOURCES)
+    parser.add_argument('--out', default=SHARDS_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild even if no source changed')
+    parser.add_argument('-v', '--verbose', action='store_true', help='list every shard')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('build_recipe_shards', args):
+        cache = Manifest('recipe_shards')
+        inputs = {
+            'version': BUILD_VERSION,
+            'sources': {os.path.relpath(p, ROOT): hash_file(p) for p in args.sources},
+        }
+        out = os.path.relpath(os.path.abspath(args.out), ROOT)
+        if (
+            not args.force
+            and cache.get(out) == inputs
+            and os.path.exists(os.path.join(args.out, 'manifest.json'))
+        ):
+            print(f"Recipe shards in {out} are up to date ({(time.perf_counter() - started) * 1000:.0f}ms).")
+            return
+
+        report, counts = build(args.sources, args.out)
+        cache.set(out, inputs)
+        cache.save()
+
+    total_bytes = sum(row['bytes'] for row in report.values())
+    largest = max(report.values(), key=lambda row: row['bytes'], default=None)
+    if args.verbose:
+        for area, row in sorted(report.items(), key=lambda item: -item[1]['bytes']):
+            print(
+                f"{row['bytes'] / 1024:7.1f}KB  {row['recipes']:>4} recipes  {area}"
+                f"{'  (written)' if row['written'] else ''}"
+            )
+    source_bytes = sum(os.path.getsize(p) for p in args.sources)
+    print(
+        f"Sharded {counts['read'] - counts['duplicate']} recipes into {len(report)} countries "
+        f"({counts['duplicate']} duplicates skipped, {counts['dropped']} unreadable, "
+        f"{sum(r['written'] for r in report.values())} shards written, {counts.get('removed', 0)} removed): "
+        f"{source_bytes / 1024:.0f}KB -> {total_bytes / 1024:.0f}KB, "
+        f"largest {largest['bytes'] / 1024 if largest else 0:.1f}KB, "
+        f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
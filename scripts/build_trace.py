@@ -0,0 +1,287 @@
+"""
+Timing spans and I/O accounting shared by the build scripts.
+
+A script wraps its work in one run and a span per phase:
+
+    with build_trace.run('build_translations', args):
+        with build_trace.span('parse') as s:
+            ...
+            s.count('locales', len(catalogs))
+
+Each span records wall time, CPU time (this process plus pool workers once
+they've been reaped), bytes and files read and written, files skipped or
+left unchanged, free-form counters and the peak RSS reached so far. The
+shared helpers report their own I/O to whatever span is open, so
+content_manifest.write_if_changed, hash_file and translation_catalog's
+load_catalog are accounted for without threading anything through.
+
+Nothing is printed or written unless asked, so the scripts' own reports
+stay as they were:
+
+    --timings / BUILD_TIMINGS=1      span tree on stderr when the run ends
+    --trace F / BUILD_TRACE=F        append JSON lines (one per span, one
+                                     per file touched) to F
+    --profile D / BUILD_PROFILE=D    cProfile each top-level phase into
+                                     D/<script>.<phase>.prof
+
+The environment variables let a whole pipeline (an EAS prebuild hook
+running several scripts) share one trace file:
+
+    BUILD_TRACE=/tmp/prebuild.jsonl BUILD_TIMINGS=1 npx expo prebuild
+    python scripts/build_trace.py /tmp/prebuild.jsonl
+
+Spans only see the main process; work done inside a ProcessPoolExecutor
+shows up in its span's CPU time and in whatever the parent records from
+the results.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+TRACE_ENV = 'BUILD_TRACE'
+TIMINGS_ENV = 'BUILD_TIMINGS'
+PROFILE_ENV = 'BUILD_PROFILE'
+
+
+def _cpu_seconds() -> float:
+    if resource is None:
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water RSS of this process or its largest reaped child, in MB."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _rel(path: str) -> str:
+    path = os.path.abspath(path)
+    return os.path.relpath(path, ROOT) if path.startswith(ROOT + os.sep) else path
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional['Span'] = None, tracer: Optional['Tracer'] = None):
+        self.name = name
+        self.parent = parent
+        self.path = f'{parent.path}/{name}' if parent else name
+        self.depth = parent.depth + 1 if parent else 0
+        self.children: List['Span'] = []
+        self.files: Counter = Counter()
+        self.counts: Counter = Counter()
+        self.bytes_read = self.bytes_written = 0
+        self.wall = self.cpu = 0.0
+        self.peak_rss_mb: Optional[float] = None
+        self._tracer = tracer
+        self._lock = threading.Lock()
+
+    def read(self, path: str, nbytes: int):
+        with self._lock:
+            self.bytes_read += nbytes
+            self.files['read'] += 1
+        self._file('read', path, nbytes)
+
+    def wrote(self, path: str, nbytes: int, changed: bool = True):
+        with self._lock:
+            self.files['written' if changed else 'unchanged'] += 1
+            if changed:
+                self.bytes_written += nbytes
+        self._file('write', path, nbytes, changed=changed)
+
+    def skipped(self, n: int = 1):
+        """Files not processed at all (up to date in a cache manifest)."""
+        if not n:
+            return
+        with self._lock:
+            self.files['skipped'] += n
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def _file(self, op: str, path: str, nbytes: int, **extra):
+        if self._tracer is not None:
+            self._tracer.emit({'type': 'file', 'span': self.path, 'op': op, 'path': _rel(path), 'bytes': nbytes, **extra})
+
+    def record(self) -> dict:
+        return {
+            'type': 'span',
+            'span': self.path,
+            'depth': self.depth,
+            'wall': round(self.wall, 4),
+            'cpu': round(self.cpu, 4),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'files': dict(self.files),
+            'counts': dict(self.counts),
+            'peak_rss_mb': self.peak_rss_mb,
+        }
+
+
+class Tracer:
+    def __init__(self, script: str, trace_path: Optional[str] = None, timings: bool = False,
+                 profile_dir: Optional[str] = None):
+        self.script = script
+        self.trace_path = trace_path
+        self.timings = timings
+        self.profile_dir = profile_dir
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.stack: List[Span] = []
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        if self.trace_path is None:
+            return
+        line = json.dumps({'run': self.run_id, 'script': self.script, **record}, ensure_ascii=False)
+        with self._lock:
+            self._lines.append(line)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        parent = self.stack[-1] if self.stack else None
+        current = Span(name, parent, self)
+        if parent is not None:
+            parent.children.append(current)
+        profiler = None
+        if self.profile_dir and current.depth == 1:
+            profiler = cProfile.Profile()
+        self.stack.append(current)
+        started, cpu = time.perf_counter(), _cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield current
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{self.script}.{name.replace('/', '_')}.prof"))
+            current.wall = time.perf_counter() - started
+            current.cpu = _cpu_seconds() - cpu
+            current.peak_rss_mb = peak_rss_mb()
+            self.stack.pop()
+            if parent is not None:
+                parent.bytes_read += current.bytes_read
+                parent.bytes_written += current.bytes_written
+                parent.files.update(current.files)
+            self.emit(current.record())
+
+    def finish(self, root: Span):
+        if self.trace_path is not None and self._lines:
+            os.makedirs(os.path.dirname(os.path.abspath(self.trace_path)), exist_ok=True)
+            with open(self.trace_path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(self._lines) + '\n')
+        if self.timings:
+            for line in format_tree(root):
+                print(line.rstrip(), file=sys.stderr)
+
+
+def format_span(s: Span) -> str:
+    files = ' '.join(f'{n} {kind}' for kind, n in sorted(s.files.items()))
+    counts = ' '.join(f'{k}={v}' for k, v in s.counts.items())
+    peak = f'{s.peak_rss_mb:6.0f}MB' if s.peak_rss_mb is not None else f"{'':8}"
+    return (
+        f"{'  ' * s.depth + s.name:<32} {s.wall:8.3f}s {s.cpu:8.3f}s cpu {peak}  "
+        f"{s.bytes_read / 1024:9.1f}KB in {s.bytes_written / 1024:9.1f}KB out  {files}{'  ' + counts if counts else ''}"
+    )
+
+
+def format_tree(root: Span) -> List[str]:
+    lines = [format_span(root)]
+    for child in root.children:
+        lines.extend(format_tree(child))
+    return lines
+
+
+_tracer: Optional[Tracer] = None
+_detached = Span('detached')
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument('--timings', action='store_true', default=None, help='print the span tree to stderr')
+    group.add_argument('--trace', help=f'append JSON-lines spans to this file (or ${TRACE_ENV})')
+    group.add_argument('--profile', help=f'dump a cProfile per phase into this directory (or ${PROFILE_ENV})')
+
+
+@contextmanager
+def run(script: str, args: Optional[argparse.Namespace] = None) -> Iterator[Span]:
+    """The outermost span of a script. Options come from add_arguments or the environment."""
+    global _tracer
+    tracer = Tracer(
+        script,
+        trace_path=getattr(args, 'trace', None) or os.environ.get(TRACE_ENV) or None,
+        timings=bool(getattr(args, 'timings', None) or os.environ.get(TIMINGS_ENV)),
+        profile_dir=getattr(args, 'profile', None) or os.environ.get(PROFILE_ENV) or None,
+    )
+    previous, _tracer = _tracer, tracer
+    try:
+        with tracer.span(script) as root:
+            yield root
+    finally:
+        _tracer = previous
+        tracer.finish(root)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """A phase of the current run; outside any run it measures nothing and costs nothing."""
+    if _tracer is None:
+        yield _detached
+        return
+    with _tracer.span(name) as s:
+        yield s
+
+
+def current() -> Span:
+    """The innermost open span, for helpers that report their own I/O."""
+    if _tracer is None or not _tracer.stack:
+        return _detached
+    return _tracer.stack[-1]
+
+
+def summarize(path: str) -> List[str]:
+    """Top-level spans from a trace file, slowest first, tagged with their script."""
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('type') == 'span' and record['depth'] <= 1:
+                spans.append(record)
+    spans.sort(key=lambda r: (-r['wall'], r['span']))
+    return [
+        f"{r['wall']:8.2f}s {r['cpu']:8.2f}s cpu  {r['bytes_read'] / 1024:9.0f}KB in {r['bytes_written'] / 1024:9.0f}KB out  "
+        f"{'' if r['depth'] == 0 else '  '}{r['span']}"
+        for r in spans
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a build trace, slowest phases first.')
+    parser.add_argument('trace')
+    parser.add_argument('-n', type=int, default=30, help='rows to show')
+    args = parser.parse_args()
+    for line in summarize(args.trace)[:args.n]:
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Compile constants/translations/*.ts into compact per-locale JSON bundles.
+
+Output (constants/translations/compiled/, generated, not committed):
+
+    keys.json      the interned key table, in en.ts order
+    en.json        English values aligned with keys.json
+    xx.json        values aligned with keys.json; null where the locale
+                   falls back to English (missing, or identical to en)
+    manifest.json  bytes / sha256 / override counts per locale
+    index.ts       lazy loaders, so the app only parses the active language
+
+Values with {{placeholders}} are stored pre-tokenized, so the app joins
+segments instead of scanning strings on every render:
+
+    'Bon retour, {{name}}!'  ->  ["Bon retour, ", "name", "!"]
+
+Literals sit at even indexes and placeholder names at odd ones; plain
+values stay strings. A translation whose placeholders differ from en.ts
+would render a raw {{...}} or drop a value, so it is left out (the app
+shows English) and reported; --strict makes that fail the build.
+
+Keys that don't exist in en.ts can't be looked up through t() and are
+dropped. Files are only rewritten when their bytes change.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import build_trace
+from content_manifest import hash_bytes, write_if_changed
+from translation_catalog import (
+    BASE_LOCALE, PLACEHOLDER_RE, TRANSLATIONS_DIR, Catalog, load_catalog, locale_files, placeholders,
+)
+
+COMPILED_DIR = os.path.join(TRANSLATIONS_DIR, 'compiled')
+
+Template = Union[str, List[str]]
+
+
+def _dump(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def tokenize(value: str) -> Template:
+    """'Hi {{name}}!' -> ['Hi ', 'name', '!']; values without placeholders stay strings."""
+    segments = PLACEHOLDER_RE.split(value)
+    return segments if len(segments) > 1 else value
+
+
+def slots(template: Template) -> set:
+    return set(template[1::2]) if isinstance(template, list) else set()
+
+
+def compile_locale(catalog: Catalog, keys: List[str], base_values: List[Template]) -> Tuple[List[Optional[Template]], List[str]]:
+    """(values aligned with `keys`, keys whose placeholders differ from en).
+
+    None marks an English fallback, which is also what a mismatched value gets.
+    """
+    values: List[Optional[Template]] = []
+    mismatched: List[str] = []
+    for key, base_value in zip(keys, base_values):
+        value = catalog.get(key)
+        if value is None:
+            values.append(None)
+            continue
+        if placeholders(value) != slots(base_value):
+            mismatched.append(key)
+            values.append(None)
+            continue
+        template = tokenize(value)
+        values.append(None if template == base_value else template)
+    # Trailing fallbacks cost bytes for nothing: the loader treats a short
+    # array the same as one padded with nulls.
+    while values and values[-1] is None:
+        values.pop()
+    return values, mismatched
+
+
+def render_loader(locales: List[str]) -> str:
+    union = '\n'.join(f"  | '{locale}'" for locale in locales)
+    loaders = '\n'.join(f"  {locale}: () => require('./{locale}.json')," for locale in locales)
+    return f"""// Generated by scripts/build_translations.py. Do not edit.
+
+export type CompiledLanguage =
+{union};
+
+// A plain string, or [literal, name, literal, ..., literal] for values
+// with {{{{placeholders}}}}.
+export type CompiledTemplate = string | string[];
+
+type CompiledValues = (CompiledTemplate | null)[];
+
+const KEYS: string[] = require('./keys.json');
+
+const loaders: Record<CompiledLanguage, () => CompiledValues> = {{
+{loaders}
+}};
+
+const cache: Partial<Record<CompiledLanguage, Record<string, CompiledTemplate>>> = {{}};
+
+export function loadCompiledLocale(
+  lang: CompiledLanguage
+): Record<string, CompiledTemplate> {{
+  const cached = cache[lang];
+  if (cached) return cached;
+
+  const base = loaders.{BASE_LOCALE}() as CompiledTemplate[];
+  const values = lang === '{BASE_LOCALE}' ? base : loaders[lang]();
+  const table: Record<string, CompiledTemplate> = {{}};
+  for (let i = 0; i < KEYS.length; i++) {{
+    table[KEYS[i]] = values[i] ?? base[i];
+  }}
+  cache[lang] = table;
+  return table;
+}}
+
+export function formatCompiled(
+  template: CompiledTemplate,
+  params?: Record<string, string | number>
+): string {{
+  if (typeof template === 'string') return template;
+
+  let out = template[0];
+  for (let i = 1; i < template.length; i += 2) {{
+    const value = params?.[template[i]];
+    out += (value === undefined ? `{{{{${{template[i]}}}}}}` : String(value)) + template[i + 1];
+  }}
+  return out;
+}}
+"""
+
+
+def build(directory: str = TRANSLATIONS_DIR, out_dir: str = COMPILED_DIR) -> Dict[str, dict]:
+    with build_trace.span('base'):
+        base = load_catalog(os.path.join(directory, f'{BASE_LOCALE}.ts'))
+        keys = [k for k in base.keys() if base.get(k) is not None]
+        base_values = [tokenize(base.get(k)) for k in keys]
+
+    outputs = {'keys.json': _dump(keys), f'{BASE_LOCALE}.json': _dump(base_values)}
+    report = {
+        BASE_LOCALE: {
+            'source_bytes': os.path.getsize(os.path.join(directory, f'{BASE_LOCALE}.ts')),
+            'overrides': len(keys),
+            'fallbacks': 0,
+            'stripped': 0,
+            'mismatched': [],
+        }
+    }
+    key_set = set(keys)
+    with build_trace.span('compile') as span:
+        for locale, path in locale_files(directory):
+            catalog = load_catalog(path)
+            values, mismatched = compile_locale(catalog, keys, base_values)
+            overrides = sum(v is not None for v in values)
+            outputs[f'{locale}.json'] = _dump(values)
+            report[locale] = {
+                'source_bytes': os.path.getsize(path),
+                'overrides': overrides,
+                'fallbacks': len(keys) - overrides,
+                'stripped': len([k for k in catalog.keys() if k not in key_set]),
+                'mismatched': mismatched,
+            }
+            span.count('locales')
+            span.count('templates', sum(isinstance(v, list) for v in values))
+            span.count('mismatched', len(mismatched))
+
+    manifest = {'base': BASE_LOCALE, 'keys': len(keys), 'locales': {}}
+    for locale in sorted(report):
+        data = outputs[f'{locale}.json']
+        report[locale]['compiled_bytes'] = len(data)
+        manifest['locales'][locale] = {
+            'file': f'{locale}.json',
+            'bytes': len(data),
+            'sha256': hash_bytes(data),
+            'overrides': report[locale]['overrides'],
+        }
+    outputs['manifest.json'] = json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8') + b'\n'
+    outputs['index.ts'] = render_loader(sorted(report)).encode('utf-8')
+
+    with build_trace.span('write'):
+        written = [name for name, data in outputs.items() if write_if_changed(os.path.join(out_dir, name), data)]
+    for locale in report:
+        report[locale]['written'] = f'{locale}.json' in written
+    return report
+
+
+def build_locale(locale: str, directory: str = TRANSLATIONS_DIR, out_dir: str = COMPILED_DIR) -> Optional[dict]:
+    """Recompile one locale against the compiled English bundle.
+
+    Returns the locale's report row, or None when that isn't enough: en.ts
+    itself, a locale the bundle doesn't know yet, or no usable bundle.
+    """
+    if locale == BASE_LOCALE:
+        return None
+    try:
+        with open(os.path.join(out_dir, 'keys.json'), 'r', encoding='utf-8') as f:
+            keys = json.load(f)
+        with open(os.path.join(out_dir, f'{BASE_LOCALE}.json'), 'r', encoding='utf-8') as f:
+            base_values = json.load(f)
+        with open(os.path.join(out_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if locale not in manifest.get('locales', {}):
+        return None
+
+    path = os.path.join(directory, f'{locale}.ts')
+    catalog = load_catalog(path)
+    values, mismatched = compile_locale(catalog, keys, base_values)
+    data = _dump(values)
+    overrides = sum(v is not None for v in values)
+    key_set = set(keys)
+    manifest['locales'][locale] = {
+        'file': f'{locale}.json',
+        'bytes': len(data),
+        'sha256': hash_bytes(data),
+        'overrides': overrides,
+    }
+    written = write_if_changed(os.path.join(out_dir, f'{locale}.json'), data)
+    write_if_changed(
+        os.path.join(out_dir, 'manifest.json'),
+        json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8') + b'\n',
+    )
+    return {
+        'source_bytes': os.path.getsize(path),
+        'compiled_bytes': len(data),
+        'overrides': overrides,
+        'fallbacks': len(keys) - overrides,
+        'stripped': len([k for k in catalog.keys() if k not in key_set]),
+        'mismatched': mismatched,
+        'written': written,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile per-locale translation bundles.')
+    parser.add_argument('--dir', default=TRANSLATIONS_DIR)
+    parser.add_argument('--out', default=COMPILED_DIR)
+    parser.add_argument('--strict', action='store_true', help='fail when a placeholder set differs from en')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('build_translations', args):
+        report = build(args.dir, args.out)
+    total_source = total_compiled = 0
+    for locale, row in sorted(report.items()):
+        total_source += row['source_bytes']
+        total_compiled += row['compiled_bytes']
+        print(
+            f"{locale:>4}  {row['source_bytes'] / 1024:6.1f}KB -> {row['compiled_bytes'] / 1024:6.1f}KB  "
+            f"overrides={row['overrides']:<4} fallbacks={row['fallbacks']:<4} stripped={row['stripped']:<3}"
+            f"{'  (written)' if row['written'] else ''}"
+        )
+        for key in row['mismatched']:
+            print(f"      placeholder mismatch, using English: {key}")
+    mismatched = sum(len(row['mismatched']) for row in report.values())
+    print(
+        f"Compiled {len(report)} locales: {total_source / 1024:.0f}KB -> {total_compiled / 1024:.0f}KB "
+        f"({mismatched} placeholder mismatches) in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    if args.strict and mismatched:
+        sys.exit(1)
@@ -0,0 +1,244 @@
+"""
+Cluster near-duplicate ingredient names and emit a synonym -> canonical map.
+
+Every ingredient name in the recipe sources is normalized the same way the
+pantry index does it, then merged in two passes:
+
+  1. exact: names that only differ by a plural on the last word
+     ("tomatoes" / "tomato", "malagueta peppers" / "malagueta pepper")
+  2. fuzzy: a character-trigram inverted index (NumPy postings) gives each
+     name the names it shares trigrams with, and the Dice coefficient over
+     trigram sets is computed for all of them in one vectorized step;
+     nothing is ever compared pairwise against the whole vocabulary
+
+Names are visited most-used first and join the best existing canonical at or
+above --threshold, so clusters can't chain ("chili" -> "chilli" -> "chilie"
+all land on whichever is most common). A fuzzy match must also be a
+spelling variant: same number of words, exactly one word different, and
+that word one or two edits from the other with the same first letter. That
+keeps "lime juice" / "lemon juice", "mustard" / "mustard oil" and "salted butter"
+/ "unsalted butter" apart. Known false pairs that pass both tests ("pepper"
+the spice / "peppers" the vegetable, "sali" / "sili") are listed in
+DISTINCT_PLURALS and DISTINCT_SPELLINGS and never merged.
+
+Output: data/ingredient-index/synonyms.json (generated, not committed),
+{synonym: canonical} for every non-canonical name. build_ingredient_index
+folds it into index.json, applies it before indexing, and its loader applies
+it to pantry input.
+
+    python scripts/canonicalize_ingredients.py -v
+    python scripts/canonicalize_ingredients.py --threshold 0.9
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+import build_trace
+from build_ingredient_index import SYNONYMS_PATH, normalize_ingredient, recipe_ingredients
+from build_recipe_shards import ROOT, SOURCES
+from content_manifest import write_if_changed
+from recipe_stream import read_corpus
+
+CANONICAL_SOURCES = SOURCES + [os.path.join(ROOT, 'scripts', 'missing_recipes.json')]
+DEFAULT_THRESHOLD = 0.8
+
+# Names whose plural is another ingredient: ground pepper / bell peppers,
+# red pepper flakes / red bell peppers, a clove of garlic / the clove spice.
+DISTINCT_PLURALS = {
+    frozenset(('pepper', 'peppers')),
+    frozenset(('red pepper', 'red peppers')),
+    frozenset(('clove', 'cloves')),
+}
+# Words a typo apart that name different things.
+DISTINCT_SPELLINGS = {
+    frozenset(('sali', 'sili')),
+}
+_UNFOLDED = set().union(*DISTINCT_PLURALS)
+
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def singular(word: str) -> str:
+    """Strip an English plural; only used to build merge keys."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith('oes') or word.endswith(('ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def merge_key(name: str) -> str:
+    if name in _UNFOLDED:
+        return name
+    words = name.split(' ')
+    words[-1] = singular(words[-1])
+    return ' '.join(words)
+
+
+def count_names(sources: Iterable[str]) -> Tuple[Counter, Dict[str, int]]:
+    """Normalized ingredient name -> uses, plus names read per source."""
+    counts: Counter = Counter()
+    per_source = {}
+    for path in sources:
+        before = sum(counts.values())
+        records, _ = read_corpus(path)
+        for record in records:
+            for name in recipe_ingredients(record.recipe):
+                normalized = normalize_ingredient(name)
+                if normalized:
+                    counts[normalized] += 1
+        per_source[os.path.relpath(path, ROOT)] = sum(counts.values()) - before
+    return counts, per_source
+
+
+def trigrams(name: str) -> List[str]:
+    padded = f'  {name} '
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class TrigramIndex:
+    """Inverted index trigram -> name ids, queried a whole row at a time."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        grams = [trigrams(n) for n in names]
+        vocab = {g: i for i, g in enumerate(sorted({g for gs in grams for g in gs}))}
+        self.grams = [np.array([vocab[g] for g in gs], dtype=np.int32) for gs in grams]
+        self.sizes = np.array([len(gs) for gs in grams], dtype=np.int32)
+        # CSR postings: gram id -> sorted name ids.
+        gram_ids = np.concatenate(self.grams) if names else np.zeros(0, dtype=np.int32)
+        name_ids = np.repeat(np.arange(len(names), dtype=np.int32), self.sizes)
+        order = np.argsort(gram_ids, kind='stable')
+        self.posting_names = name_ids[order]
+        self.offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(vocab)), out=self.offsets[1:])
+
+    def similar(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(name ids, Dice scores) of every name sharing a trigram with name i."""
+        g = self.grams[i]
+        starts, ends = self.offsets[g], self.offsets[g + 1]
+        hits = np.concatenate([self.posting_names[s:e] for s, e in zip(starts, ends)])
+        ids, shared = np.unique(hits, return_counts=True)
+        scores = 2 * shared / (self.sizes[i] + self.sizes[ids])
+        return ids, scores
+
+
+def _within_edits(a: str, b: str, limit: int) -> bool:
+    if abs(len(a) - len(b)) > limit:
+        return False
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+        if min(row) > limit:
+            return False
+    return row[-1] <= limit
+
+
+def _compatible(a: str, b: str) -> bool:
+    """Spelling variants only: same words but one, and that one a typo away."""
+    if frozenset((a, b)) in DISTINCT_PLURALS:
+        return False
+    wa, wb = a.split(' '), b.split(' ')
+    if len(wa) != len(wb) or _DIGITS_RE.findall(a) != _DIGITS_RE.findall(b):
+        return False
+    differing = [(x, y) for x, y in zip(wa, wb) if x != y]
+    if len(differing) != 1:
+        return False
+    x, y = differing[0]
+    if frozenset((x, y)) in DISTINCT_SPELLINGS:
+        return False
+    # Same first letter keeps prefixes like "unsalted" / "salted" apart.
+    return x[0] == y[0] and min(len(x), len(y)) >= 4 and _within_edits(x, y, 1 if max(len(x), len(y)) < 8 else 2)
+
+
+def canonicalize(counts: Counter, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, str]:
+    """Every name -> its canonical name (canonicals map to themselves)."""
+    # Pass 1: plural-insensitive keys; the most used spelling names the group.
+    by_key: Dict[str, List[str]] = {}
+    for name in counts:
+        by_key.setdefault(merge_key(name), []).append(name)
+    head = {}
+    key_counts = Counter()
+    for key, names in by_key.items():
+        best = max(names, key=lambda n: (counts[n], -len(n), n))
+        key_counts[key] = sum(counts[n] for n in names)
+        for n in names:
+            head[n] = best
+
+    # Pass 2: fuzzy, over one representative per key.
+    keys = sorted(key_counts, key=lambda k: (-key_counts[k], k))
+    index = TrigramIndex(keys)
+    leader: Dict[int, int] = {}
+    for i, key in enumerate(keys):
+        ids, scores = index.similar(i)
+        # Only earlier (more used) keys that are themselves canonical can absorb this one.
+        mask = (ids < i) & (scores >= threshold)
+        best = None
+        for j, score in sorted(zip(ids[mask].tolist(), scores[mask].tolist()), key=lambda t: -t[1]):
+            if leader[j] == j and _compatible(keys[j], key):
+                best = j
+                break
+        leader[i] = best if best is not None else i
+
+    mapping = {}
+    for i, key in enumerate(keys):
+        canonical = head[by_key[keys[leader[i]]][0]]
+        for name in by_key[key]:
+            mapping[name] = canonical
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the ingredient synonym -> canonical map.')
+    parser.add_argument('sources', nargs='*', default=CANONICAL_SOURCES)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='trigram Dice score to merge at')
+    parser.add_argument('--out', default=SYNONYMS_PATH)
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every merged cluster')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('canonicalize_ingredients', args):
+        with build_trace.span('count') as span:
+            counts, per_source = count_names(args.sources)
+            span.count('names', len(counts))
+        with build_trace.span('cluster'):
+            mapping = canonicalize(counts, args.threshold)
+        synonyms = {name: canonical for name, canonical in sorted(mapping.items()) if name != canonical}
+
+        clusters: Dict[str, List[str]] = {}
+        for name, canonical in synonyms.items():
+            clusters.setdefault(canonical, []).append(name)
+        if args.verbose:
+            for canonical in sorted(clusters, key=lambda c: (-counts[c], c)):
+                print(f"{canonical:<32} <- {', '.join(sorted(clusters[canonical]))}")
+        for source, n in per_source.items():
+            print(f"{n:>7} ingredient names  {source}")
+
+        written = False
+        if not args.dry_run:
+            data = json.dumps(synonyms, indent=1, ensure_ascii=False, sort_keys=True).encode('utf-8') + b'\n'
+            written = write_if_changed(args.out, data)
+    print(
+        f"{len(counts)} distinct names -> {len(counts) - len(synonyms)} canonical "
+        f"({len(synonyms)} synonyms in {len(clusters)} clusters"
+        f"{', written' if written else ''}) in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
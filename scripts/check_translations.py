@@ -0,0 +1,120 @@
+"""
+Check every locale in constants/translations against en.ts.
+
+Reports missing, extra and duplicated keys, and keys whose `{{placeholder}}`
+set differs from the English value. Exits non-zero when anything is found,
+so it can run as a pre-commit hook:
+
+    python scripts/check_translations.py                     # all locales
+    python scripts/check_translations.py constants/translations/fr.ts
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+import build_trace
+from translation_catalog import BASE_LOCALE, TRANSLATIONS_DIR, Catalog, load_catalog, locale_files, placeholders
+
+
+@dataclass
+class LocaleDrift:
+    locale: str
+    missing: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    duplicated: List[str] = field(default_factory=list)
+    # key -> {'expected': [...], 'found': [...]}
+    placeholders: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.extra or self.duplicated or self.placeholders)
+
+
+def base_index(base: Catalog):
+    keys = set(base.index)
+    slots = {k: placeholders(e.value) for k, e in base.index.items()}
+    return keys, slots
+
+
+def check_locale(locale: str, catalog: Catalog, base_keys: set, base_slots: Dict[str, set]) -> LocaleDrift:
+    keys = set(catalog.index)
+    drift = LocaleDrift(
+        locale=locale,
+        missing=sorted(base_keys - keys),
+        extra=sorted(keys - base_keys),
+        duplicated=sorted(catalog.duplicates),
+    )
+    for key in keys & base_keys:
+        found = placeholders(catalog.index[key].value)
+        if found != base_slots[key]:
+            drift.placeholders[key] = {'expected': sorted(base_slots[key]), 'found': sorted(found)}
+    return drift
+
+
+def check_all(directory: str = TRANSLATIONS_DIR, only: List[str] = None) -> List[LocaleDrift]:
+    base = load_catalog(os.path.join(directory, f'{BASE_LOCALE}.ts'))
+    base_keys, base_slots = base_index(base)
+    results = []
+    if only is None or BASE_LOCALE in only:
+        results.append(LocaleDrift(BASE_LOCALE, duplicated=sorted(base.duplicates)))
+    for locale, path in locale_files(directory):
+        if only is not None and locale not in only:
+            continue
+        results.append(check_locale(locale, load_catalog(path), base_keys, base_slots))
+    return results
+
+
+def print_report(results: List[LocaleDrift], verbose: bool):
+    for drift in results:
+        if drift.ok:
+            if verbose:
+                print(f"✅ {drift.locale}")
+            continue
+        print(
+            f"❌ {drift.locale}: {len(drift.missing)} missing, {len(drift.extra)} extra, "
+            f"{len(drift.duplicated)} duplicated, {len(drift.placeholders)} placeholder mismatches"
+        )
+        for key in drift.missing:
+            print(f"    missing     {key}")
+        for key in drift.extra:
+            print(f"    extra       {key}")
+        for key in drift.duplicated:
+            print(f"    duplicated  {key}")
+        for key, slots in sorted(drift.placeholders.items()):
+            expected = ', '.join(slots['expected']) or '-'
+            found = ', '.join(slots['found']) or '-'
+            print(f"    placeholder {key}: expected {{{expected}}}, found {{{found}}}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check locale drift against en.ts.')
+    parser.add_argument('files', nargs='*', help='locale files to check (default: all)')
+    parser.add_argument('--dir', default=TRANSLATIONS_DIR)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    only = None
+    if args.files:
+        only = [os.path.splitext(os.path.basename(f))[0] for f in args.files if f.endswith('.ts')]
+
+    started = time.perf_counter()
+    with build_trace.run('check_translations', args) as span:
+        results = check_all(args.dir, only)
+        span.count('locales', len(results))
+        span.count('failing', sum(not r.ok for r in results))
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2, ensure_ascii=False))
+    else:
+        print_report(results, args.verbose)
+        failing = sum(not r.ok for r in results)
+        print(f"Checked {len(results)} locales in {elapsed * 1000:.0f}ms, {failing} with issues.")
+    sys.exit(1 if any(not r.ok for r in results) else 0)
@@ -1,56 +1,22 @@
+import sys
 
-import os
-import re
+import build_trace
+from content_manifest import Manifest
+from locale_batch import BatchError, LocalePatch, run_batch
+from translation_catalog import TRANSLATIONS_DIR, locale_files
 
-directory = r'e:\EXPO Training\taste-the-world\constants\translations'
+directory = TRANSLATIONS_DIR
 
-def cleanup_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Split by the specific comment that marks our new block
-    # We look for the exact comment we added: "  // Premium Benefits"
-    parts = content.split("  // Premium Benefits")
-
-    if len(parts) > 2:
-        print(f"Fixing duplicates in {os.path.basename(filepath)}")
-        # Keep the first part (original content) and the second part (first premium block)
-        # discard subsequent parts which are duplicates
-        
-        # We need to make sure the first premium block is properly closed
-        # The split removes the separator, so we need to add it back to the second part (the first premium block)
-        
-        base_content = parts[0]
-        # The first premium block text (which includes the keys)
-        premium_block = "  // Premium Benefits" + parts[1]
-        
-        # Now we need to ensure the file ends correctly.
-        # The premium block we added ended with "};" (newline)
-        
-        # Let's clean up the premium block to ensure it's just the keys and closing brace
-        # We know exactly what we added.
-        
-        # simpler approach: just find the index of the second occurrence and slice
-        first_occurrence = content.find("  // Premium Benefits")
-        second_occurrence = content.find("  // Premium Benefits", first_occurrence + 1)
-        
-        if second_occurrence != -1:
-             new_content = content[:second_occurrence].rstrip()
-             # Verify it ends with }; or just }
-             if not new_content.strip().endswith('};'):
-                 # It probably ends with a comma if we just sliced it
-                 if new_content.strip().endswith(','):
-                      new_content = new_content.rstrip().rstrip(',') + "\n};"
-                 elif new_content.strip().endswith('}'):
-                      new_content = new_content.rstrip() + ";"
-                 else:
-                      new_content += "\n};"
-             
-             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-             return True
-    return False
-
-for filename in os.listdir(directory):
-    if filename.endswith(".ts") and filename != "en.ts":
-        cleanup_file(os.path.join(directory, filename))
+if __name__ == '__main__':
+    # Every key after its first occurrence is a leftover from a repeated
+    # injection run; drop it (and its comment heading if the whole block goes).
+    patches = [LocalePatch(lang, filepath, dedupe=True) for lang, filepath in locale_files(directory)]
+    try:
+        with build_trace.run('cleanup_translations'):
+            report = run_batch(patches, manifest=Manifest('translations'))
+    except BatchError as e:
+        print(f"Aborted: {e}")
+        sys.exit(1)
+    for result in report.written:
+        print(f"Fixing {len(result.removed_keys)} duplicate keys in {result.locale}.ts")
+    report.print()
@@ -0,0 +1,118 @@
+"""
+Content-hash manifest shared by the build scripts.
+
+Each manifest is a small JSON file under scripts/.cache that maps a name
+(locale, asset path, ...) to the hashes we saw last time. Scripts use it to
+skip work whose inputs haven't changed, and it's only rewritten when an
+entry actually changed, so a no-op run does zero writes.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import build_trace
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+MANIFEST_VERSION = 1
+_CHUNK = 1 << 20
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode('utf-8'))
+
+
+def hash_file(path: str) -> str:
+    """Streaming sha256 so large assets are never loaded whole."""
+    h = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            h.update(chunk)
+            size += len(chunk)
+    build_trace.current().read(path, size)
+    return h.hexdigest()
+
+
+def hash_json(value: Any) -> str:
+    """Stable hash of a JSON-serializable value (key order doesn't matter)."""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hash_text(canonical)
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Write `data` unless the file already holds exactly these bytes."""
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    build_trace.current().wrote(path, len(data), changed=False)
+                    return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    build_trace.current().wrote(path, len(data))
+    return True
+
+
+def remove_stale(directory: str, keep: Iterable[str], pattern: str) -> List[str]:
+    """Delete files in `directory` matching `pattern` that aren't in `keep`. Returns their names."""
+    keep = set(keep)
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    removed = [n for n in names if fnmatch.fnmatch(n, pattern) and n not in keep]
+    for name in removed:
+        os.remove(os.path.join(directory, name))
+    if removed:
+        build_trace.current().count('removed', len(removed))
+    return removed
+
+
+class Manifest:
+    def __init__(self, name: str, directory: str = CACHE_DIR):
+        self.path = os.path.join(directory, f'{name}.json')
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            # Missing or corrupt cache: start over, everything is treated as changed.
+            self.entries = {}
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(name)
+
+    def set(self, name: str, entry: Dict[str, Any]):
+        if self.entries.get(name) != entry:
+            self.entries[name] = entry
+            self._dirty = True
+
+    def remove(self, name: str):
+        if self.entries.pop(name, None) is not None:
+            self._dirty = True
+
+    def save(self) -> bool:
+        if not self._dirty:
+            return False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        return True
@@ -0,0 +1,136 @@
+"""
+Find translation keys that no source file references, and optionally prune
+them from every locale.
+
+Each source file is scanned once with a single combined pattern that picks up
+string literals, template-literal prefixes (`common_meal_${mealType}`) and
+direct `Translations[lang].key` access. A literal counts as a use when it is
+a key; a prefix (template or `'country_' + name`) keeps every key that starts
+with it. That's deliberately conservative: keys referenced through lookup
+tables such as constants/Badges.ts still count, which is why constants/ and
+utils/ are scanned alongside app/, components/, hooks/ and context/.
+
+    python scripts/find_unused_translations.py            # report
+    python scripts/find_unused_translations.py --prune    # delete everywhere
+"""
+
+import argparse
+import bisect
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Set
+
+import build_trace
+from content_manifest import Manifest
+from locale_batch import BatchError, LocalePatch, run_batch
+from translation_catalog import BASE_LOCALE, TRANSLATIONS_DIR, load_catalog, locale_files
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SOURCE_DIRS = ['app', 'components', 'hooks', 'context', 'constants', 'utils', 'store', 'services']
+SOURCE_EXTS = ('.ts', '.tsx', '.js', '.jsx')
+
+USAGE_RE = re.compile(
+    r"'(?P<sq>[^'\\\n]*)'"
+    r'|"(?P<dq>[^"\\\n]*)"'
+    r'|`(?P<tpl>[^`]*)`'
+    r'|Translations(?:\.\w+|\[[^\]\n]+\])\??\.(?P<prop>\w+)'
+)
+TEMPLATE_PREFIX_RE = re.compile(r'(?:^|[^\w])(\w+)\$\{')
+
+
+def source_files(root: str = ROOT, dirs: Iterable[str] = SOURCE_DIRS) -> List[str]:
+    translations = os.path.abspath(TRANSLATIONS_DIR)
+    files = []
+    for d in dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, d)):
+            dirnames[:] = [n for n in dirnames if n != 'node_modules' and not n.startswith('.')]
+            if os.path.abspath(dirpath).startswith(translations):
+                continue
+            files.extend(os.path.join(dirpath, f) for f in filenames if f.endswith(SOURCE_EXTS))
+    return sorted(files)
+
+
+def scan_usage(files: Iterable[str], keys: Set[str]) -> Set[str]:
+    """Return every key referenced by `files`, directly or through a prefix."""
+    sorted_keys = sorted(keys)
+    used: Set[str] = set()
+    prefixes: Set[str] = set()
+    for path in files:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            source = f.read()
+        for m in USAGE_RE.finditer(source):
+            literal = m.group('sq') if m.group('sq') is not None else m.group('dq')
+            if literal is not None:
+                if literal in keys:
+                    used.add(literal)
+                elif literal.endswith('_'):
+                    prefixes.add(literal)
+            elif m.group('tpl') is not None:
+                tpl = m.group('tpl')
+                if tpl in keys:
+                    used.add(tpl)
+                prefixes.update(TEMPLATE_PREFIX_RE.findall(tpl))
+            elif m.group('prop') in keys:
+                used.add(m.group('prop'))
+
+    for prefix in prefixes:
+        i = bisect.bisect_left(sorted_keys, prefix)
+        while i < len(sorted_keys) and sorted_keys[i].startswith(prefix):
+            used.add(sorted_keys[i])
+            i += 1
+    return used
+
+
+def byte_costs(keys: Set[str], directory: str = TRANSLATIONS_DIR) -> Dict[str, Dict[str, int]]:
+    """locale -> key -> bytes the entry occupies in that locale's source."""
+    costs = {}
+    for locale, path in locale_files(directory, include_base=True):
+        catalog = load_catalog(path)
+        costs[locale] = {}
+        for key in keys:
+            for entry in catalog.duplicates.get(key, [catalog.index[key]] if key in catalog.index else []):
+                span = catalog.text[entry.start:entry.end].encode('utf-8')
+                costs[locale][key] = costs[locale].get(key, 0) + len(span)
+    return costs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report (and prune) unused translation keys.')
+    parser.add_argument('--prune', action='store_true', help='delete unused keys from every locale')
+    parser.add_argument('--keep', action='append', default=[], help='key (or prefix ending in _) to keep')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_trace.run('find_unused_translations', args):
+        base = load_catalog(os.path.join(TRANSLATIONS_DIR, f'{BASE_LOCALE}.ts'))
+        keys = set(base.keys())
+        with build_trace.span('scan') as span:
+            used = scan_usage(source_files(), keys)
+            span.count('keys', len(keys))
+        dead = {
+            k for k in keys - used
+            if not any(k == keep or (keep.endswith('_') and k.startswith(keep)) for keep in args.keep)
+        }
+
+        with build_trace.span('costs'):
+            costs = byte_costs(dead)
+        per_key = {k: sum(c.get(k, 0) for c in costs.values()) for k in dead}
+        for key in sorted(dead, key=lambda k: (-per_key[k], k)):
+            present = sum(key in c for c in costs.values())
+            print(f"{per_key[key]:>7}B  {present:>2} locales  {key}")
+        for locale in sorted(costs):
+            print(f"{locale:>4}  {sum(costs[locale].values()) / 1024:6.1f}KB dead")
+        print(f"{len(dead)} of {len(keys)} keys unused, {sum(per_key.values()) / 1024:.1f}KB across all locales.")
+
+        if args.prune and dead:
+            patches = [
+                LocalePatch(locale, path, delete=sorted(dead))
+                for locale, path in locale_files(TRANSLATIONS_DIR, include_base=True)
+            ]
+            try:
+                report = run_batch(patches, manifest=Manifest('translations'))
+            except BatchError as e:
+                print(f"Aborted: {e}")
+                sys.exit(1)
+            report.print()
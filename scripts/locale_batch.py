@@ -0,0 +1,239 @@
+"""
+Parallel, all-or-nothing patch engine for the locale modules.
+
+Every locale is parsed and patched in a process pool, so a run takes about as
+long as the slowest file. Nothing touches the translations directory until all
+patches rendered cleanly; then each result is written to a temp file, fsynced
+and renamed into place. If any write or rename fails, files that were already
+replaced get their original contents back, so a batch lands as a unit.
+
+With a content manifest, locales whose file hash and patch fingerprint match
+a previous no-op result are skipped before they reach the pool.
+"""
+
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import build_trace
+from content_manifest import Manifest, hash_file, hash_json, hash_text
+from translation_catalog import load_catalog
+
+
+class BatchError(RuntimeError):
+    """Raised when a batch could not be applied; the tree is left unchanged."""
+
+
+@dataclass
+class LocalePatch:
+    locale: str
+    path: str
+    # key -> new value for keys the locale already has; missing keys are
+    # left alone and reported (adding a key takes an explicit `insert`).
+    set: Dict[str, str] = field(default_factory=dict)
+    # key -> value, only added when the key is missing (existing values win);
+    # new keys go under `group`.
+    insert: Dict[str, str] = field(default_factory=dict)
+    delete: List[str] = field(default_factory=list)
+    dedupe: bool = False
+    group: Optional[str] = None
+
+    def fingerprint(self) -> str:
+        return hash_json([self.set, self.insert, sorted(self.delete), self.dedupe, self.group])
+
+
+@dataclass
+class PatchResult:
+    locale: str
+    path: str
+    original: str
+    rendered: str
+    changed_keys: List[str]
+    removed_keys: List[str]
+    # `set` keys the locale doesn't have, so nothing was written for them.
+    missing_keys: List[str]
+    render_seconds: float
+    write_seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return self.rendered != self.original
+
+
+@dataclass
+class BatchReport:
+    results: List[PatchResult]
+    wall_seconds: float
+    committed: bool
+    # Locales the manifest proved unchanged; they were never read or parsed.
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def written(self) -> List[PatchResult]:
+        return [r for r in self.results if r.changed]
+
+    def print(self):
+        for locale in sorted(self.skipped):
+            print(f"{locale:>4}  skipped    (manifest hit)")
+        for r in sorted(self.results, key=lambda r: r.locale):
+            status = 'updated' if r.changed else 'unchanged'
+            missing = f"  missing: {', '.join(r.missing_keys)}" if r.missing_keys else ''
+            print(
+                f"{r.locale:>4}  {status:<9}  set={len(r.changed_keys):<3} removed={len(r.removed_keys):<3} "
+                f"render={r.render_seconds * 1000:7.1f}ms  write={r.write_seconds * 1000:6.1f}ms{missing}"
+            )
+        slowest = max((r.render_seconds + r.write_seconds for r in self.results), default=0.0)
+        state = 'committed' if self.committed else 'dry run, nothing written'
+        print(
+            f"{len(self.written)}/{len(self.results) + len(self.skipped)} locales changed in {self.wall_seconds * 1000:.1f}ms "
+            f"(slowest locale {slowest * 1000:.1f}ms, {state})"
+        )
+
+
+def apply_patch(patch: LocalePatch) -> PatchResult:
+    """Parse and patch one locale in memory. Runs inside a worker process."""
+    started = time.perf_counter()
+    catalog = load_catalog(patch.path)
+    removed = catalog.dedupe() if patch.dedupe else []
+    removed += [k for k in patch.delete if catalog.delete(k)]
+    missing = [k for k in patch.set if k not in catalog]
+    changed = [k for k, v in patch.set.items() if k in catalog and catalog.set(k, v)]
+    for k, v in patch.insert.items():
+        if k not in catalog:
+            catalog.insert(k, v, group=patch.group)
+            changed.append(k)
+    return PatchResult(
+        locale=patch.locale,
+        path=patch.path,
+        original=catalog.text,
+        rendered=catalog.render(),
+        changed_keys=changed,
+        removed_keys=removed,
+        missing_keys=missing,
+        render_seconds=time.perf_counter() - started,
+    )
+
+
+def _fsync_dir(directory: str):
+    # Directories can't be opened for fsync on Windows; the rename is still atomic there.
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, text: str) -> str:
+    """Write `text` next to `path` and fsync it. Returns the temp path to rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def commit(results: List[PatchResult]):
+    """Replace every changed file, or none of them."""
+    pending = [r for r in results if r.changed]
+    staged = {}
+    try:
+        for r in pending:
+            started = time.perf_counter()
+            staged[r.path] = atomic_write(r.path, r.rendered)
+            r.write_seconds = time.perf_counter() - started
+    except BaseException as e:
+        for tmp_path in staged.values():
+            os.unlink(tmp_path)
+        raise BatchError(f'Staging failed, no locale was modified: {e}') from e
+
+    replaced = []
+    try:
+        for r in pending:
+            # Someone else edited the file since we read it: don't clobber it.
+            if _read(r.path) != r.original:
+                raise BatchError(f'{r.locale}: file changed on disk during the batch')
+            os.replace(staged[r.path], r.path)
+            del staged[r.path]
+            replaced.append(r)
+            build_trace.current().wrote(r.path, len(r.rendered.encode('utf-8')))
+        for directory in {os.path.dirname(os.path.abspath(r.path)) for r in replaced}:
+            _fsync_dir(directory)
+    except BaseException as e:
+        for tmp_path in staged.values():
+            os.unlink(tmp_path)
+        for r in replaced:
+            os.replace(atomic_write(r.path, r.original), r.path)
+        if isinstance(e, BatchError):
+            raise
+        raise BatchError(f'Commit failed, rolled back {len(replaced)} locales: {e}') from e
+
+
+def _is_noop(manifest: Manifest, patch: LocalePatch) -> bool:
+    entry = manifest.get(patch.locale)
+    if not entry or not os.path.exists(patch.path):
+        return False
+    digest = hash_file(patch.path)
+    return entry.get('sha256') == digest and entry.get('patches', {}).get(patch.fingerprint()) == digest
+
+
+def _record(manifest: Manifest, patch: LocalePatch, result: PatchResult):
+    digest = hash_text(result.rendered)
+    entry = manifest.get(patch.locale) or {}
+    # Results recorded against older contents no longer say anything.
+    patches = dict(entry.get('patches', {})) if entry.get('sha256') == digest else {}
+    patches[patch.fingerprint()] = digest
+    manifest.set(patch.locale, {'sha256': digest, 'patches': patches})
+
+
+def run_batch(
+    patches: List[LocalePatch],
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    manifest: Optional[Manifest] = None,
+) -> BatchReport:
+    started = time.perf_counter()
+    skipped = []
+    if manifest is not None:
+        skipped = [p.locale for p in patches if _is_noop(manifest, p)]
+        patches = [p for p in patches if p.locale not in skipped]
+        build_trace.current().skipped(len(skipped))
+    if not patches:
+        return BatchReport([], time.perf_counter() - started, committed=not dry_run, skipped=skipped)
+
+    workers = workers or min(len(patches), os.cpu_count() or 1)
+    with build_trace.span('patch') as span:
+        try:
+            if workers == 1:
+                results = [apply_patch(p) for p in patches]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(apply_patch, patches))
+        except Exception as e:
+            raise BatchError(f'Patching failed, no locale was modified: {e}') from e
+        span.count('locales', len(results))
+        span.count('changed', sum(r.changed for r in results))
+
+    if not dry_run:
+        with build_trace.span('commit'):
+            commit(results)
+            if manifest is not None:
+                for patch, result in zip(patches, results):
+                    _record(manifest, patch, result)
+                manifest.save()
+    return BatchReport(results, time.perf_counter() - started, committed=not dry_run, skipped=skipped)
@@ -0,0 +1,301 @@
+"""
+Merge the recipe sources into one canonical corpus, with a conflict report.
+
+Two streaming passes over the sources (recipe_stream), so memory holds the
+join keys and a few hashes per recipe, never the recipes themselves:
+
+  1. plan: every record is hash-joined on idMeal and on a normalized
+     (strArea, strMeal) key; each join group picks one winner
+  2. write: the sources are streamed again and only the winners are written,
+     as canonical JSON Lines, in source order
+
+Conflict policy, applied the same way to both joins:
+  - identical content is a plain duplicate, nothing to review
+  - records without an idMeal are only joined by name, and records with
+    neither are kept as they are
+  - otherwise the record from the earlier source wins (seed before
+    recipies.json before anything passed on the command line), then the
+    more complete one (non-empty fields + ingredients), then the one that
+    comes first in its file
+
+scripts/missing_recipes.json and recipe-coverage-report.json describe
+countries, not recipes; they're joined on the normalized country name and
+the report lists the countries they call missing or critical that the
+merged corpus now covers.
+
+Output (generated, not committed): data/recipes.jsonl and
+data/recipes-merge-report.json.
+
+    python scripts/merge_recipes.py
+    python scripts/merge_recipes.py extra-import.json -o /tmp/recipes.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import build_trace
+from content_manifest import hash_json
+from recipe_stream import dump_record, read_corpus, recipe_id
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+SOURCES = [
+    os.path.join(ROOT, 'data', 'recipes-seed.json'),
+    os.path.join(ROOT, 'app', 'recipe', 'recipies.json'),
+]
+MISSING_PATH = os.path.join(ROOT, 'scripts', 'missing_recipes.json')
+COVERAGE_PATH = os.path.join(ROOT, 'recipe-coverage-report.json')
+OUTPUT_PATH = os.path.join(ROOT, 'data', 'recipes.jsonl')
+REPORT_PATH = os.path.join(ROOT, 'data', 'recipes-merge-report.json')
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_name(text: str) -> str:
+    """'Côte d’Ivoire ' -> 'cote divoire'; used for areas, meal names and countries."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return _SPACE_RE.sub(' ', _PUNCT_RE.sub('', text.casefold())).strip()
+
+
+def completeness(recipe: dict) -> int:
+    filled = sum(1 for k, v in recipe.items() if k != 'ingredients' and isinstance(v, str) and v.strip())
+    return filled + len(recipe.get('ingredients') or [])
+
+
+@dataclass
+class Candidate:
+    """What pass 1 keeps per record: enough to rank it and find it again."""
+    source: int
+    ordinal: int
+    offset: int
+    recipe_id: Optional[str]
+    area: str
+    meal: str
+    content: str
+    fields: Dict[str, str]
+    score: int
+
+    def rank(self) -> Tuple[int, int, int]:
+        return self.source, -self.score, self.ordinal
+
+    def describe(self, sources: List[str]) -> dict:
+        return {
+            'idMeal': self.recipe_id,
+            'strMeal': self.meal,
+            'strArea': self.area,
+            'source': os.path.relpath(sources[self.source], ROOT),
+            'offset': self.offset,
+        }
+
+
+@dataclass
+class MergePlan:
+    sources: List[str]
+    # read_corpus, or a caching stand-in (recipe_stream.CorpusCache.read) in long-running callers.
+    reader: Callable = read_corpus
+    winners: Dict[int, set] = field(default_factory=dict)  # source -> winning ordinals
+    kept: List[Candidate] = field(default_factory=list)
+    conflicts: List[dict] = field(default_factory=list)
+    duplicates: int = 0
+    read: int = 0
+    dropped: int = 0
+
+
+def _scan(sources: List[str], reader: Callable) -> Iterator[Tuple[Optional[Candidate], list]]:
+    for s, path in enumerate(sources):
+        records, trailing = reader(path)
+        for ordinal, record in enumerate(records):
+            recipe = record.recipe
+            yield Candidate(
+                source=s,
+                ordinal=ordinal,
+                offset=record.offset,
+                recipe_id=recipe_id(recipe),
+                area=recipe.get('strArea') or record.area or '',
+                meal=recipe.get('strMeal') or '',
+                content=hash_json(recipe),
+                fields={k: hash_json(v)[:12] for k, v in recipe.items()},
+                score=completeness(recipe),
+            ), record.issues
+        # Trailing issues only matter for the 'dropped' count.
+        yield None, trailing
+
+
+def _resolve(group: List[Candidate], kind: str, key: str, plan: MergePlan) -> Candidate:
+    winner = min(group, key=Candidate.rank)
+    distinct = [c for c in group if c.content != winner.content]
+    plan.duplicates += len(group) - 1 - len(distinct)
+    if distinct:
+        differing = sorted({k for c in distinct for k in set(c.fields) | set(winner.fields)
+                            if c.fields.get(k) != winner.fields.get(k)})
+        plan.conflicts.append({
+            'join': kind,
+            'key': key,
+            'kept': winner.describe(plan.sources),
+            'dropped': [c.describe(plan.sources) for c in sorted(distinct, key=Candidate.rank)],
+            'fields': differing,
+        })
+    return winner
+
+
+def plan_merge(sources: List[str], reader: Callable = read_corpus) -> MergePlan:
+    """Pass 1: join on idMeal, then on (area, meal); pick one winner per group."""
+    plan = MergePlan(sources, reader)
+    by_id: Dict[str, List[Candidate]] = {}
+    unkeyed: List[Candidate] = []
+    span = build_trace.current()
+    for path in sources:
+        span.read(path, os.path.getsize(path))
+    for candidate, issues in _scan(sources, reader):
+        plan.dropped += sum(i.kind == 'dropped' for i in issues)
+        if candidate is None:
+            continue
+        plan.read += 1
+        if candidate.recipe_id is None:
+            unkeyed.append(candidate)
+        else:
+            by_id.setdefault(candidate.recipe_id, []).append(candidate)
+
+    by_name: Dict[Tuple[str, str], List[Candidate]] = {}
+    winners = [_resolve(group, 'idMeal', key, plan) if len(group) > 1 else group[0] for key, group in by_id.items()]
+    del by_id
+    for winner in winners + unkeyed:
+        meal = normalize_name(winner.meal)
+        if meal:
+            by_name.setdefault((normalize_name(winner.area), meal), []).append(winner)
+        elif winner.recipe_id is not None:
+            # Nameless records can only be joined by id.
+            by_name.setdefault(('', winner.recipe_id), []).append(winner)
+        else:
+            plan.kept.append(winner)
+            plan.winners.setdefault(winner.source, set()).add(winner.ordinal)
+
+    for key, group in by_name.items():
+        winner = _resolve(group, 'name', ' / '.join(key), plan) if len(group) > 1 else group[0]
+        plan.kept.append(winner)
+        plan.winners.setdefault(winner.source, set()).add(winner.ordinal)
+    return plan
+
+
+def iter_merged(plan: MergePlan) -> Iterator[dict]:
+    """Pass 2: stream the sources again, yielding only the winners."""
+    for s, path in enumerate(plan.sources):
+        wanted = plan.winners.get(s, set())
+        if not wanted:
+            continue
+        records, _ = plan.reader(path)
+        for ordinal, record in enumerate(records):
+            if ordinal in wanted:
+                yield record.recipe
+
+
+def _load_json(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def country_joins(plan: MergePlan, missing_path: str = MISSING_PATH, coverage_path: str = COVERAGE_PATH) -> dict:
+    """Join the country-level files against the merged corpus."""
+    per_area = Counter(normalize_name(c.area) for c in plan.kept)
+    joins = {}
+
+    missing = _load_json(missing_path)
+    if missing is not None:
+        covered = [m['name'] for m in missing if per_area.get(normalize_name(m.get('name', '')))]
+        joins['missing_recipes'] = {
+            'listed': len(missing),
+            'now_covered': sorted(covered),
+            'still_missing': sorted(m['name'] for m in missing if m['name'] not in covered),
+        }
+
+    coverage = _load_json(coverage_path)
+    if coverage is not None:
+        stale = []
+        for bucket, rows in coverage.items():
+            for row in rows:
+                local = per_area.get(normalize_name(row.get('country', '')), 0)
+                if local > row.get('totalCount', 0):
+                    stale.append({'country': row['country'], 'status': bucket,
+                                  'reported': row.get('totalCount', 0), 'local': local})
+        joins['coverage_report'] = {
+            'countries': sum(len(rows) for rows in coverage.values()),
+            'understated': sorted(stale, key=lambda r: r['country']),
+        }
+    return joins
+
+
+def write_corpus(plan: MergePlan, path: str) -> int:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        for recipe in iter_merged(plan):
+            f.write(dump_record(recipe))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, path)
+    build_trace.current().wrote(path, os.path.getsize(path))
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge and dedupe the recipe sources.')
+    parser.add_argument('extra', nargs='*', help='more recipe files, lowest priority last')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH)
+    parser.add_argument('--report', default=REPORT_PATH)
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every conflict')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with build_trace.run('merge_recipes', args):
+        with build_trace.span('plan') as span:
+            plan = plan_merge(SOURCES + [os.path.abspath(p) for p in args.extra])
+            span.count('records', plan.read)
+        with build_trace.span('write'):
+            written = write_corpus(plan, args.output)
+        with build_trace.span('joins'):
+            joins = country_joins(plan)
+        kinds = Counter(c['join'] for c in plan.conflicts)
+        report = {
+            'sources': [os.path.relpath(p, ROOT) for p in plan.sources],
+            'read': plan.read,
+            'kept': written,
+            'duplicates': plan.duplicates,
+            'unreadable': plan.dropped,
+            'conflicts': plan.conflicts,
+            'countries': joins,
+        }
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    if args.verbose:
+        for c in plan.conflicts:
+            dropped = ', '.join(f"{d['idMeal']}@{d['offset']}" for d in c['dropped'])
+            print(f"{c['join']:<7} {c['key']}: kept {c['kept']['idMeal']}@{c['kept']['offset']}, "
+                  f"dropped {dropped} ({', '.join(c['fields'])})")
+    for name, join in joins.items():
+        if 'now_covered' in join:
+            print(f"{name}: {len(join['now_covered'])} of {join['listed']} listed countries now have recipes")
+        else:
+            print(f"{name}: {len(join['understated'])} of {join['countries']} countries have more recipes locally")
+    print(
+        f"Merged {plan.read} records from {len(plan.sources)} sources into {written} recipes: "
+        f"{plan.duplicates} duplicates, {kinds['idMeal']} idMeal conflicts, {kinds['name']} name conflicts, "
+        f"{plan.dropped} unreadable, in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
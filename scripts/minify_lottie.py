@@ -0,0 +1,228 @@
+"""
+Minify the Lottie (Bodymovin) animations in assets/animations.
+
+Per file, in a process pool:
+  - floats are rounded to --decimals places while the JSON is decoded (a
+    parse_float hook) instead of in a separate pass over the tree; whole
+    numbers are written as ints. The file is also decoded once unrounded,
+    for the before stats and the root timing/canvas values kept exactly
+  - editor-only fields are dropped: `mn` match names, `cix`, the root `meta`
+    block, and properties equal to the player default (`hd: false`,
+    `bm: 0`); `--drop nm` also removes layer/shape names, but only do that
+    for animations the app never addresses by keypath
+  - identical precomp/image assets are merged and every `refId` repointed;
+    Lottie has no way to reference a shape, so repeated shapes stay inline
+  - output is written without whitespace
+
+A before/after report checks visual equivalence: frame range, frame rate,
+root layers and rendered layers (precomps expanded) must all be unchanged,
+otherwise the file is left alone. Unchanged inputs are skipped through the
+scripts/.cache/lottie.json content-hash manifest.
+
+    python scripts/minify_lottie.py --dry-run
+    python scripts/minify_lottie.py --decimals 2 assets/animations/avatar_master.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import build_trace
+from content_manifest import Manifest, hash_bytes, hash_file
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+ANIMATIONS_DIR = os.path.join(ROOT, 'assets', 'animations')
+
+EDITOR_ONLY = {'mn', 'cix'}
+ROOT_EDITOR_ONLY = {'meta'}
+ROOT_EXACT = ('fr', 'ip', 'op', 'w', 'h')
+DEFAULTS = {'hd': False, 'bm': 0}
+
+
+def _rounder(decimals):
+    def parse_float(text):
+        value = round(float(text), decimals)
+        if value == int(value):
+            return int(value)
+        return value
+    return parse_float
+
+
+def _is_default(key, value):
+    # type() check keeps `hd: 0` / `bm: false` (which players read differently) intact.
+    return key in DEFAULTS and type(value) is type(DEFAULTS[key]) and value == DEFAULTS[key]
+
+
+def _strip(node, drop):
+    if isinstance(node, dict):
+        for key in [k for k, v in node.items() if k in drop or _is_default(k, v)]:
+            del node[key]
+        for value in node.values():
+            _strip(value, drop)
+    elif isinstance(node, list):
+        for value in node:
+            _strip(value, drop)
+
+
+def _replace_refs(node, mapping):
+    if isinstance(node, dict):
+        ref = node.get('refId')
+        if ref in mapping:
+            node['refId'] = mapping[ref]
+        for value in node.values():
+            _replace_refs(value, mapping)
+    elif isinstance(node, list):
+        for value in node:
+            _replace_refs(value, mapping)
+
+
+def dedupe_assets(doc):
+    """Merge assets with identical content. Returns the number removed."""
+    removed = 0
+    while True:
+        seen, mapping = {}, {}
+        for asset in doc.get('assets', []):
+            body = json.dumps({k: v for k, v in asset.items() if k != 'id'}, sort_keys=True)
+            if body in seen:
+                mapping[asset['id']] = seen[body]
+            else:
+                seen[body] = asset['id']
+        if not mapping:
+            return removed
+        doc['assets'] = [a for a in doc['assets'] if a['id'] not in mapping]
+        _replace_refs(doc, mapping)
+        removed += len(mapping)
+        # Repointing refs can make two precomps identical; go again.
+
+
+def stats(doc):
+    assets = {a.get('id'): a for a in doc.get('assets', [])}
+
+    def rendered(layers, depth=0):
+        total = 0
+        for layer in layers:
+            total += 1
+            ref = assets.get(layer.get('refId'))
+            if ref is not None and 'layers' in ref and depth < 32:
+                total += rendered(ref['layers'], depth + 1)
+        return total
+
+    return {
+        'frames': doc.get('op', 0) - doc.get('ip', 0),
+        'fr': doc.get('fr'),
+        'size': (doc.get('w'), doc.get('h')),
+        'root_layers': len(doc.get('layers', [])),
+        'rendered_layers': rendered(doc.get('layers', [])),
+        'assets': len(assets),
+        'markers': len(doc.get('markers', [])),
+    }
+
+
+def minify(path, decimals, drop):
+    """Return (path, before bytes, after bytes, before stats, after stats, output or None)."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    raw = json.loads(original)
+    before = stats(raw)
+    doc = json.loads(original, parse_float=_rounder(decimals))
+    # The composition's timing and canvas are kept exactly as exported.
+    for key in ROOT_EXACT:
+        if key in raw:
+            doc[key] = raw[key]
+    for key in ROOT_EDITOR_ONLY:
+        doc.pop(key, None)
+    _strip(doc, drop)
+    dedupe_assets(doc)
+    after = stats(doc)
+    output = json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if before != after or len(output) >= len(original):
+        return path, len(original), len(original), before, after, None
+    return path, len(original), len(output), before, after, output
+
+
+def find_animations(paths):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+        else:
+            found.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith('.json'))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify Lottie JSON animations.')
+    parser.add_argument('paths', nargs='*', default=[ANIMATIONS_DIR])
+    parser.add_argument('--decimals', type=int, default=3, help='float precision to keep (default 3)')
+    parser.add_argument('--drop', action='append', default=[], help='extra field to drop, e.g. nm')
+    parser.add_argument('--out', help='write minified files here instead of in place')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    drop = EDITOR_ONLY | set(args.drop)
+    settings = [args.decimals, sorted(drop)]
+    with build_trace.run('minify_lottie', args):
+        manifest = Manifest('lottie')
+        pending, skipped = [], 0
+        with build_trace.span('scan') as span:
+            for path in find_animations(args.paths):
+                entry = manifest.get(os.path.relpath(path, ROOT))
+                if not args.out and entry and entry.get('settings') == settings and entry.get('sha256') == hash_file(path):
+                    skipped += 1
+                else:
+                    pending.append(path)
+            span.skipped(skipped)
+
+        started = time.perf_counter()
+        total_before = total_after = 0
+        mismatched = 0
+        with build_trace.span('minify') as span, ProcessPoolExecutor(max_workers=args.workers) as pool:
+            jobs = pool.map(partial(minify, decimals=args.decimals, drop=drop), pending)
+            for path, size_before, size_after, before, after, output in jobs:
+                rel = os.path.relpath(path, ROOT)
+                total_before += size_before
+                total_after += size_after
+                span.read(path, size_before)
+                equivalent = before == after
+                mismatched += not equivalent
+                span.count('mismatched', not equivalent)
+                print(
+                    f"{size_before / 1024:8.1f}KB -> {size_after / 1024:8.1f}KB  "
+                    f"frames={after['frames']:<4g} layers={before['rendered_layers']}->{after['rendered_layers']:<4} "
+                    f"assets={before['assets']}->{after['assets']:<3} "
+                    f"{'ok' if equivalent else 'MISMATCH, kept original'}  {rel}"
+                )
+                if args.dry_run:
+                    continue
+                target = os.path.join(args.out, os.path.basename(path)) if args.out else path
+                data = output
+                if data is None and args.out:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                if data is not None:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_path = target + '.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, target)
+                    span.wrote(target, len(data))
+                if not args.out and equivalent:
+                    manifest.set(rel, {'sha256': hash_bytes(data) if data else hash_file(path), 'settings': settings})
+
+        if not args.dry_run:
+            manifest.save()
+    print(
+        f"Minified {len(pending)} animations ({skipped} unchanged since last run): "
+        f"{total_before / 1024:.0f}KB -> {total_after / 1024:.0f}KB in {time.perf_counter() - started:.1f}s"
+    )
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == '__main__':
+    main()
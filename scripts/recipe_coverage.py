@@ -0,0 +1,211 @@
+"""
+Offline recipe coverage report, from the local recipe shards.
+
+Produces a report in the same shape as scripts/checkRecipeCoverage.ts
+({good, warning, critical} rows with mealDBCount, apiNinjasCount,
+totalCount and status, same 5+/1-4/0 thresholds) plus a localCount, but
+counts the bundled corpus instead of calling live APIs:
+
+  - the rows are the countries of the last live report
+    (recipe-coverage-report.json, written by checkRecipeCoverage.ts and
+    left alone here), whose mealDBCount and apiNinjasCount are carried
+    over since neither API is mirrored; without one, the countries of
+    assets/countries.json
+  - localCount counts the curated recipes of every shard area matching the
+    country by name, by its COUNTRY_TO_AREA_MAP demonym in
+    constants/Config.ts, by any Natural Earth name of the same country in
+    assets/countries.json, or by a known rename (Eswatini -> Swaziland);
+    recipes with TheMealDB's numeric ids count towards mealDBCount
+  - an area no country matches still gets a row of its own, so no local
+    recipe drops out of the report
+
+Per-area counts are cached by shard hash (scripts/.cache/coverage.json), so
+after an import only the shards that changed are re-read. Run
+build_recipe_shards.py first. Output goes to data/ (generated, not
+committed).
+
+    python scripts/recipe_coverage.py
+    python scripts/recipe_coverage.py --out /tmp/coverage.json -v
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import build_trace
+from build_recipe_shards import ROOT, SHARDS_DIR
+from content_manifest import Manifest, write_if_changed
+from merge_recipes import normalize_name
+
+COUNTRIES_PATH = os.path.join(ROOT, 'assets', 'countries.json')
+CONFIG_PATH = os.path.join(ROOT, 'constants', 'Config.ts')
+LIVE_REPORT_PATH = os.path.join(ROOT, 'recipe-coverage-report.json')
+REPORT_PATH = os.path.join(ROOT, 'data', 'recipe-coverage-report.json')
+NAME_FIELDS = ('NAME', 'NAME_LONG', 'ADMIN', 'GEOUNIT', 'BRK_NAME', 'NAME_SORT', 'NAME_ALT', 'FORMAL_EN')
+GOOD, WARNING = 5, 1
+# Recipe areas use current names; the Natural Earth data predates the renames.
+AREA_ALIASES = {
+    'Eswatini': 'Swaziland',
+    'North Macedonia': 'Macedonia',
+    'DR Congo': 'Democratic Republic of the Congo',
+}
+
+_MAP_RE = re.compile(r'COUNTRY_TO_AREA_MAP[^=]*=\s*\{(?P<body>.*?)\n\};', re.S)
+_ENTRY_RE = re.compile(r"""^\s*(?:'(?P<quoted>[^']+)'|(?P<bare>\w+))\s*:\s*'(?P<area>[^']+)'""", re.M)
+_MEALDB_ID_RE = re.compile(r'^\d+$')
+
+
+def load_area_map(path: str = CONFIG_PATH) -> Dict[str, str]:
+    """COUNTRY_TO_AREA_MAP from constants/Config.ts."""
+    with open(path, 'r', encoding='utf-8') as f:
+        m = _MAP_RE.search(f.read())
+    if m is None:
+        return {}
+    return {e.group('quoted') or e.group('bare'): e.group('area') for e in _ENTRY_RE.finditer(m.group('body'))}
+
+
+def count_shard(path: str) -> Dict[str, int]:
+    with open(path, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+    mealdb = sum(1 for r in recipes if _MEALDB_ID_RE.match(str(r.get('idMeal', ''))))
+    return {'mealdb': mealdb, 'local': len(recipes) - mealdb}
+
+
+def area_counts(shards_dir: str, cache: Manifest) -> Tuple[Dict[str, Dict[str, int]], int]:
+    """area -> counts, re-reading only shards whose hash changed. Returns (counts, shards read)."""
+    with open(os.path.join(shards_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    counts, read = {}, 0
+    for area, shard in manifest['areas'].items():
+        entry = cache.get(area)
+        if entry is None or entry.get('sha256') != shard['sha256']:
+            entry = dict(count_shard(os.path.join(shards_dir, shard['file'])), sha256=shard['sha256'])
+            cache.set(area, entry)
+            read += 1
+        counts[area] = entry
+    for area in [a for a in cache.entries if a not in manifest['areas']]:
+        cache.remove(area)
+    return counts, read
+
+
+def load_live_report(path: str) -> Optional[List[dict]]:
+    """Rows of a checkRecipeCoverage.ts report, in its order; None if there is none."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        return None
+    return [row for bucket in ('good', 'warning', 'critical') for row in report.get(bucket, [])]
+
+
+def country_aliases(countries: List[dict], area_map: Dict[str, str]) -> Dict[str, set]:
+    """normalized name -> every normalized name of the same Natural Earth country."""
+    aliases = {}
+    for feature in countries:
+        props = feature.get('properties') or {}
+        names = {props.get(f) for f in NAME_FIELDS if isinstance(props.get(f), str)}
+        names |= {area_map[n] for n in names if n in area_map}
+        normalized = set(map(normalize_name, names))
+        for name in normalized:
+            aliases.setdefault(name, set()).update(normalized)
+    return aliases
+
+
+def build_report(countries: List[dict], counts: Dict[str, Dict[str, int]], area_map: Dict[str, str],
+                 live: Optional[List[dict]] = None):
+    """One pass over the countries; returns (report, areas that got a row of their own)."""
+    by_name = {normalize_name(area): area for area in counts}
+    by_name.update({normalize_name(AREA_ALIASES[a]): a for a in counts if a in AREA_ALIASES})
+    aliases = country_aliases(countries, area_map)
+    if live is None:
+        live = [{'country': (f.get('properties') or {}).get('NAME')} for f in countries]
+
+    matched = set()
+    rows = []
+    for entry in live:
+        name = entry.get('country')
+        if not name:
+            continue
+        names = {normalize_name(name)}
+        if name in area_map:
+            names.add(normalize_name(area_map[name]))
+        for n in list(names):
+            names |= aliases.get(n, set())
+        # An area belongs to the first country that claims it, so recipes
+        # aren't counted twice when two countries share a Natural Earth name.
+        areas = {by_name[n] for n in names if n in by_name} - matched
+        matched |= areas
+        rows.append((name, entry, areas))
+    unmatched = sorted(set(counts) - matched)
+    rows.extend((area, {}, {area}) for area in unmatched)
+
+    report = {'good': [], 'warning': [], 'critical': []}
+    for name, entry, areas in rows:
+        mealdb = max(entry.get('mealDBCount', 0), sum(counts[a]['mealdb'] for a in areas))
+        ninjas = entry.get('apiNinjasCount', 0)
+        local = sum(counts[a]['local'] for a in areas)
+        total = mealdb + ninjas + local
+        status = 'good' if total >= GOOD else 'warning' if total >= WARNING else 'critical'
+        report[status].append({
+            'country': name,
+            'mealDBCount': mealdb,
+            'apiNinjasCount': ninjas,
+            'localCount': local,
+            'totalCount': total,
+            'status': status,
+        })
+    for bucket in report.values():
+        bucket.sort(key=lambda r: (-r['totalCount'], r['country']))
+    return report, unmatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the recipe coverage report offline.')
+    parser.add_argument('--shards', default=SHARDS_DIR)
+    parser.add_argument('--countries', default=COUNTRIES_PATH)
+    parser.add_argument('--live', default=LIVE_REPORT_PATH, help='checkRecipeCoverage.ts report to carry API counts from')
+    parser.add_argument('--out', default=REPORT_PATH)
+    parser.add_argument('-v', '--verbose', action='store_true', help='list countries needing attention')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if not os.path.exists(os.path.join(args.shards, 'manifest.json')):
+        print(f"No recipe shards in {os.path.relpath(args.shards, ROOT)}; run scripts/build_recipe_shards.py first.")
+        sys.exit(1)
+    with build_trace.run('recipe_coverage', args):
+        cache = Manifest('coverage')
+        with build_trace.span('shards') as span:
+            counts, read = area_counts(args.shards, cache)
+            span.skipped(len(counts) - read)
+        with build_trace.span('report'):
+            with open(args.countries, 'r', encoding='utf-8') as f:
+                countries = json.load(f).get('features', [])
+            live = load_live_report(args.live)
+            report, unmatched = build_report(countries, counts, load_area_map(), live)
+
+        data = (json.dumps(report, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+        written = write_if_changed(args.out, data)
+        cache.save()
+
+    if args.verbose:
+        for row in sorted(report['critical'] + report['warning'], key=lambda r: (r['totalCount'], r['country'])):
+            print(f"  {row['country']:<30} {row['totalCount']} recipes")
+    if unmatched:
+        print(f"Areas matching no country, reported under their own name: {', '.join(unmatched)}")
+    if live is None:
+        print(f"No live report at {os.path.relpath(args.live, ROOT)}; TheMealDB and API-Ninjas counts are 0.")
+    print(
+        f"Coverage for {sum(len(rows) for rows in report.values())} countries: "
+        f"{len(report['good'])} good, {len(report['warning'])} warning, {len(report['critical'])} critical "
+        f"({read} of {len(counts)} shards re-read, {len(unmatched)} areas without a country"
+        f"{', written' if written else ', unchanged'}) in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,406 @@
+"""
+Fault-tolerant, streaming reader for the recipe corpus files.
+
+app/recipe/recipies.json isn't valid JSON: it is several pasted batches of
+`{ "Country": [ {recipe}, ... ] }`, separated by `// batch` comments and `•`
+bullets, with string values hard-wrapped across lines and the odd missing
+brace or comma. `iter_recipes()` reads it in fixed-size chunks, tokenizes
+bytes as they arrive and yields one recipe at a time, so memory stays
+bounded by a single record no matter how big the corpus gets. Well-formed
+files (data/recipes-seed.json) go through the same path.
+
+Every defect is reported with its byte offset: garbage and comments that
+were skipped, strings whose hard wraps were joined, missing or trailing
+commas, missing closing brackets, and records that had to be dropped. The
+CLI also drops repeated idMeal records (later batches re-paste earlier
+countries); records without an idMeal are never treated as repeats. Only
+unrecoverable records make it exit 1.
+
+    python scripts/recipe_stream.py app/recipe/recipies.json -o recipes.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+import build_trace
+
+CHUNK_SIZE = 64 * 1024
+MAX_TOKEN = 4 * 1024 * 1024
+
+_TOKEN_RE = re.compile(
+    rb'(?P<ws>[ \t\r\n]+)'
+    rb'|(?P<comment>//[^\n]*(?:\n|\Z))'
+    rb'|(?P<string>"(?:[^"\\]|\\.)*")'
+    rb'|(?P<literal>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)'
+    rb'|(?P<punct>[{}\[\]:,])'
+    rb'|(?P<garbage>[^ \t\r\n{}\[\]:,"/]+|/)',
+    re.S,
+)
+_WRAP_RE = re.compile(rb'[ \t]*\r?\n[ \t]*')
+
+EOF = 'eof'
+
+
+@dataclass
+class Issue:
+    offset: int
+    kind: str  # 'skipped', 'repaired', 'dropped' or 'duplicate'
+    detail: str
+
+    def __str__(self):
+        return f"@{self.offset:>8}  {self.kind:<8} {self.detail}"
+
+
+@dataclass
+class Record:
+    recipe: dict
+    offset: int
+    area: Optional[str]
+    issues: List[Issue] = field(default_factory=list)
+
+
+class _Tokens:
+    """Incremental byte tokenizer; keeps only the unconsumed tail in memory."""
+
+    def __init__(self, f, issues: List[Issue], chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.issues = issues
+        self.chunk_size = chunk_size
+        self.buf = b''
+        self.base = 0
+        self.pos = 0
+        self.eof = False
+        self.peeked: List[Tuple[str, object, int]] = []
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.base += self.pos
+        self.pos = 0
+        return True
+
+    def _next(self) -> Tuple[str, object, int]:
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                return EOF, None, self.base + self.pos
+            m = _TOKEN_RE.match(self.buf, self.pos)
+            # A token touching the end of the buffer may continue in the next chunk.
+            if (m is None or m.end() == len(self.buf)) and not self.eof:
+                if len(self.buf) - self.pos > MAX_TOKEN:
+                    raise ValueError(f'token at byte {self.base + self.pos} exceeds {MAX_TOKEN} bytes')
+                if self._fill():
+                    continue
+            offset = self.base + self.pos
+            if m is None:
+                # Unterminated string at EOF.
+                self.issues.append(Issue(offset, 'skipped', 'unterminated string at end of file'))
+                self.pos = len(self.buf)
+                continue
+            self.pos = m.end()
+            kind = m.lastgroup
+            raw = m.group()
+            if kind == 'ws':
+                continue
+            if kind == 'comment':
+                self.issues.append(Issue(offset, 'skipped', f'comment {raw.strip().decode("utf-8", "replace")!r}'))
+                continue
+            if kind == 'garbage':
+                self.issues.append(Issue(offset, 'skipped', f'stray text {raw.decode("utf-8", "replace")!r}'))
+                continue
+            if kind == 'string':
+                return 'string', self._decode_string(raw, offset), offset
+            if kind == 'literal':
+                return 'literal', json.loads(raw), offset
+            return raw.decode('ascii'), None, offset
+
+    def _decode_string(self, raw: bytes, offset: int) -> str:
+        if b'\n' in raw:
+            wraps = raw.count(b'\n')
+            raw = _WRAP_RE.sub(b' ', raw)
+            self.issues.append(Issue(offset, 'repaired', f'joined {wraps} hard-wrapped line(s) in a string'))
+        return json.loads(raw.decode('utf-8', 'replace'), strict=False)
+
+    def peek(self, n: int = 0) -> Tuple[str, object, int]:
+        while len(self.peeked) <= n:
+            self.peeked.append(self._next())
+        return self.peeked[n]
+
+    def pop(self) -> Tuple[str, object, int]:
+        token = self.peek()
+        self.peeked.pop(0)
+        return token
+
+
+class _RecordError(Exception):
+    def __init__(self, offset: int, message: str):
+        super().__init__(message)
+        self.offset = offset
+
+
+def _parse_value(tokens: _Tokens, issues: List[Issue]):
+    kind, value, offset = tokens.pop()
+    if kind in ('string', 'literal'):
+        return value
+    if kind == '{':
+        return _parse_object(tokens, issues, offset)
+    if kind == '[':
+        return _parse_array(tokens, issues, offset)
+    raise _RecordError(offset, f'unexpected {kind!r} where a value was expected')
+
+
+def _parse_object(tokens: _Tokens, issues: List[Issue], start: int) -> dict:
+    obj = {}
+    while True:
+        kind, key, offset = tokens.peek()
+        if kind == '}':
+            tokens.pop()
+            return obj
+        if kind != 'string' or tokens.peek(1)[0] != ':':
+            raise _RecordError(offset, f'object opened at byte {start} is not closed')
+        tokens.pop()
+        tokens.pop()
+        obj[key] = _parse_value(tokens, issues)
+        kind, _, offset = tokens.peek()
+        if kind == ',':
+            tokens.pop()
+            if tokens.peek()[0] == '}':
+                issues.append(Issue(offset, 'repaired', 'dropped trailing comma'))
+        elif kind == 'string' and tokens.peek(1)[0] == ':':
+            issues.append(Issue(offset, 'repaired', 'inserted missing comma'))
+        elif kind != '}':
+            raise _RecordError(offset, f'unexpected {kind!r} in object opened at byte {start}')
+
+
+def _parse_array(tokens: _Tokens, issues: List[Issue], start: int) -> list:
+    arr = []
+    while True:
+        kind, _, offset = tokens.peek()
+        if kind == ']':
+            tokens.pop()
+            return arr
+        if kind == EOF:
+            raise _RecordError(offset, f'array opened at byte {start} is not closed')
+        arr.append(_parse_value(tokens, issues))
+        kind, _, offset = tokens.peek()
+        if kind == ',':
+            tokens.pop()
+            if tokens.peek()[0] == ']':
+                issues.append(Issue(offset, 'repaired', 'dropped trailing comma'))
+        elif kind in ('{', '[', 'string', 'literal'):
+            issues.append(Issue(offset, 'repaired', 'inserted missing comma'))
+        elif kind != ']':
+            raise _RecordError(offset, f'unexpected {kind!r} in array opened at byte {start}')
+
+
+def _resync(tokens: _Tokens):
+    """Skip ahead to the next `{"idMeal"` or `"Country": [`."""
+    while True:
+        kind, _, _ = tokens.peek()
+        if kind == EOF:
+            return
+        if kind == '{' and tokens.peek(1)[0] == 'string' and tokens.peek(1)[1] == 'idMeal':
+            return
+        if kind == 'string' and tokens.peek(1)[0] == ':' and tokens.peek(2)[0] == '[':
+            return
+        tokens.pop()
+
+
+def iter_records(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Record]:
+    """Yield every recoverable recipe with the issues found while reading it.
+
+    Issues between records (stray text between batches, ...) are attached to
+    the next record; use `read_corpus` to also get the ones after the last.
+    """
+    for item in _iter(path, chunk_size):
+        if isinstance(item, Record):
+            yield item
+
+
+def _iter(path: str, chunk_size: int):
+    pending: List[Issue] = []
+    with open(path, 'rb') as f:
+        tokens = _Tokens(f, pending, chunk_size)
+        area: Optional[str] = None
+        in_array = False
+        while True:
+            kind, value, offset = tokens.peek()
+            if kind == EOF:
+                if in_array:
+                    pending.append(Issue(offset, 'repaired', f'closed {area!r} array at end of file'))
+                break
+
+            # `"Country": [` opens a new group wherever it shows up.
+            if kind == 'string' and tokens.peek(1)[0] == ':' and tokens.peek(2)[0] == '[':
+                if in_array:
+                    pending.append(Issue(offset, 'repaired', f'closed {area!r} array before {value!r}'))
+                area = value
+                in_array = True
+                tokens.pop()
+                tokens.pop()
+                tokens.pop()
+                continue
+
+            if in_array and kind == '{':
+                tokens.pop()
+                issues: List[Issue] = []
+                tokens.issues = issues
+                try:
+                    recipe = _parse_object(tokens, issues, offset)
+                except _RecordError as e:
+                    tokens.issues = pending
+                    pending.extend(issues)
+                    pending.append(Issue(offset, 'dropped', f'record in {area!r}: {e} (at byte {e.offset})'))
+                    _resync(tokens)
+                    continue
+                tokens.issues = pending
+                if 'strArea' not in recipe and area is not None:
+                    recipe['strArea'] = area
+                yield Record(recipe, offset, area, pending + issues)
+                pending = []
+                tokens.issues = pending
+                continue
+
+            tokens.pop()
+            if kind == ']' and in_array:
+                in_array = False
+            elif kind == ',' or kind in ('{', '}', ']'):
+                # Batch wrappers and separators between countries.
+                pass
+            else:
+                pending.append(Issue(offset, 'skipped', f'unexpected {kind} token outside a recipe'))
+    if pending:
+        yield pending
+
+
+def read_corpus(path: str, chunk_size: int = CHUNK_SIZE) -> Tuple[Iterator[Record], List[Issue]]:
+    """Like iter_records, but also collects issues that trail the last record.
+
+    The returned list is only complete once the iterator is exhausted.
+    """
+    trailing: List[Issue] = []
+
+    def gen():
+        for item in _iter(path, chunk_size):
+            if isinstance(item, Record):
+                yield item
+            else:
+                trailing.extend(item)
+
+    return gen(), trailing
+
+
+class CorpusCache:
+    """read_corpus for long-running callers: each file is parsed once per (size, mtime).
+
+    Records are kept as canonical JSON and decoded on every read, so callers
+    that annotate the recipes they get back (attach_measures) never see each
+    other's changes.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def read(self, path: str) -> Tuple[Iterator[Record], List[Issue]]:
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stamp:
+                records, trailing = read_corpus(path)
+                rows = [(dump_record(r.recipe), r.offset, r.area, r.issues) for r in records]
+                entry = self._entries[path] = (stamp, rows, trailing)
+        _, rows, trailing = entry
+        return (Record(json.loads(text), offset, area, list(issues)) for text, offset, area, issues in rows), list(trailing)
+
+
+def iter_recipes(path: str) -> Iterator[dict]:
+    """Just the recipe dicts, for tools that don't care about repairs."""
+    for record in iter_records(path):
+        yield record.recipe
+
+
+def recipe_id(recipe: dict) -> Optional[str]:
+    """idMeal as a string, or None when the record has none to join on."""
+    value = recipe.get('idMeal')
+    return None if value is None or value == '' else str(value)
+
+
+def dump_record(recipe: dict) -> str:
+    """Canonical compact form: source key order, no whitespace, UTF-8."""
+    return json.dumps(recipe, ensure_ascii=False, separators=(',', ':'))
+
+
+def _stream(args):
+    """Report (and with -o write) every record. Returns (records, repaired, issue counts)."""
+    records, trailing = read_corpus(args.path)
+    out = open(args.output, 'w', encoding='utf-8', newline='\n') if args.output else None
+    count = repaired = written = 0
+    counts = {'skipped': 0, 'repaired': 0, 'dropped': 0, 'duplicate': 0}
+    seen = set()
+    with build_trace.span('stream') as span:
+        span.read(args.path, os.path.getsize(args.path))
+        try:
+            for record in records:
+                count += 1
+                key = recipe_id(record.recipe)
+                duplicate = key is not None and key in seen
+                if duplicate:
+                    record.issues.append(Issue(record.offset, 'duplicate', f'idMeal {key!r}, kept the first'))
+                if key is not None:
+                    seen.add(key)
+                repaired += any(i.kind == 'repaired' and i.offset >= record.offset for i in record.issues)
+                for issue in record.issues:
+                    counts[issue.kind] += 1
+                    if not args.quiet:
+                        print(issue)
+                if out is not None and not duplicate:
+                    line = dump_record(record.recipe) + '\n'
+                    out.write(line)
+                    written += len(line.encode('utf-8'))
+        finally:
+            if out is not None:
+                out.close()
+        for issue in trailing:
+            counts[issue.kind] += 1
+            if not args.quiet:
+                print(issue)
+        span.count('records', count)
+        span.count('repaired', repaired)
+        span.count('dropped', counts['dropped'])
+        if out is not None:
+            span.wrote(args.output, written)
+    return count, repaired, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream, repair and canonicalize a recipe corpus file.')
+    parser.add_argument('path')
+    parser.add_argument('-o', '--output', help='write canonical JSON Lines (one recipe per line) here')
+    parser.add_argument('-q', '--quiet', action='store_true', help='only print the summary')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_trace.run('recipe_stream', args):
+        count, repaired, counts = _stream(args)
+    print(
+        f"Read {count} recipes ({repaired} repaired) from {os.path.basename(args.path)}: "
+        f"{counts['skipped']} skipped spans, {counts['repaired']} repairs, {counts['duplicate']} duplicates, "
+        f"{counts['dropped']} dropped records."
+    )
+    sys.exit(1 if counts['dropped'] else 0)
+
+
+if __name__ == '__main__':
+    main()
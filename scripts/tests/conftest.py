@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The scripts import their siblings directly, as they do when run from
+# scripts/; the asset tools live at the repo root.
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, os.path.join(HERE, '..', '..'))
@@ -0,0 +1,64 @@
+from collections import Counter
+
+import pytest
+
+from canonicalize_ingredients import canonicalize, merge_key, singular
+
+
+def _canonical(names):
+    """Most used first, so the first name of a merged pair is its canonical."""
+    counts = Counter({name: len(names) - i for i, name in enumerate(names)})
+    return canonicalize(counts)
+
+
+@pytest.mark.parametrize('word, expected', [
+    ('tomatoes', 'tomato'),
+    ('berries', 'berry'),
+    ('peaches', 'peach'),
+    ('peppers', 'pepper'),
+    ('couscous', 'couscous'),
+    ('hummus', 'hummus'),
+    ('egg', 'egg'),
+])
+def test_singular(word, expected):
+    assert singular(word) == expected
+
+
+@pytest.mark.parametrize('a, b', [
+    ('pepper', 'peppers'),
+    ('red pepper', 'red peppers'),
+    ('clove', 'cloves'),
+    ("donne' sali peppers", "donne' sili peppers"),
+])
+def test_known_false_pairs_stay_apart(a, b):
+    for names in ([a, b], [b, a]):
+        mapping = _canonical(names)
+        assert mapping[a] == a
+        assert mapping[b] == b
+
+
+def test_false_pairs_keep_their_own_keys():
+    assert merge_key('peppers') == 'peppers'
+    assert merge_key('cloves') == 'cloves'
+    assert merge_key('hot peppers') == 'hot pepper'
+
+
+@pytest.mark.parametrize('canonical, variant', [
+    ('tomatoes', 'tomato'),
+    ('garlic cloves', 'garlic clove'),
+    ('bell pepper', 'bell peppers'),
+    ('hot pepper', 'hot peppers'),
+    ('chilli powder', 'chili powder'),
+])
+def test_plurals_and_typos_still_merge(canonical, variant):
+    assert _canonical([canonical, variant])[variant] == canonical
+
+
+@pytest.mark.parametrize('a, b', [
+    ('lime juice', 'lemon juice'),
+    ('salted butter', 'unsalted butter'),
+    ('mustard', 'mustard oil'),
+])
+def test_different_ingredients_stay_apart(a, b):
+    mapping = _canonical([a, b])
+    assert mapping[b] == b
@@ -0,0 +1,21 @@
+import os
+
+from content_manifest import Manifest
+from dedupe_assets import find_files, hash_tree
+
+
+def test_only_scanned_paths_are_pruned(tmp_path):
+    for name in ('images/a.png', 'images/b.png', 'sounds/c.wav'):
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(name.encode())
+    images, sounds = str(tmp_path / 'images'), str(tmp_path / 'sounds')
+    cache = Manifest('asset_hashes', str(tmp_path / 'cache'))
+    hashes, hashed = hash_tree(find_files([images, sounds]), cache, [images, sounds], workers=1)
+    assert hashed == 3 and len(cache.entries) == 3
+
+    os.remove(tmp_path / 'images' / 'b.png')
+    hashes, hashed = hash_tree(find_files([images]), cache, [images], workers=1)
+    assert hashed == 0 and len(hashes) == 1
+    kept = sorted(os.path.basename(rel) for rel in cache.entries)
+    assert kept == ['a.png', 'c.wav']
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+import locale_batch
+from locale_batch import BatchError, LocalePatch, apply_patch, commit, run_batch
+from translation_catalog import load_catalog
+
+SOURCES = {
+    'de': "export const de = {\n  // Home\n  home_title: 'Start',\n  home_cta: 'Los',\n};\n",
+    'fr': "export const fr = {\n  // Home\n  home_title: 'Accueil',\n};\n",
+    'it': "export const it = {\n  // Home\n  home_title: 'Inizio',\n  home_cta: 'Vai',\n};\n",
+}
+
+
+@pytest.fixture
+def locales(tmp_path):
+    paths = {}
+    for locale, text in SOURCES.items():
+        path = tmp_path / f'{locale}.ts'
+        path.write_text(text, encoding='utf-8')
+        paths[locale] = str(path)
+    return paths
+
+
+def _contents(paths):
+    return {locale: open(path, encoding='utf-8').read() for locale, path in paths.items()}
+
+
+def _patches(paths, **kwargs):
+    return [LocalePatch(locale, path, **kwargs) for locale, path in sorted(paths.items())]
+
+
+def test_set_updates_existing_keys_and_reports_missing(locales):
+    report = run_batch(_patches(locales, set={'home_cta': 'Go'}), workers=1)
+    assert report.committed
+    by_locale = {r.locale: r for r in report.results}
+    assert by_locale['de'].changed_keys == ['home_cta']
+    assert by_locale['fr'].changed_keys == []
+    assert by_locale['fr'].missing_keys == ['home_cta']
+    assert not by_locale['fr'].changed
+    assert load_catalog(locales['de']).get('home_cta') == 'Go'
+    assert 'home_cta' not in load_catalog(locales['fr'])
+    assert _contents(locales)['fr'] == SOURCES['fr']
+
+
+def test_insert_adds_only_missing_keys(locales):
+    run_batch(_patches(locales, insert={'home_cta': 'Go'}, group='Home'), workers=1)
+    assert load_catalog(locales['fr']).get('home_cta') == 'Go'
+    assert load_catalog(locales['de']).get('home_cta') == 'Los'
+    assert _contents(locales)['de'] == SOURCES['de']
+
+
+def test_dry_run_writes_nothing(locales):
+    report = run_batch(_patches(locales, set={'home_title': 'X'}), workers=1, dry_run=True)
+    assert not report.committed
+    assert len(report.written) == 3
+    assert _contents(locales) == SOURCES
+
+
+def test_failed_rename_rolls_back_replaced_files(locales, monkeypatch):
+    results = [apply_patch(p) for p in _patches(locales, set={'home_title': 'X'})]
+    real_replace = os.replace
+    calls = []
+
+    def flaky_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError('disk full')
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(locale_batch.os, 'replace', flaky_replace)
+    with pytest.raises(BatchError, match='rolled back 1 locales'):
+        commit(results)
+    monkeypatch.undo()
+    assert _contents(locales) == SOURCES
+    assert sorted(os.listdir(os.path.dirname(locales['de']))) == ['de.ts', 'fr.ts', 'it.ts']
+
+
+def test_failed_staging_touches_nothing(locales, monkeypatch):
+    results = [apply_patch(p) for p in _patches(locales, set={'home_title': 'X'})]
+    real_write = locale_batch.atomic_write
+    calls = []
+
+    def flaky_write(path, text):
+        calls.append(path)
+        if len(calls) == 3:
+            raise OSError('read-only')
+        return real_write(path, text)
+
+    monkeypatch.setattr(locale_batch, 'atomic_write', flaky_write)
+    with pytest.raises(BatchError, match='no locale was modified'):
+        commit(results)
+    assert _contents(locales) == SOURCES
+    assert sorted(os.listdir(os.path.dirname(locales['de']))) == ['de.ts', 'fr.ts', 'it.ts']
+
+
+def test_concurrent_edit_aborts_the_batch(locales):
+    results = [apply_patch(p) for p in _patches(locales, set={'home_title': 'X'})]
+    edited = SOURCES['it'].replace('Inizio', 'Casa')
+    with open(locales['it'], 'w', encoding='utf-8') as f:
+        f.write(edited)
+    with pytest.raises(BatchError, match='it: file changed on disk'):
+        commit(results)
+    assert _contents(locales) == {**SOURCES, 'it': edited}
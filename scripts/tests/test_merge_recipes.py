@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from merge_recipes import iter_merged, plan_merge
+
+
+def _source(tmp_path, name, recipes):
+    path = tmp_path / name
+    path.write_text(json.dumps(recipes, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    seed = _source(tmp_path, 'seed.json', {'Italy': [
+        {'idMeal': '1', 'strMeal': 'Carbonara', 'strInstructions': 'Boil.'},
+        {'idMeal': '2', 'strMeal': 'Risotto', 'strInstructions': 'Stir.'},
+    ]})
+    extra = _source(tmp_path, 'extra.json', {'Italy': [
+        # Same id, different content: the earlier source wins.
+        {'idMeal': '1', 'strMeal': 'Carbonara', 'strInstructions': 'Boil the pasta.', 'strTags': 'Pasta'},
+        # Same content: a plain duplicate.
+        {'idMeal': '2', 'strMeal': 'Risotto', 'strInstructions': 'Stir.'},
+        # Another id with the same name: joined by name.
+        {'idMeal': '9', 'strMeal': 'RISOTTO ', 'strInstructions': 'Stir well.'},
+    ]})
+    return [seed, extra]
+
+
+def test_conflicts_keep_the_earlier_source(sources):
+    plan = plan_merge(sources)
+    assert plan.read == 5
+    assert plan.duplicates == 1
+    by_join = {c['join']: c for c in plan.conflicts}
+    assert sorted(by_join) == ['idMeal', 'name']
+
+    conflict = by_join['idMeal']
+    assert conflict['key'] == '1'
+    assert conflict['kept']['source'].endswith('seed.json')
+    assert [d['source'].endswith('extra.json') for d in conflict['dropped']] == [True]
+    assert conflict['fields'] == ['strInstructions', 'strTags']
+
+    assert by_join['name']['key'] == 'italy / risotto'
+    assert [d['idMeal'] for d in by_join['name']['dropped']] == ['9']
+    assert [r['strInstructions'] for r in iter_merged(plan)] == ['Boil.', 'Stir.']
+
+
+def test_the_more_complete_record_wins_within_a_source(tmp_path):
+    path = _source(tmp_path, 'recipes.json', {'Peru': [
+        {'idMeal': '5', 'strMeal': 'Ceviche'},
+        {'idMeal': '5', 'strMeal': 'Ceviche', 'strInstructions': 'Cure the fish.'},
+    ]})
+    plan = plan_merge([path])
+    assert [r.get('strInstructions') for r in iter_merged(plan)] == ['Cure the fish.']
+
+
+def test_records_without_an_id_are_not_joined_on_it(tmp_path):
+    path = _source(tmp_path, 'recipes.json', {'Peru': [
+        {'strMeal': 'Ceviche'},
+        {'idMeal': None, 'strMeal': 'Causa'},
+        {'idMeal': '', 'strInstructions': 'No name either.'},
+        {'strInstructions': 'Nor this one.'},
+        {'strMeal': 'causa', 'strInstructions': 'Layer the potatoes.'},
+    ]})
+    plan = plan_merge([path])
+    assert plan.read == 5
+    assert not plan.duplicates
+    # Only the two Causas share a key, and that's a name join.
+    assert [(c['join'], c['key']) for c in plan.conflicts] == [('name', 'peru / causa')]
+    merged = list(iter_merged(plan))
+    assert len(merged) == 4
+    assert [r.get('strMeal') for r in merged] == ['Ceviche', None, None, 'causa']
@@ -0,0 +1,42 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from optimize_sounds import optimize, read_wav
+
+SETTINGS = {'rate': 22050, 'bits': 16, 'channels': 1, 'silence': -50.0, 'peak': -1.0}
+
+
+def _tone(path, dbfs, seconds=1.0, rate=44100):
+    t = np.arange(int(rate * seconds)) / rate
+    samples = (10 ** (dbfs / 20)) * np.sin(2 * np.pi * 440 * t)
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((samples * 32767).astype('<i2').tobytes())
+    path.write_bytes(out.getvalue())
+    return str(path)
+
+
+def test_clip_below_threshold_is_left_alone(tmp_path):
+    path = _tone(tmp_path / 'quiet.wav', -54)
+    _, before, after, duration, new_duration, action, data = optimize(path, SETTINGS)
+    assert action == 'skipped: all below threshold'
+    assert data is None
+    assert after == before == 88244
+    assert new_duration == duration == pytest.approx(1.0)
+
+
+def test_audible_clip_is_optimized(tmp_path):
+    path = _tone(tmp_path / 'tone.wav', -6)
+    _, before, after, _, new_duration, action, data = optimize(path, SETTINGS)
+    assert data is not None and after == len(data) < before
+    assert action == '1ch 44k/16 -> 1ch 22k/16'
+    samples, rate, channels, bits = read_wav(data)
+    assert (rate, channels, bits) == (22050, 1, 16)
+    assert len(samples) / rate == pytest.approx(new_duration)
+    assert np.abs(samples).max() == pytest.approx(10 ** (-1 / 20), abs=0.01)
@@ -0,0 +1,77 @@
+import pytest
+
+from recipe_measures import NO_AMOUNT, Measure, attach_measures, parse_measure, parse_quantity
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1 1/2 cups', Measure(1.5, None, 'cup')),
+    ('1-1/2 cups', Measure(1.5, None, 'cup')),
+    ('2-3/4 tsp', Measure(2.75, None, 'tsp')),
+    ('1/2 tsp', Measure(0.5, None, 'tsp')),
+    ('1.5 kg', Measure(1.5, None, 'kg')),
+    ('1,5 l', Measure(1.5, None, 'l')),
+])
+def test_mixed_numbers_and_decimals(text, expected):
+    assert parse_measure(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('½ cup', Measure(0.5, None, 'cup')),
+    ('1½ tsp', Measure(1.5, None, 'tsp')),
+    ('2 ¾ cups', Measure(2.75, None, 'cup')),
+    ('⅓ cup', Measure(1 / 3, None, 'cup')),
+    ('⅛ tsp', Measure(0.125, None, 'tsp')),
+])
+def test_unicode_fractions(text, expected):
+    assert parse_measure(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2-3 cloves', Measure(2.0, 3.0, 'count')),
+    ('2 – 3 tbsp', Measure(2.0, 3.0, 'tbsp')),
+    ('2 to 3 cups', Measure(2.0, 3.0, 'cup')),
+    ('1/2-1 cup', Measure(0.5, 1.0, 'cup')),
+    ('1-1 1/2 cups', Measure(1.0, 1.5, 'cup')),
+    ('½-1 tsp', Measure(0.5, 1.0, 'tsp')),
+])
+def test_ranges(text, expected):
+    assert parse_measure(text) == expected
+
+
+@pytest.mark.parametrize('text', ['3-2 cups', '1 - 1/2 cup', '2 to 1 tbsp'])
+def test_backwards_ranges_are_rejected(text):
+    assert parse_measure(text) == NO_AMOUNT
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('4 x 180 g', Measure(720.0, None, 'g')),
+    ('1 can (410 g)', Measure(410.0, None, 'g')),
+    ('pinch', Measure(1.0, None, 'pinch')),
+    ('to taste', NO_AMOUNT),
+    ('', NO_AMOUNT),
+])
+def test_multipliers_brackets_and_words(text, expected):
+    assert parse_measure(text) == expected
+
+
+def test_parse_quantity():
+    assert parse_quantity('1-1/2') == 1.5
+    assert parse_quantity('3 1/4') == 3.25
+    assert parse_quantity('1 ½') == 1.5
+    with pytest.raises(ZeroDivisionError):
+        parse_quantity('1/0')
+
+
+def test_attach_measures_converts_to_base_units():
+    recipes = [{'ingredients': [
+        {'name': 'flour', 'measure': '1-1/2 cups'},
+        {'name': 'garlic', 'measure': '2-3 cloves'},
+        {'name': 'salt', 'measure': 'to taste'},
+        {'name': 'stock', 'measure': '3-2 cups'},
+    ]}]
+    counts = attach_measures(recipes)
+    flour, garlic, salt, stock = recipes[0]['ingredients']
+    assert flour['q'] == [360, 'ml']
+    assert garlic['q'] == [2, 3, 'count']
+    assert 'q' not in salt and 'q' not in stock
+    assert counts == {'ml': 1, 'count': 1, 'none': 2}
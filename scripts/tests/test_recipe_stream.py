@@ -0,0 +1,88 @@
+import json
+import sys
+
+import pytest
+
+import recipe_stream
+from recipe_stream import read_corpus
+
+# Two pasted batches: a comment and a bullet between them, a hard-wrapped
+# string, a missing and a trailing comma, a malformed record, an unclosed
+# array and a repeated idMeal.
+CORPUS = b"""{ "Italy": [
+  {"idMeal": "1", "strMeal": "Carbonara", "strInstructions": "Boil the
+     pasta."},
+  {"idMeal": "2", "strMeal": "Risotto" "strArea": "Italian"},
+  {"idMeal": "3", "strMeal": "Broken" : "oops"},
+  {"idMeal": "4", "strMeal": "Tiramisu",},
+] }
+// batch 2
+\xe2\x80\xa2 { "Italy": [
+  {"idMeal": "1", "strMeal": "Carbonara again"}
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / 'recipes.json'
+    path.write_bytes(CORPUS)
+    return str(path)
+
+
+def _issues(record, kind):
+    return [i.detail for i in record.issues if i.kind == kind]
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64 * 1024])
+def test_repairs_and_drops(corpus, chunk_size):
+    records, trailing = read_corpus(corpus, chunk_size)
+    records = list(records)
+    assert [r.recipe['idMeal'] for r in records] == ['1', '2', '4', '1']
+    carbonara, risotto, tiramisu, again = records
+
+    assert carbonara.recipe['strInstructions'] == 'Boil the pasta.'
+    assert carbonara.recipe['strArea'] == 'Italy'
+    assert _issues(carbonara, 'repaired') == ['joined 1 hard-wrapped line(s) in a string']
+    assert _issues(risotto, 'repaired') == ['inserted missing comma']
+    assert risotto.recipe['strArea'] == 'Italian'
+
+    # The malformed record is dropped and reading resumes at the next idMeal.
+    dropped = _issues(tiramisu, 'dropped')
+    assert len(dropped) == 1 and dropped[0].startswith("record in 'Italy': unexpected ':' in object")
+    assert tiramisu.recipe == {'idMeal': '4', 'strMeal': 'Tiramisu', 'strArea': 'Italy'}
+    assert 'dropped trailing comma' in _issues(tiramisu, 'repaired')
+
+    assert any(d.startswith('comment') for d in _issues(again, 'skipped'))
+    assert any('stray text' in d for d in _issues(again, 'skipped'))
+    assert [i.kind for i in trailing] == ['repaired']
+    assert 'at end of file' in trailing[0].detail
+
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['recipe_stream.py', *argv])
+    with pytest.raises(SystemExit) as exit_info:
+        recipe_stream.main()
+    return exit_info.value.code
+
+
+def test_cli_drops_repeated_ids(corpus, tmp_path, monkeypatch, capsys):
+    out = tmp_path / 'recipes.jsonl'
+    assert _run(monkeypatch, corpus, '-q', '-o', str(out)) == 1
+    lines = [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()]
+    assert [r['strMeal'] for r in lines] == ['Carbonara', 'Risotto', 'Tiramisu']
+    assert '1 duplicates, 1 dropped records' in capsys.readouterr().out
+
+
+def test_cli_keeps_records_without_an_id(tmp_path, monkeypatch):
+    path = tmp_path / 'recipes.json'
+    path.write_text(json.dumps({'Peru': [
+        {'strMeal': 'Ceviche'},
+        {'idMeal': None, 'strMeal': 'Causa'},
+        {'idMeal': '', 'strMeal': 'Lomo saltado'},
+        {'idMeal': 7, 'strMeal': 'Aji de gallina'},
+        {'idMeal': '7', 'strMeal': 'Aji de gallina'},
+    ]}), encoding='utf-8')
+    out = tmp_path / 'recipes.jsonl'
+    assert _run(monkeypatch, str(path), '-q', '-o', str(out)) == 0
+    meals = [json.loads(line)['strMeal'] for line in out.read_text(encoding='utf-8').splitlines()]
+    assert meals == ['Ceviche', 'Causa', 'Lomo saltado', 'Aji de gallina']
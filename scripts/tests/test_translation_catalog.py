@@ -0,0 +1,109 @@
+import pytest
+
+from translation_catalog import Catalog, CatalogParseError
+
+SOURCE = """export const fr = {
+  // Home
+  home_title: 'Accueil',
+  home_welcome_back: "Bon retour, {{name}} !", // shown after login
+  'quoted-key': 'C\\'est ' + 'long',
+
+  // Premium
+  premium_title: 'Premium',
+  premium_cta: `Essayer`,
+  home_title: 'Doublon',
+  computed: t('x')
+};
+"""
+
+
+def test_parse_index():
+    catalog = Catalog(SOURCE, 'fr.ts')
+    assert catalog.var_name == 'fr'
+    assert catalog.keys() == ['home_title', 'home_welcome_back', 'quoted-key', 'premium_title', 'premium_cta', 'computed']
+    assert catalog.get('home_welcome_back') == 'Bon retour, {{name}} !'
+    assert catalog.get('quoted-key') == "C'est long"
+    assert catalog.get('premium_cta') == 'Essayer'
+    assert catalog.get('computed') is None
+    assert [g.label for g in catalog.groups] == ['Home', 'Premium']
+    assert catalog.index['premium_title'].group == 'Premium'
+    assert list(catalog.duplicates) == ['home_title']
+    assert catalog.get('home_title') == 'Accueil'
+
+
+def test_untouched_render_is_identical():
+    catalog = Catalog(SOURCE)
+    assert catalog.render() == SOURCE
+    catalog.set('home_title', 'Accueil')
+    assert not catalog.dirty
+    assert catalog.render() == SOURCE
+
+
+def test_set_replaces_only_the_value_span():
+    catalog = Catalog(SOURCE)
+    assert catalog.set('home_welcome_back', "Re-bonjour l'ami {{name}}")
+    rendered = catalog.render()
+    assert '''  home_welcome_back: "Re-bonjour l'ami {{name}}", // shown after login\n''' in rendered
+    assert rendered.replace('''"Re-bonjour l'ami {{name}}"''', '"Bon retour, {{name}} !"') == SOURCE
+    assert Catalog(rendered).get('home_welcome_back') == "Re-bonjour l'ami {{name}}"
+
+
+def test_set_never_inserts():
+    catalog = Catalog(SOURCE)
+    with pytest.raises(KeyError):
+        catalog.set('premium_new', 'Nouveau')
+    assert catalog.render() == SOURCE
+
+
+def test_insert_after_group_and_new_block():
+    catalog = Catalog(SOURCE)
+    catalog.insert('home_subtitle', 'Bienvenue', group='Home')
+    catalog.insert('extra', 'En plus', group='Extra')
+    rendered = catalog.render()
+    assert "  'quoted-key': 'C\\'est ' + 'long',\n  home_subtitle: 'Bienvenue',\n" in rendered
+    # The last entry had no trailing comma; the new block needs one.
+    assert "  computed: t('x'),\n\n  // Extra\n  extra: 'En plus',\n};\n" in rendered
+    parsed = Catalog(rendered)
+    assert parsed.get('home_subtitle') == 'Bienvenue'
+    assert parsed.index['extra'].group == 'Extra'
+    with pytest.raises(KeyError):
+        catalog.insert('home_title', 'Encore')
+
+
+def test_delete_and_dedupe():
+    catalog = Catalog(SOURCE)
+    assert catalog.dedupe() == ['home_title']
+    assert catalog.delete('quoted-key')
+    assert not catalog.delete('quoted-key')
+    assert 'quoted-key' not in catalog
+    parsed = Catalog(catalog.render())
+    assert parsed.keys() == ['home_title', 'home_welcome_back', 'premium_title', 'premium_cta', 'computed']
+    assert parsed.get('home_title') == 'Accueil'
+    assert not parsed.duplicates
+
+
+def test_deleting_a_whole_group_drops_its_heading():
+    catalog = Catalog(SOURCE)
+    for key in ('premium_title', 'premium_cta', 'home_title', 'computed'):
+        catalog.delete(key)
+    rendered = catalog.render()
+    assert '// Premium' not in rendered
+    assert rendered.endswith("'quoted-key': 'C\\'est ' + 'long',\n};\n")
+    assert Catalog(rendered).keys() == ['home_welcome_back', 'quoted-key']
+
+
+def test_crlf_is_kept_for_new_lines():
+    source = SOURCE.replace('\n', '\r\n')
+    catalog = Catalog(source)
+    assert catalog.newline == '\r\n'
+    catalog.set('premium_title', 'Prime')
+    catalog.insert('home_subtitle', 'Bienvenue', group='Home')
+    rendered = catalog.render()
+    assert '\n' not in rendered.replace('\r\n', '')
+    assert Catalog(rendered).get('premium_title') == 'Prime'
+
+
+@pytest.mark.parametrize('text', ['const fr = {};', "export const fr = {\n  a: 'x',\n", "export const fr = {\n  a 'x'\n};"])
+def test_malformed_modules(text):
+    with pytest.raises(CatalogParseError):
+        Catalog(text)
@@ -1,7 +1,14 @@
 
+import argparse
 import os
+import sys
 
-directory = r'e:\EXPO Training\taste-the-world\constants\translations'
+import build_trace
+from content_manifest import Manifest
+from locale_batch import BatchError, LocalePatch, run_batch
+from translation_catalog import BASE_LOCALE, TRANSLATIONS_DIR, load_catalog
+
+directory = TRANSLATIONS_DIR
 
 translations = {
     'fr': {
@@ -188,112 +195,40 @@ translations = {
     },
 }
 
-for lang, keys in translations.items():
-    filepath = os.path.join(directory, f"{lang}.ts")
-    if os.path.exists(filepath):
-        # 1. READ FILE
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
 
-        # 2. CHECK FOR DUPLICATES (Clean up)
-        # Check if "  // Premium Benefits" appears more than once
-        # The same cleanup logic as before
-        parts = content.split("  // Premium Benefits")
-        if len(parts) > 2:
-            print(f"Cleaning duplicates in {lang}...")
-            # Keep parts[0] + "  // Premium Benefits" + parts[1] (cleaned)
-            content = parts[0] + "  // Premium Benefits" + parts[1]
-            
-            # Ensure proper closing
-            # Just trim after the last expected key from part[1] or similar
-            # A simpler way: Find the LAST closing brace `};` and cut everything after it?
-            # Or assume parts[1] is the good block and just needs a closing brace if it was cut.
-            
-            # Since I know the structure, let's just make sure it ends with }; 
-            # and remove any subsequent garbage.
-            
-            # The "Cleaning" relies on identifying where the valid block ends.
-            # In my previous script, I relied on finding the second occurrence start.
-            
-            first_occurrence = content.find("  // Premium Benefits")
-            second_occurrence_in_original = parts[0].count("  // Premium Benefits") 
-            # wait, split removes it.
-            
-            # Let's re-read the file content logic from previous script attempt
-            # The previous script used:
-            # first = content.find(...)
-            # second = content.find(..., first + 1)
-            # if second != -1: content = content[:second]...
-            
-            # Re-implement that logic here for safety
-            first_idx = content.find("  // Premium Benefits")
-            if first_idx != -1:
-                second_idx = content.find("  // Premium Benefits", first_idx + 1)
-                if second_idx != -1:
-                    content = content[:second_idx].rstrip()
-                    if not content.strip().endswith('};'):
-                        # Fix closing
-                         if content.strip().endswith(','):
-                              content = content.rstrip().rstrip(',') + "\n};"
-                         elif content.strip().endswith('}'):
-                              content = content.rstrip() + ";"
-                         else:
-                              content += "\n};"
-        
-        # 3. APPEND OR UPDATE KEYS
-        # If the file lacks the keys entirely (e.g. I didn't run update_translations.py on it yet), append them.
-        # If it has them (English), update them.
-        
-        has_keys = 'premium_benefit_countries' in content
-        
-        updated_content = content
-        
-        if not has_keys:
-             print(f"Appending keys to {lang}...")
-             # Prepare the block
-             new_block = "\n\n  // Premium Benefits\n"
-             for k, v in keys.items():
-                 # Handle quotes
-                 val = v.replace("'", "\\'") 
-                 new_block += f"  {k}: '{val}',\n"
-             new_block += "};\n"
-             
-             # Remove last };
-             updated_content = updated_content.rstrip()
-             if updated_content.endswith('};'):
-                 updated_content = updated_content[:-2]
-             
-             if not updated_content.strip().endswith(','):
-                  updated_content += ","
-                  
-             updated_content += new_block
-             
-        else:
-             print(f"Updating keys in {lang}...")
-             for k, v in keys.items():
-                 # Regex replace existing key
-                 import re
-                 # pattern:   key: '...',
-                 # value can be anything.
-                 val_escaped = v.replace("'", "\\'")
-                 new_line = f"  {k}: '{val_escaped}',"
-                 
-                 # Regex:   key \s* : \s* ['"] .* ['"] ,?
-                 # Be careful with multi-line matches if present.
-                 # Assuming single line for now as most represent my previous insertions.
-                 
-                 pattern = f"{k}\\s*:\\s*['\"].*['\"],?"
-                 
-                 # Check if it exists with regex
-                 if re.search(pattern, updated_content):
-                     updated_content = re.sub(pattern, new_line, updated_content)
-                 else:
-                     # It might be multiline or formatting differs. 
-                     # If I can't find it easily, I might skip or brute force append? 
-                     # Better to leave it if I can't safely replace.
-                     pass
+def build_patches():
+    """Patches that update existing premium keys, plus the keys en.ts doesn't have."""
+    base = load_catalog(os.path.join(directory, f"{BASE_LOCALE}.ts"))
+    patches, unknown = [], set()
+    for lang, keys in translations.items():
+        filepath = os.path.join(directory, f"{lang}.ts")
+        if os.path.exists(filepath):
+            unknown.update(k for k in keys if k not in base)
+            # set only updates keys the locale already has; missing ones show
+            # up in the report. dedupe: repeated runs of the older scripts left
+            # duplicate "Premium Benefits" blocks behind; keep the first.
+            known = {k: v for k, v in keys.items() if k in base}
+            patches.append(LocalePatch(lang, filepath, set=known, dedupe=True))
+    return patches, sorted(unknown)
+
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Translate the premium benefit keys in every locale.')
+    parser.add_argument('--dry-run', action='store_true', help='patch in memory only, write nothing')
+    parser.add_argument('--workers', type=int, default=None)
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
 
-print("Done translating/updating all files.")
+    try:
+        with build_trace.run('translate_premium_all_final', args):
+            patches, unknown = build_patches()
+            report = run_batch(
+                patches, workers=args.workers, dry_run=args.dry_run, manifest=Manifest('translations')
+            )
+    except BatchError as e:
+        print(f"Aborted: {e}")
+        sys.exit(1)
+    report.print()
+    for key in unknown:
+        print(f"Skipped {key}: not in {BASE_LOCALE}.ts")
+    print("Done translating/updating all files.")
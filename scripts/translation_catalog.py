@@ -0,0 +1,457 @@
+"""
+Structured parser for the `export const xx = { ... };` locale modules in
+constants/translations.
+
+A single scan over the file builds an index of every entry (key -> span,
+decoded value, comment group). Edits (set / insert / delete / dedupe) are
+recorded as span replacements against the original text and applied in one
+pass by `render()`, so everything we don't touch keeps its exact formatting.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import build_trace
+
+TRANSLATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'constants', 'translations'
+)
+BASE_LOCALE = 'en'
+INDENT = '  '
+# `{{name}}` interpolation slots, matched exactly like LanguageContext's t().
+PLACEHOLDER_RE = re.compile(r'\{\{([A-Za-z0-9_]+)\}\}')
+
+
+class CatalogParseError(ValueError):
+    """Raised when a locale module doesn't look like `export const xx = {...}`."""
+
+
+@dataclass
+class Entry:
+    key: str
+    # Decoded string value, or None when the expression isn't a plain
+    # (possibly concatenated) string literal.
+    value: Optional[str]
+    # Full line span: indentation through trailing comma, comment and newline.
+    start: int
+    end: int
+    # Span of the value expression only.
+    value_start: int
+    value_end: int
+    has_comma: bool
+    group: Optional[str]
+
+
+@dataclass
+class Group:
+    """A `// Heading` comment and the entries that follow it."""
+
+    label: str
+    start: int
+    end: int
+    entries: List[Entry] = field(default_factory=list)
+
+
+def _line_start(text: str, pos: int) -> int:
+    """Start of the line containing pos if only whitespace precedes pos on it."""
+    i = pos
+    while i > 0 and text[i - 1] in ' \t':
+        i -= 1
+    if i == 0 or text[i - 1] == '\n':
+        return i
+    return pos
+
+
+def _line_end(text: str, pos: int) -> int:
+    """Consume trailing spaces, an optional `//` comment and the newline."""
+    i = pos
+    n = len(text)
+    while i < n and text[i] in ' \t':
+        i += 1
+    if text.startswith('//', i):
+        nl = text.find('\n', i)
+        i = n if nl == -1 else nl
+    if i < n and text[i] == '\r':
+        i += 1
+    if i < n and text[i] == '\n':
+        i += 1
+        return i
+    return pos
+
+
+_STRING_RE = {
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.S),
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.S),
+    '`': re.compile(r'`(?:[^`\\]|\\.)*`', re.S),
+}
+_SPACE_RE = re.compile(r'[ \t\r\n]*')
+_IDENT_RE = re.compile(r'[A-Za-z0-9_$]*')
+
+
+def _skip_string(text: str, i: int) -> int:
+    match = _STRING_RE[text[i]].match(text, i)
+    if match is None:
+        raise CatalogParseError(f'Unterminated string literal at offset {i}')
+    return match.end()
+
+
+def _decode_string(raw: str) -> Optional[str]:
+    quote = raw[0]
+    body = raw[1:-1]
+    if quote == '`' and '${' in body:
+        return None
+    if '\\' not in body:
+        return body
+    out = []
+    i = 0
+    n = len(body)
+    simple = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+    while i < n:
+        c = body[i]
+        if c != '\\':
+            out.append(c)
+            i += 1
+            continue
+        nxt = body[i + 1] if i + 1 < n else ''
+        if nxt in simple:
+            out.append(simple[nxt])
+            i += 2
+        elif nxt == 'x':
+            out.append(chr(int(body[i + 2:i + 4], 16)))
+            i += 4
+        elif nxt == 'u' and body.startswith('{', i + 2):
+            close = body.index('}', i + 3)
+            out.append(chr(int(body[i + 3:close], 16)))
+            i = close + 1
+        elif nxt == 'u':
+            out.append(chr(int(body[i + 2:i + 6], 16)))
+            i += 6
+        elif nxt == '\n':
+            i += 2
+        else:
+            out.append(nxt)
+            i += 2
+    return ''.join(out)
+
+
+def placeholders(value: Optional[str]) -> set:
+    return set(PLACEHOLDER_RE.findall(value)) if value else set()
+
+
+def format_value(value: str) -> str:
+    """Render a string the way Prettier would (prefer single quotes)."""
+    escaped = value.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t')
+    if "'" in value and '"' not in value:
+        return '"' + escaped + '"'
+    return "'" + escaped.replace("'", "\\'") + "'"
+
+
+class Catalog:
+    """Index over one locale module plus a queue of pending edits."""
+
+    def __init__(self, text: str, name: str = '<catalog>'):
+        self.text = text
+        self.name = name
+        # Most locale files were saved on Windows; new lines follow suit.
+        self.newline = '\r\n' if text.count('\r\n') * 2 > text.count('\n') else '\n'
+        self.var_name = ''
+        self.entries: List[Entry] = []
+        self.index: Dict[str, Entry] = {}
+        self.duplicates: Dict[str, List[Entry]] = {}
+        self.groups: List[Group] = []
+        self.body_start = 0
+        self.body_end = 0
+        self._edits: Dict[Tuple[int, int], str] = {}
+        self._deleted: set = set()
+        self._appended: List[Tuple[Optional[str], str, str]] = []
+        self._parse()
+
+    # ----------------------------------------------------------- parsing
+
+    def _parse(self):
+        text = self.text
+        head = text.find('export const ')
+        if head == -1:
+            raise CatalogParseError(f'{self.name}: missing `export const`')
+        eq = text.find('=', head)
+        brace = text.find('{', eq)
+        if eq == -1 or brace == -1:
+            raise CatalogParseError(f'{self.name}: missing object literal')
+        self.var_name = text[head + len('export const '):eq].strip()
+        self.body_start = brace + 1
+
+        i = self.body_start
+        n = len(text)
+        group: Optional[Group] = None
+        while i < n:
+            c = text[i]
+            if c in ' \t\r\n,':
+                i = _SPACE_RE.match(text, i + 1).end()
+            elif text.startswith('//', i):
+                nl = text.find('\n', i)
+                end = n if nl == -1 else nl + 1
+                label = text[i + 2:end].strip()
+                start = _line_start(text, i)
+                if group is not None and not group.entries and group.end == start:
+                    # Multi-line comment heading: extend the current group.
+                    group.end = end
+                    group.label = f'{group.label} {label}'.strip()
+                else:
+                    group = Group(label=label, start=start, end=end)
+                    self.groups.append(group)
+                i = end
+            elif text.startswith('/*', i):
+                close = text.find('*/', i + 2)
+                if close == -1:
+                    raise CatalogParseError(f'{self.name}: unterminated comment')
+                i = close + 2
+            elif c == '}':
+                self.body_end = i
+                return
+            else:
+                i = self._parse_entry(i, group)
+        raise CatalogParseError(f'{self.name}: unbalanced object literal')
+
+    def _parse_entry(self, i: int, group: Optional[Group]) -> int:
+        text = self.text
+        key_start = i
+        if text[i] in '\'"':
+            i = _skip_string(text, i)
+            key = _decode_string(text[key_start:i]) or ''
+        else:
+            i = _IDENT_RE.match(text, i).end()
+            key = text[key_start:i]
+        if not key:
+            raise CatalogParseError(f'{self.name}: unexpected {text[key_start]!r} at offset {key_start}')
+
+        colon = i
+        while text[colon] in ' \t':
+            colon += 1
+        if text[colon] != ':':
+            raise CatalogParseError(f'{self.name}: expected `:` after {key!r}')
+        i = _SPACE_RE.match(text, colon + 1).end()
+
+        value_start = i
+        parts: List[Optional[str]] = []
+        plain = True
+        depth = 0
+        last_token_end = i
+        while True:
+            c = text[i]
+            if c in '\'"`':
+                end = _skip_string(text, i)
+                if depth == 0:
+                    parts.append(_decode_string(text[i:end]))
+                i = end
+                last_token_end = i
+            elif text.startswith('//', i):
+                i = text.index('\n', i)
+            elif text.startswith('/*', i):
+                i = text.index('*/', i) + 2
+            elif c in '([{':
+                depth += 1
+                plain = False
+                i += 1
+                last_token_end = i
+            elif c in ')]}' and depth > 0:
+                depth -= 1
+                i += 1
+                last_token_end = i
+            elif depth == 0 and c in ',}':
+                break
+            elif c in ' \t\r\n':
+                i = _SPACE_RE.match(text, i).end()
+            else:
+                if c != '+':
+                    plain = False
+                i += 1
+                last_token_end = i
+        value_end = last_token_end
+
+        has_comma = text[i] == ','
+        after = i + 1 if has_comma else value_end
+        value = None
+        if plain and parts and None not in parts:
+            value = ''.join(parts)
+
+        entry = Entry(
+            key=key,
+            value=value,
+            start=_line_start(text, key_start),
+            end=_line_end(text, after),
+            value_start=value_start,
+            value_end=value_end,
+            has_comma=has_comma,
+            group=group.label if group else None,
+        )
+        if group is not None:
+            group.entries.append(entry)
+        self.entries.append(entry)
+        if key in self.index:
+            self.duplicates.setdefault(key, [self.index[key]]).append(entry)
+        else:
+            self.index[key] = entry
+        return entry.end
+
+    # ----------------------------------------------------------- queries
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index and id(self.index[key]) not in self._deleted
+
+    def keys(self) -> List[str]:
+        return [k for k, e in self.index.items() if id(e) not in self._deleted]
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        entry = self.index.get(key)
+        if entry is None or id(entry) in self._deleted:
+            return default
+        return entry.value
+
+    def as_dict(self) -> Dict[str, Optional[str]]:
+        return {k: self.index[k].value for k in self.keys()}
+
+    def find_group(self, label: str) -> Optional[Group]:
+        for group in self.groups:
+            if group.label == label:
+                return group
+        return None
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._edits or self._deleted or self._appended)
+
+    # ----------------------------------------------------------- edits
+
+    def set(self, key: str, value: str) -> bool:
+        """Update an existing `key` in place. Returns True on change."""
+        entry = self.index.get(key)
+        if entry is None or id(entry) in self._deleted:
+            raise KeyError(f'{self.name}: {key!r} does not exist')
+        if entry.value == value:
+            return False
+        self._edits[(entry.value_start, entry.value_end)] = format_value(value)
+        return True
+
+    def insert(self, key: str, value: str, group: Optional[str] = None):
+        """Queue a new entry; placed after `group`'s entries or in a new block."""
+        if key in self:
+            raise KeyError(f'{self.name}: {key!r} already exists')
+        self._appended.append((group, key, value))
+
+    def delete(self, key: str) -> bool:
+        entry = self.index.get(key)
+        if entry is None or id(entry) in self._deleted:
+            return False
+        for e in self.duplicates.get(key, [entry]):
+            self._deleted.add(id(e))
+        return True
+
+    def dedupe(self) -> List[str]:
+        """Drop every repeated occurrence of a key, keeping the first one."""
+        for dupes in self.duplicates.values():
+            for e in dupes[1:]:
+                self._deleted.add(id(e))
+        return list(self.duplicates)
+
+    # ----------------------------------------------------------- output
+
+    def render(self) -> str:
+        if not self.dirty:
+            return self.text
+        text = self.text
+        deleted = {id(e) for e in self.entries if id(e) in self._deleted}
+        survivors = [e for e in self.entries if id(e) not in deleted]
+
+        edits: List[Tuple[int, int, str]] = []
+        for e in self.entries:
+            if id(e) in deleted:
+                edits.append((e.start, e.end, ''))
+        for (start, end), replacement in self._edits.items():
+            edits.append((start, end, replacement))
+
+        # A block whose entries were all removed goes as a whole: heading,
+        # interior blank lines and the blank lines that separated it.
+        for g in self.groups:
+            if g.entries and all(id(e) in deleted for e in g.entries):
+                start = g.start
+                end = _line_start(text, _SPACE_RE.match(text, g.entries[-1].end).end())
+                if end >= _line_start(text, self.body_end):
+                    end = g.entries[-1].end
+                    while start > 0:
+                        prev = text.rfind('\n', 0, start - 1)
+                        if text[prev + 1:start].strip():
+                            break
+                        start = prev + 1
+                edits.append((start, end, ''))
+
+        if self._appended:
+            nl = self.newline
+            commas = set()
+            if survivors and not survivors[-1].has_comma:
+                commas.add(survivors[-1].value_end)
+            by_group: Dict[Optional[str], List[str]] = {}
+            for group_label, key, value in self._appended:
+                by_group.setdefault(group_label, []).append(f'{INDENT}{key}: {format_value(value)},{nl}')
+            trailing_blocks = []
+            for group_label, lines in by_group.items():
+                existing = self.find_group(group_label) if group_label else None
+                owned = [e for e in existing.entries if id(e) not in deleted] if existing else []
+                anchor = owned[-1] if owned else None
+                if anchor is not None and text[anchor.end - 1] == '\n':
+                    if not anchor.has_comma:
+                        commas.add(anchor.value_end)
+                    edits.append((anchor.end, anchor.end, ''.join(lines)))
+                else:
+                    header = f'{nl}{INDENT}// {group_label}{nl}' if group_label else ''
+                    trailing_blocks.append(header + ''.join(lines))
+            for pos in commas:
+                edits.append((pos, pos, ','))
+            if trailing_blocks:
+                close = _line_start(text, self.body_end)
+                edits.append((close, close, ''.join(trailing_blocks)))
+
+        edits.sort(key=lambda e: (e[0], e[1]))
+        out = []
+        pos = 0
+        for start, end, replacement in edits:
+            if start < pos:
+                # Nested in a span that was already removed.
+                continue
+            out.append(text[pos:start])
+            out.append(replacement)
+            pos = end
+        out.append(text[pos:])
+        return ''.join(out)
+
+
+def load_catalog(path: str) -> Catalog:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        build_trace.current().read(path, os.fstat(f.fileno()).st_size)
+        return Catalog(f.read(), os.path.basename(path))
+
+
+def save_catalog(catalog: Catalog, path: str) -> bool:
+    """Write the catalog back if it has pending edits. Returns True if written."""
+    if not catalog.dirty:
+        return False
+    rendered = catalog.render()
+    if rendered == catalog.text:
+        return False
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(rendered)
+    return True
+
+
+def locale_files(directory: str = TRANSLATIONS_DIR, include_base: bool = False) -> List[Tuple[str, str]]:
+    """Sorted (locale, path) pairs for every `.ts` module in `directory`."""
+    result = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.ts'):
+            continue
+        locale = filename[:-3]
+        if locale == BASE_LOCALE and not include_base:
+            continue
+        result.append((locale, os.path.join(directory, filename)))
+    return result
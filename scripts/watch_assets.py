@@ -0,0 +1,367 @@
+"""
+Watch the content sources and rebuild only the outputs a change affects.
+
+Each target names the files it is derived from and how to bring itself up
+to date from the set of paths that changed:
+
+  translations  constants/translations/xx.ts -> recompile xx.json and check
+                xx for drift; en.ts (or a new locale) -> full build and check
+  icons         assets/images/ico.png -> generate_icons, whose cache
+                re-renders only the sizes that are stale
+  recipes       a recipe source -> re-merge with only that file re-parsed
+                (the others stay parsed in memory), then the country shards
+                and the ingredient index; only shards whose bytes changed
+                are written. synonyms.json -> the ingredient index alone
+  geo           assets/countries.json -> build_geo and build_country_index
+  verify        anything else under assets/ -> verify_images on those files
+
+Events are debounced: a batch is handled once nothing has changed for
+--debounce ms, so an editor's write-rename-touch or a git checkout turns
+into one rebuild per target. Targets run concurrently in a thread pool; a
+target never runs twice at once, and changes that land while it runs are
+queued for its next run.
+
+File events come from watchdog (pip install watchdog) when it is installed;
+otherwise the watched directories are polled every --interval seconds.
+
+    python scripts/watch_assets.py
+    python scripts/watch_assets.py --once     # rebuild every target and exit
+"""
+
+import argparse
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+
+import build_country_index  # noqa: E402
+import build_geo  # noqa: E402
+from build_ingredient_index import SYNONYMS_PATH, write_index  # noqa: E402
+from build_recipe_shards import collect, write_shards  # noqa: E402
+from build_translations import build as build_translations, build_locale  # noqa: E402
+from check_translations import check_all  # noqa: E402
+from content_manifest import write_if_changed  # noqa: E402
+from generate_icons import ICONS, MASTER_PATH, generate  # noqa: E402
+from merge_recipes import SOURCES  # noqa: E402
+from recipe_stream import CorpusCache  # noqa: E402
+from translation_catalog import BASE_LOCALE, TRANSLATIONS_DIR  # noqa: E402
+from verify_images import DEFAULT_BUDGETS, verify  # noqa: E402
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+TRANSLATIONS = os.path.abspath(TRANSLATIONS_DIR)
+ASSETS_DIR = os.path.join(ROOT, 'assets')
+IGNORED_SUFFIXES = ('.tmp', '~', '.swp')
+
+
+@dataclass
+class Target:
+    name: str
+    matches: Callable[[str], bool]
+    # Changed paths (None: rebuild everything) -> one-line summary.
+    rebuild: Callable[[Optional[Set[str]]], str]
+
+
+def _rel(path: str) -> str:
+    return os.path.relpath(path, ROOT)
+
+
+def rebuild_translations(paths: Optional[Set[str]]) -> str:
+    locales = sorted({os.path.splitext(os.path.basename(p))[0] for p in paths or ()})
+    rows = {}
+    if paths is not None and BASE_LOCALE not in locales and all(os.path.exists(p) for p in paths):
+        for locale in locales:
+            row = build_locale(locale)
+            if row is None:
+                break
+            rows[locale] = row
+        else:
+            drift = check_all(TRANSLATIONS_DIR, locales)
+            return _translation_summary(rows, drift)
+    rows = build_translations()
+    return _translation_summary(rows, check_all(TRANSLATIONS_DIR), full=True)
+
+
+def _translation_summary(rows: Dict[str, dict], drift, full: bool = False) -> str:
+    written = sorted(locale for locale, row in rows.items() if row['written'])
+    failing = [d.locale for d in drift if not d.ok]
+    scope = f'all {len(rows)} locales' if full else ', '.join(sorted(rows))
+    return (
+        f"compiled {scope} ({', '.join(written) if written else 'nothing'} written); "
+        f"{f'drift in ' + ', '.join(failing) if failing else 'no drift'}"
+    )
+
+
+def rebuild_icons(paths: Optional[Set[str]]) -> str:
+    rows, fresh, updated = generate()
+    written = sum(r[4] for r in rows)
+    return (
+        f"rendered {len(rows)} of {len(ICONS)} icons ({fresh} up to date, {written} written)"
+        f"{', updated ' + ' and '.join(updated) if updated else ''}"
+    )
+
+
+class RecipeTarget:
+    """Keeps every source parsed between runs, so a change re-parses one file."""
+
+    def __init__(self):
+        self.corpus = CorpusCache()
+        self.sources = [os.path.abspath(p) for p in SOURCES]
+
+    def matches(self, path: str) -> bool:
+        return path in self.sources or path == os.path.abspath(SYNONYMS_PATH)
+
+    def rebuild(self, paths: Optional[Set[str]]) -> str:
+        sources = [p for p in self.sources if os.path.exists(p)]
+        by_area, counts = collect(sources, self.corpus.read)
+        parts = []
+        if paths is None or any(p in self.sources for p in paths):
+            report, counts = write_shards(by_area, counts)
+            written = sorted(area for area, row in report.items() if row['written'])
+            shown = ', '.join(written[:5]) + (f' and {len(written) - 5} more' if len(written) > 5 else '')
+            parts.append(f"{len(written)} of {len(report)} shards written{f' ({shown})' if written else ''}")
+        _, written = write_index([r for recipes in by_area.values() for r in recipes])
+        parts.append(f"ingredient index {'written' if written['index.json'] else 'unchanged'}")
+        return '; '.join(parts)
+
+
+def rebuild_geo(paths: Optional[Set[str]]) -> str:
+    outputs, _ = build_geo.build(
+        build_geo.SOURCE_PATH, build_geo.DEFAULT_KEEP, build_geo.DEFAULT_QUANTIZATION,
+        build_geo.DEFAULT_TOLERANCES, 'douglas-peucker', False,
+    )
+    geo_written = [n for n, data in outputs.items() if write_if_changed(os.path.join(build_geo.GEO_DIR, n), data)]
+    _, written = build_country_index.build(
+        build_geo.SOURCE_PATH, build_country_index.INDEX_DIR,
+        build_country_index.DEFAULT_TOLERANCE, build_country_index.DEFAULT_CELL,
+    )
+    return (
+        f"{len(geo_written)} geo files written, "
+        f"country index {'written' if written['index.json'] else 'unchanged'}"
+    )
+
+
+def rebuild_verify(paths: Optional[Set[str]]) -> str:
+    if paths is None:
+        paths = {os.path.join(d, f) for d, _, files in os.walk(ASSETS_DIR) for f in files}
+    problems = []
+    for path in sorted(p for p in paths if os.path.isfile(p)):
+        _, _, _, errors, warnings = verify(path, DEFAULT_BUDGETS)
+        problems.extend(f"{_rel(path)}: {message}" for message in errors + warnings)
+    return f"checked {len(paths)} files" + ''.join(f"\n    {p}" for p in problems)
+
+
+def make_targets() -> List[Target]:
+    recipes = RecipeTarget()
+    return [
+        Target(
+            'translations',
+            lambda p: os.path.dirname(p) == TRANSLATIONS and p.endswith('.ts'),
+            rebuild_translations,
+        ),
+        Target('icons', lambda p: p == os.path.abspath(MASTER_PATH), rebuild_icons),
+        Target('recipes', recipes.matches, recipes.rebuild),
+        Target('geo', lambda p: p == os.path.abspath(build_geo.SOURCE_PATH), rebuild_geo),
+        Target('verify', lambda p: p.startswith(ASSETS_DIR + os.sep), rebuild_verify),
+    ]
+
+
+def watched_dirs() -> List[Tuple[str, bool]]:
+    """(directory, recursive) pairs that cover every target's inputs."""
+    dirs = {TRANSLATIONS: False, ASSETS_DIR: True}
+    for path in SOURCES + [SYNONYMS_PATH]:
+        dirs.setdefault(os.path.dirname(os.path.abspath(path)), False)
+    return [(d, recursive) for d, recursive in sorted(dirs.items()) if os.path.isdir(d)]
+
+
+class Poller(threading.Thread):
+    """Fallback watcher: diffs (mtime, size) snapshots of the watched directories."""
+
+    def __init__(self, dirs: List[Tuple[str, bool]], notify: Callable[[str], None], interval: float):
+        super().__init__(daemon=True)
+        self.dirs = dirs
+        self.notify = notify
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for directory, recursive in self.dirs:
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    state[path] = (st.st_mtime_ns, st.st_size)
+                if not recursive:
+                    break
+        return state
+
+    def run(self):
+        previous = self.snapshot()
+        while not self._stop.wait(self.interval):
+            current = self.snapshot()
+            for path in previous.keys() | current.keys():
+                if previous.get(path) != current.get(path):
+                    self.notify(path)
+            previous = current
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_watcher(dirs: List[Tuple[str, bool]], notify: Callable[[str], None], interval: float):
+    """Returns (description, stop callable)."""
+    if Observer is None:
+        poller = Poller(dirs, notify, interval)
+        poller.start()
+        return f'polling every {interval:g}s (pip install watchdog for file events)', poller.stop
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            notify(event.src_path)
+            if getattr(event, 'dest_path', None):
+                notify(event.dest_path)
+
+    observer = Observer()
+    for directory, recursive in dirs:
+        observer.schedule(Handler(), directory, recursive=recursive)
+    observer.start()
+
+    def stop():
+        observer.stop()
+        observer.join()
+
+    return 'watching with watchdog', stop
+
+
+class Daemon:
+    def __init__(self, targets: List[Target], debounce: float, workers: Optional[int]):
+        self.targets = {t.name: t for t in targets}
+        self.debounce = debounce
+        self.pool = ThreadPoolExecutor(max_workers=workers or len(targets))
+        self.events: queue.Queue = queue.Queue()
+        # Paths waiting for a target's next run; None there means "everything".
+        self.pending: Dict[str, Optional[Set[str]]] = {}
+        self.running: Set[str] = set()
+
+    def notify(self, path: str):
+        self.events.put(('changed', os.path.abspath(path)))
+
+    def route(self, paths: Set[str]):
+        for path in paths:
+            if path.endswith(IGNORED_SUFFIXES):
+                continue
+            for target in self.targets.values():
+                if target.matches(path):
+                    queued = self.pending.setdefault(target.name, set())
+                    if queued is not None:
+                        queued.add(path)
+
+    def schedule_all(self):
+        for name in self.targets:
+            self.pending[name] = None
+
+    def dispatch(self):
+        for name in [n for n in self.pending if n not in self.running]:
+            paths = self.pending.pop(name)
+            self.running.add(name)
+            started = time.perf_counter()
+            future = self.pool.submit(self.targets[name].rebuild, paths)
+            future.add_done_callback(lambda f, name=name, paths=paths, started=started: self.events.put(
+                ('done', (name, paths, f, time.perf_counter() - started))
+            ))
+
+    def report(self, name: str, paths: Optional[Set[str]], future, elapsed: float) -> bool:
+        self.running.discard(name)
+        trigger = 'all' if paths is None else ', '.join(sorted(_rel(p) for p in paths)[:3]) + \
+            (f' and {len(paths) - 3} more' if len(paths) > 3 else '')
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"[{time.strftime('%H:%M:%S')}] {name:<12} FAILED after {elapsed:.2f}s ({trigger}): {e!r}")
+            return False
+        first, _, rest = summary.partition('\n')
+        print(f"[{time.strftime('%H:%M:%S')}] {name:<12} {elapsed:6.2f}s  {first}  ({trigger}){chr(10) + rest if rest else ''}")
+        return True
+
+    def run_once(self) -> bool:
+        self.schedule_all()
+        self.dispatch()
+        ok = True
+        while self.running:
+            kind, item = self.events.get()
+            if kind == 'done':
+                ok &= self.report(*item)
+        return ok
+
+    def run_forever(self):
+        batch: Set[str] = set()
+        deadline = None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            try:
+                kind, item = self.events.get(timeout=timeout)
+            except queue.Empty:
+                self.route(batch)
+                batch, deadline = set(), None
+                self.dispatch()
+                continue
+            if kind == 'changed':
+                batch.add(item)
+                deadline = time.monotonic() + self.debounce
+            else:
+                self.report(*item)
+                # Changes that arrived while it ran are waiting in pending.
+                if deadline is None:
+                    self.dispatch()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild derived assets as their sources change.')
+    parser.add_argument('--debounce', type=int, default=300, help='quiet period before a rebuild, ms')
+    parser.add_argument('--interval', type=float, default=1.0, help='polling interval without watchdog, s')
+    parser.add_argument('--workers', type=int, default=None, help='targets rebuilt at once')
+    parser.add_argument('--once', action='store_true', help='rebuild every target once and exit')
+    args = parser.parse_args()
+
+    daemon = Daemon(make_targets(), args.debounce / 1000, args.workers)
+    if args.once:
+        ok = daemon.run_once()
+        daemon.close()
+        sys.exit(0 if ok else 1)
+
+    dirs = watched_dirs()
+    how, stop = start_watcher(dirs, daemon.notify, args.interval)
+    print(f"Watching {', '.join(_rel(d) for d, _ in dirs)}; {how}. Ctrl-C to stop.")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+        daemon.close()
+
+
+if __name__ == '__main__':
+    main()
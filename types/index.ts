@@ -91,8 +91,13 @@ export interface Recipe {
 export interface Ingredient {
   name: string; // "Chicken breast"
   measure: string; // "500g"
+  // Pre-parsed measure from the bundled recipe shards (scripts/recipe_measures.py):
+  // [amount, unit] or [min, max, unit] in base units, e.g. [120, 'ml']
+  q?: [number, MeasureBaseUnit] | [number, number, MeasureBaseUnit];
 }
 
+export type MeasureBaseUnit = 'g' | 'ml' | 'count';
+
 // Shopping list item
 export interface ShoppingListItem {
   id: string; // Unique ID
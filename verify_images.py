@@ -1,23 +1,265 @@
-import imghdr
+"""
+Validate every file under assets/ by sniffing its header.
+
+Only a few bytes at the start (and for some formats the end, or the box
+headers of ISO-BMFF files through mmap) are read, never the full payload, so
+the whole tree checks in milliseconds and this can gate EAS builds:
+
+  - the detected format must match the file extension
+  - the file must not be truncated (PNG IEND, JPEG EOI, RIFF/box/ICO sizes,
+    closing bracket of JSON)
+  - the file must fit the size budget for its extension
+
+Exits 1 on mismatches or truncation; budget overruns are warnings unless
+--strict-budgets is given.
+
+    python verify_images.py
+    python verify_images.py --budget png=300KB --budget json=1MB --strict-budgets
+"""
+
+import argparse
+import mmap
 import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import build_trace  # noqa: E402
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = [os.path.join(ROOT, 'assets')]
+HEAD_BYTES = 4096
+
+# Extension -> formats we accept for it.
+EXPECTED = {
+    '.png': {'png'},
+    '.jpg': {'jpeg'},
+    '.jpeg': {'jpeg'},
+    '.avif': {'avif'},
+    '.ico': {'ico'},
+    '.wav': {'wav'},
+    '.mp3': {'mp3'},
+    '.mp4': {'mp4'},
+    '.json': {'lottie', 'json'},
+    '.ttf': {'ttf'},
+    '.otf': {'otf'},
+    '.xml': {'xml'},
+}
+
+DEFAULT_BUDGETS = {
+    '.png': 512 * 1024,
+    '.jpg': 512 * 1024,
+    '.jpeg': 512 * 1024,
+    '.avif': 512 * 1024,
+    '.ico': 64 * 1024,
+    '.wav': 256 * 1024,
+    '.mp3': 256 * 1024,
+    '.mp4': 5 * 1024 * 1024,
+    '.json': 512 * 1024,
+}
+
+MP4_BRANDS = {b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1', b'M4V ', b'M4A ', b'dash', b'qt  '}
+AVIF_BRANDS = {b'avif', b'avis'}
+
+
+def parse_size(text):
+    units = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+    text = text.strip().upper()
+    for unit in ('GB', 'MB', 'KB', 'B'):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * units[unit])
+    return int(text)
+
+
+def sniff(head):
+    """Detect the format from the first bytes of a file."""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head.startswith(b'ID3') or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    if head[4:8] == b'ftyp':
+        brands = {head[8:12]} | {head[i:i + 4] for i in range(16, min(len(head), struct.unpack('>I', head[:4])[0]), 4)}
+        if brands & AVIF_BRANDS:
+            return 'avif'
+        if brands & MP4_BRANDS:
+            return 'mp4'
+        return 'isobmff'
+    if head[:4] == b'\x00\x00\x01\x00' and len(head) >= 6 and struct.unpack('<H', head[4:6])[0] > 0:
+        return 'ico'
+    if head[:4] in (b'\x00\x01\x00\x00', b'true'):
+        return 'ttf'
+    if head[:4] == b'OTTO':
+        return 'otf'
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+    if text.startswith(b'<'):
+        return 'xml'
+    if text.startswith((b'{', b'[')):
+        # Bodymovin exports start with the version and frame rate.
+        if b'"v"' in text and (b'"fr"' in text or b'"ip"' in text or b'"layers"' in text):
+            return 'lottie'
+        return 'json'
+    return None
+
+
+def _check_boxes(f, size):
+    """Walk top-level ISO-BMFF boxes; only the 8/16-byte headers are touched."""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        pos = 0
+        while pos < size:
+            if pos + 8 > size:
+                return f'box header cut off at byte {pos}'
+            box_size = struct.unpack('>I', m[pos:pos + 4])[0]
+            if box_size == 1:
+                if pos + 16 > size:
+                    return f'box header cut off at byte {pos}'
+                box_size = struct.unpack('>Q', m[pos + 8:pos + 16])[0]
+            elif box_size == 0:
+                return None
+            if box_size < 8 or pos + box_size > size:
+                return f'{m[pos + 4:pos + 8].decode("latin-1")!r} box runs past end of file'
+            pos += box_size
+    return None
+
+
+def check_truncation(fmt, f, head, size):
+    """Return a description of the damage, or None if the file looks whole."""
+    def tail(n):
+        f.seek(max(0, size - n))
+        return f.read(n)
+
+    if fmt == 'png':
+        if tail(12) != b'\x00\x00\x00\x00IEND\xaeB`\x82':
+            return 'missing IEND chunk'
+    elif fmt == 'jpeg':
+        if b'\xff\xd9' not in tail(32):
+            return 'missing JPEG end-of-image marker'
+    elif fmt == 'wav':
+        riff_size = struct.unpack('<I', head[4:8])[0]
+        if riff_size + 8 > size:
+            return f'RIFF header declares {riff_size + 8} bytes, file has {size}'
+    elif fmt in ('mp4', 'avif', 'isobmff'):
+        return _check_boxes(f, size)
+    elif fmt == 'ico':
+        count = struct.unpack('<H', head[4:6])[0]
+        f.seek(6)
+        directory = f.read(16 * count)
+        if len(directory) < 16 * count:
+            return 'icon directory cut off'
+        for i in range(count):
+            length, offset = struct.unpack('<II', directory[16 * i + 8:16 * i + 16])
+            if offset + length > size:
+                return f'icon {i} runs past end of file'
+    elif fmt in ('json', 'lottie'):
+        if not tail(64).rstrip().endswith((b'}', b']')):
+            return 'JSON document is not closed'
+    elif fmt in ('ttf', 'otf'):
+        count = struct.unpack('>H', head[4:6])[0]
+        f.seek(12)
+        records = f.read(16 * count)
+        if len(records) < 16 * count:
+            return 'table directory cut off'
+        for i in range(count):
+            offset, length = struct.unpack('>II', records[16 * i + 8:16 * i + 16])
+            if offset + length > size:
+                return f'{records[16 * i:16 * i + 4].decode("latin-1")!r} table runs past end of file'
+    elif fmt == 'xml':
+        if not tail(64).rstrip().endswith(b'>'):
+            return 'XML document is not closed'
+    return None
+
+
+def verify(path, budgets):
+    """Return (path, size, detected format, [errors], [warnings])."""
+    ext = os.path.splitext(path)[1].lower()
+    errors, warnings = [], []
+    size = os.path.getsize(path)
+    if size == 0:
+        return path, size, None, ['empty file'], warnings
+
+    with open(path, 'rb') as f:
+        head = f.read(HEAD_BYTES)
+        fmt = sniff(head)
+        expected = EXPECTED.get(ext)
+        if fmt is None:
+            errors.append('unrecognized content')
+        elif expected is not None and fmt not in expected:
+            errors.append(f'extension {ext} but content is {fmt}')
+        if fmt is not None:
+            damage = check_truncation(fmt, f, head, size)
+            if damage:
+                errors.append(f'truncated: {damage}')
+
+    budget = budgets.get(ext, budgets.get('default'))
+    if budget is not None and size > budget:
+        warnings.append(f'{size / 1024:.0f}KB exceeds {ext or "default"} budget of {budget / 1024:.0f}KB')
+    return path, size, fmt, errors, warnings
+
+
+def find_files(paths):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            found.extend(os.path.join(dirpath, f) for f in filenames)
+    return sorted(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate asset formats, integrity and size budgets.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    parser.add_argument(
+        '--budget', action='append', default=[], metavar='EXT=SIZE',
+        help='size budget per extension, e.g. png=300KB (use "default" for everything else)',
+    )
+    parser.add_argument('--strict-budgets', action='store_true', help='fail when a budget is exceeded')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    build_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for spec in args.budget:
+        ext, _, size = spec.partition('=')
+        ext = ext.strip().lower()
+        budgets[ext if ext == 'default' or ext.startswith('.') else f'.{ext}'] = parse_size(size)
+
+    started = time.perf_counter()
+    with build_trace.run('verify_images', args) as span:
+        files = find_files(args.paths)
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            results = list(pool.map(lambda p: verify(p, budgets), files))
+        span.count('files', len(results))
+        span.count('invalid', sum(bool(r[3]) for r in results))
+        span.count('over_budget', sum(bool(r[4]) for r in results))
+    elapsed = time.perf_counter() - started
+
+    failed = over_budget = 0
+    for path, size, fmt, errors, warnings in results:
+        rel = os.path.relpath(path, ROOT)
+        for error in errors:
+            print(f"❌ {rel}: {error}")
+        for warning in warnings:
+            print(f"⚠️  {rel}: {warning}")
+        if args.verbose and not errors and not warnings:
+            print(f"✅ {rel}: {fmt}, {size / 1024:.1f}KB")
+        failed += bool(errors)
+        over_budget += bool(warnings)
+
+    print(
+        f"Verified {len(results)} files in {elapsed * 1000:.0f}ms: "
+        f"{failed} invalid, {over_budget} over budget."
+    )
+    if failed or (args.strict_budgets and over_budget):
+        sys.exit(1)
+
 
-files_to_check = [
-    'assets/images/splash-icon.png',
-    'assets/images/icon.png',
-    'assets/images/android-icon-192x192.png'
-]
-
-print("Verifying image formats...")
-for file_path in files_to_check:
-    if os.path.exists(file_path):
-        try:
-            format = imghdr.what(file_path)
-            print(f"File: {file_path}, Detected Format: {format}")
-            if format == 'png':
-                print(f"✅ {file_path} is a valid PNG.")
-            else:
-                print(f"❌ {file_path} is NOT a PNG (it is {format}).")
-        except Exception as e:
-            print(f"Error checking {file_path}: {e}")
-    else:
-        print(f"File not found: {file_path}")
+if __name__ == '__main__':
+    main()